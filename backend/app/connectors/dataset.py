@@ -0,0 +1,321 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import logging
+import posixpath
+import uuid
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from app.connectors.base import DestinationConnector
+
+logger = logging.getLogger(__name__)
+
+STAGING_DIR = '_staging'
+COMMITS_DIR = '_commits'
+# Published files keep this prefix until their commit marker exists
+PENDING_PREFIX = '.pending-'
+DEFAULT_MAX_ROWS_PER_FILE = 10_000_000
+DEFAULT_MAX_ROWS_PER_GROUP = 1_000_000
+# Files below this size are merged by compact()
+DEFAULT_SMALL_FILE_BYTES = 64 * 1024 * 1024
+
+
+class DatasetConnector(DestinationConnector):
+    """
+    Hive-partitioned Parquet dataset on a local path or object store.
+
+    Layout under ``root``::
+
+        <table>/<col>=<value>/.../part-<run>-<n>.parquet            published data files
+        <table>/<col>=<value>/.../.pending-part-<run>-<n>.parquet   files awaiting their commit
+        <table>/_staging/<run>/...                                   files being written
+        <table>/_commits/<run>.json                                  one marker per commit
+
+    A run writes into its own staging prefix, moves finished files into the partition
+    directories under hidden ``.pending-`` names, writes its commit marker and only then
+    renames the files to their final names; the marker is the commit point. Engines that
+    list the partition directories and skip ``_``/``.``-prefixed paths therefore never see
+    a partial or failed run. A writer that stops between the marker and the renames leaves
+    committed files under their pending names until :meth:`vacuum` finishes the renames.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.root = config.get('root') or config.get('path', '')
+        self.partition_by: List[str] = list(config.get('partition_by') or [])
+        self.max_rows_per_file = int(config.get('max_rows_per_file', DEFAULT_MAX_ROWS_PER_FILE))
+        self.max_rows_per_group = int(config.get('max_rows_per_group', DEFAULT_MAX_ROWS_PER_GROUP))
+        self.small_file_bytes = int(config.get('small_file_bytes', DEFAULT_SMALL_FILE_BYTES))
+        self.compression = config.get('compression', 'snappy')
+        self.fs: Optional[pafs.FileSystem] = None
+        self.base_path = ''
+
+    async def connect(self) -> None:
+        if '://' in self.root:
+            self.fs, self.base_path = pafs.FileSystem.from_uri(self.root)
+        else:
+            self.fs, self.base_path = pafs.LocalFileSystem(), self.root
+        self.fs.create_dir(self.base_path, recursive=True)
+
+    async def disconnect(self) -> None:
+        self.fs = None
+
+    async def test_connection(self) -> bool:
+        try:
+            if self.fs is None:
+                await self.connect()
+            return self.fs.get_file_info(self.base_path).type == pafs.FileType.Directory
+        except Exception as e:
+            logger.error(f"Dataset connection test failed: {str(e)}")
+            return False
+
+    async def get_schema(self) -> Dict[str, Any]:
+        """Get the committed Arrow schema of every table"""
+        tables = {}
+        for info in self.fs.get_file_info(pafs.FileSelector(self.base_path)):
+            if info.type == pafs.FileType.Directory and not info.base_name.startswith(('_', '.')):
+                files = self.committed_files(info.base_name)
+                if files:
+                    tables[info.base_name] = pq.read_schema(files[0], filesystem=self.fs)
+        return tables
+
+    async def create_table(self, table_name: str, schema: Dict[str, Any]) -> None:
+        """Create the table directory; the layout comes from the first write"""
+        self.fs.create_dir(self._table_path(table_name, COMMITS_DIR), recursive=True)
+
+    async def write_data(self, data: List[Dict[str, Any]], table: str) -> int:
+        if not data:
+            return 0
+        return self.write_batches(table, [pa.RecordBatch.from_pylist(data)])['rows']
+
+    def write_parquet_files(self, table: str, paths: List[str]) -> Dict[str, Any]:
+        """Publish local Parquet output (e.g. from ParquetService) as one partitioned commit"""
+        def batches():
+            for path in paths:
+                yield from pq.ParquetFile(path).iter_batches(self.max_rows_per_group)
+        return self.write_batches(table, batches(), schema=pq.read_schema(paths[0]) if paths else None)
+
+    def write_batches(
+        self,
+        table: str,
+        batches: Iterable[pa.RecordBatch],
+        schema: Optional[pa.Schema] = None,
+    ) -> Dict[str, Any]:
+        """
+        Write batches as one atomic commit
+
+        Returns:
+            The commit marker: run id, added files with row counts and sizes, total rows
+        """
+        batches = iter(batches)
+        if schema is None:
+            first = next(batches, None)
+            if first is None:
+                return {'run_id': None, 'added': [], 'removed': [], 'rows': 0}
+            schema = first.schema
+            batches = _prepend(first, batches)
+
+        run_id = _run_id()
+        staging = self._table_path(table, STAGING_DIR, run_id)
+        try:
+            written = self._write_staged(staging, pa.RecordBatchReader.from_batches(schema, batches), run_id)
+            added = self._publish(table, staging, written)
+            commit = self._commit(table, run_id, 'write', added, [])
+            self._finish_publish(added)
+            return commit
+        finally:
+            self._delete_dir(staging)
+
+    def committed_files(self, table: str) -> List[str]:
+        """Live data files of a table, replayed from its commit markers in commit order"""
+        live: Dict[str, None] = {}
+        for commit in self.commits(table):
+            for path in commit.get('removed', []):
+                live.pop(path, None)
+            for entry in commit.get('added', []):
+                live[entry['path']] = None
+        return list(live)
+
+    def commits(self, table: str) -> List[Dict[str, Any]]:
+        selector = pafs.FileSelector(self._table_path(table, COMMITS_DIR), allow_not_found=True)
+        markers = sorted(
+            info.path for info in self.fs.get_file_info(selector)
+            if info.base_name.endswith('.json') and not info.base_name.startswith('.')
+        )
+        commits = []
+        for path in markers:
+            with self.fs.open_input_stream(path) as f:
+                commits.append(json.loads(f.read()))
+        return commits
+
+    def compact(self, table: str) -> Optional[Dict[str, Any]]:
+        """
+        Merge small committed files partition by partition
+
+        Recurring runs leave one small file per partition per run; this rewrites every
+        partition holding two or more files under ``small_file_bytes`` into as few files
+        as ``max_rows_per_file`` allows, as a single commit that adds the merged files and
+        removes the originals. The originals are deleted after the commit.
+        """
+        by_partition: Dict[str, List[str]] = {}
+        for path in self.committed_files(table):
+            info = self.fs.get_file_info(path)
+            if info.type == pafs.FileType.File and info.size < self.small_file_bytes:
+                by_partition.setdefault(posixpath.dirname(path), []).append(path)
+        candidates = {part: paths for part, paths in by_partition.items() if len(paths) > 1}
+        if not candidates:
+            return None
+
+        run_id = _run_id()
+        staging = self._table_path(table, STAGING_DIR, run_id)
+        table_root = self._table_path(table)
+        try:
+            added: List[Dict[str, Any]] = []
+            removed: List[str] = []
+            for partition_dir, paths in sorted(candidates.items()):
+                relative = posixpath.relpath(partition_dir, table_root)
+                target = posixpath.join(staging, relative) if relative != '.' else staging
+                # Partition values live in the directory names, so the files are read
+                # and rewritten without them and land back in the same directory.
+                source = ds.dataset(paths, filesystem=self.fs, format='parquet')
+                written = self._write_staged(target, source, run_id, partitioned=False)
+                added.extend(self._publish(table, staging, written))
+                removed.extend(paths)
+            commit = self._commit(table, run_id, 'compact', added, removed)
+            self._finish_publish(added)
+        finally:
+            self._delete_dir(staging)
+
+        for path in removed:
+            self.fs.delete_file(path)
+        logger.info(f"Compacted {len(removed)} files into {len(added)} in {table}")
+        return commit
+
+    def vacuum(self, table: str) -> int:
+        """
+        Remove staging leftovers and data files no commit references
+
+        Cleans up after runs that failed before committing and after compactions that
+        committed but did not finish deleting the originals, and renames pending files
+        of committed runs that stopped before publishing them. Do not run it while a
+        write to the same table is in progress.
+        """
+        self._delete_dir(self._table_path(table, STAGING_DIR))
+        live = set(self.committed_files(table))
+        table_root = self._table_path(table)
+        removed = 0
+        selector = pafs.FileSelector(table_root, recursive=True, allow_not_found=True)
+        for info in self.fs.get_file_info(selector):
+            relative = posixpath.relpath(info.path, table_root)
+            pending = info.base_name.startswith(PENDING_PREFIX)
+            if info.type != pafs.FileType.File or (relative.startswith(('_', '.')) and not pending):
+                continue
+            if pending:
+                target = posixpath.join(posixpath.dirname(info.path), info.base_name[len(PENDING_PREFIX):])
+                if target in live:
+                    self.fs.move(info.path, target)
+                    continue
+            if info.path not in live:
+                self.fs.delete_file(info.path)
+                removed += 1
+        return removed
+
+    def _write_staged(self, staging: str, data, run_id: str, partitioned: bool = True) -> List[Dict[str, Any]]:
+        written: List[Dict[str, Any]] = []
+
+        def visit(written_file) -> None:
+            written.append({'path': written_file.path, 'rows': written_file.metadata.num_rows})
+
+        partitioning = None
+        if partitioned and self.partition_by:
+            partitioning = ds.partitioning(
+                pa.schema([data.schema.field(column) for column in self.partition_by]),
+                flavor='hive',
+            )
+        ds.write_dataset(
+            data,
+            staging,
+            format='parquet',
+            filesystem=self.fs,
+            partitioning=partitioning,
+            basename_template=f"part-{run_id}-{{i}}.parquet",
+            file_options=ds.ParquetFileFormat().make_write_options(compression=self.compression),
+            max_rows_per_file=self.max_rows_per_file,
+            max_rows_per_group=min(self.max_rows_per_group, self.max_rows_per_file),
+            existing_data_behavior='overwrite_or_ignore',
+            file_visitor=visit,
+        )
+        return written
+
+    def _publish(self, table: str, staging: str, written: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Move staged files to their partition directories under pending names"""
+        table_root = self._table_path(table)
+        published = []
+        for entry in written:
+            target = posixpath.join(table_root, posixpath.relpath(entry['path'], staging))
+            pending = _pending_path(target)
+            self.fs.create_dir(posixpath.dirname(target), recursive=True)
+            self.fs.move(entry['path'], pending)
+            published.append({
+                'path': target,
+                'rows': entry['rows'],
+                'bytes': self.fs.get_file_info(pending).size,
+            })
+        return published
+
+    def _finish_publish(self, added: List[Dict[str, Any]]) -> None:
+        """Give committed files their final names"""
+        for entry in added:
+            self.fs.move(_pending_path(entry['path']), entry['path'])
+
+    def _commit(
+        self,
+        table: str,
+        run_id: str,
+        operation: str,
+        added: List[Dict[str, Any]],
+        removed: List[str],
+    ) -> Dict[str, Any]:
+        """Write the commit marker; writing it to a temporary name first keeps it all-or-nothing"""
+        commit = {
+            'run_id': run_id,
+            'operation': operation,
+            'committed_at': datetime.utcnow().isoformat(),
+            'added': added,
+            'removed': removed,
+            'rows': sum(entry['rows'] for entry in added),
+        }
+        commits_dir = self._table_path(table, COMMITS_DIR)
+        self.fs.create_dir(commits_dir, recursive=True)
+        temporary = posixpath.join(commits_dir, f".{run_id}.json.tmp")
+        with self.fs.open_output_stream(temporary) as f:
+            f.write(json.dumps(commit).encode())
+        self.fs.move(temporary, posixpath.join(commits_dir, f"{run_id}.json"))
+        logger.info(f"Committed {operation} {run_id} to {table}: {len(added)} files, {commit['rows']} rows")
+        return commit
+
+    def _delete_dir(self, path: str) -> None:
+        try:
+            self.fs.delete_dir(path)
+        except (FileNotFoundError, OSError):
+            pass
+
+    def _table_path(self, table: str, *parts: str) -> str:
+        return posixpath.join(self.base_path, table, *parts)
+
+
+def _run_id() -> str:
+    # Sortable by time so commit markers replay in order
+    return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+
+
+def _pending_path(path: str) -> str:
+    return posixpath.join(posixpath.dirname(path), PENDING_PREFIX + posixpath.basename(path))
+
+
+def _prepend(first: pa.RecordBatch, rest: Iterable[pa.RecordBatch]):
+    yield first
+    yield from rest
@@ -0,0 +1,343 @@
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+import asyncio
+import json
+import logging
+import os
+import random
+
+import aiohttp
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.connectors.base import DestinationConnector
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rows and bytes per streaming-ingest request
+DEFAULT_STREAM_BATCH_ROWS = 10_000
+DEFAULT_STREAM_BATCH_BYTES = 8 * 1024 * 1024
+# Parquet files at or below this size are sent through streaming ingest
+DEFAULT_SMALL_FILE_BYTES = 16 * 1024 * 1024
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+
+# Hydrolix transform datatypes for the Parquet type names from map_to_parquet_type
+PARQUET_TO_HYDROLIX_TYPES = {
+    'INT8': 'int32',
+    'INT16': 'int32',
+    'INT32': 'int32',
+    'INT64': 'int64',
+    'FLOAT': 'double',
+    'DOUBLE': 'double',
+    # Hydrolix has no decimal type; exact digits survive as strings
+    'DECIMAL': 'string',
+    'BOOLEAN': 'boolean',
+    'STRING': 'string',
+    'BINARY': 'string',
+    'DATE': 'datetime',
+    'TIMESTAMP': 'datetime',
+    'TIME': 'string',
+}
+# Go reference layouts declared in the transform; rows are serialized to match them
+DATETIME_FORMATS = {
+    'DATE': "2006-01-02",
+    'TIMESTAMP': "2006-01-02 15:04:05.000000",
+}
+
+
+class HydrolixError(Exception):
+    """A Hydrolix API request failed after all retries"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Hydrolix request failed ({status}): {message}")
+        self.status = status
+
+
+class HydrolixConnector(DestinationConnector):
+    """
+    Hydrolix destination over the config and ingest HTTP APIs.
+
+    One pooled ``aiohttp`` session is kept per connector. Rows and small Parquet chunks
+    go through batched streaming ingest (``/ingest/event``, newline-delimited JSON);
+    larger Parquet files are uploaded to the configured storage and loaded with a batch
+    ingest job. Uploads and ingest requests run at most ``max_concurrent_uploads`` at a
+    time and are retried with exponential backoff on throttling and server errors.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.api_url = config.get('api_url', settings.HYDROLIX_API_URL).rstrip('/')
+        self.token = config.get('token', settings.HYDROLIX_TOKEN)
+        self.org_id = config.get('org_id', settings.HYDROLIX_ORG_ID)
+        self.project_id = config.get('project_id', settings.HYDROLIX_PROJECT_ID)
+        self.project_name = config.get('project_name', self.project_id)
+        self.ingest_url = config.get('ingest_url') or _origin(self.api_url) + '/ingest/event'
+        # Where Parquet files are PUT (an HTTP gateway or pre-signed bucket prefix) and
+        # the same location as Hydrolix's batch jobs see it, e.g. s3://bucket/prefix
+        self.storage_url = (config.get('storage_url') or '').rstrip('/')
+        self.storage_path = (config.get('storage_path') or '').rstrip('/')
+        self.max_concurrent_uploads = int(
+            config.get('max_concurrent_uploads', settings.HYDROLIX_MAX_CONCURRENT_UPLOADS)
+        )
+        self.max_retries = int(config.get('max_retries', settings.HYDROLIX_MAX_RETRIES))
+        self.stream_batch_rows = int(config.get('stream_batch_rows', DEFAULT_STREAM_BATCH_ROWS))
+        self.stream_batch_bytes = int(config.get('stream_batch_bytes', DEFAULT_STREAM_BATCH_BYTES))
+        self.small_file_bytes = int(config.get('small_file_bytes', DEFAULT_SMALL_FILE_BYTES))
+        self.primary_column = config.get('primary_column')
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def connect(self) -> None:
+        if self.session is not None:
+            return
+        connector = aiohttp.TCPConnector(limit=self.max_concurrent_uploads * 2, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'Authorization': f'Bearer {self.token}'},
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=300),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_uploads)
+
+    async def disconnect(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def test_connection(self) -> bool:
+        try:
+            await self._request('GET', self._project_url())
+            return True
+        except Exception as e:
+            logger.error(f"Hydrolix connection test failed: {str(e)}")
+            return False
+
+    async def get_schema(self) -> Dict[str, Any]:
+        """Get the tables of the configured project"""
+        tables = await self._request('GET', self._project_url('tables/'))
+        results = tables.get('results', tables) if isinstance(tables, dict) else tables
+        return {table['name']: table for table in results or []}
+
+    async def create_table(self, table_name: str, schema: Dict[str, Any]) -> None:
+        """
+        Create a table and a JSON ingest transform named after it
+
+        ``schema`` maps column names to Parquet type names (see ``map_to_parquet_type``).
+        The configured ``primary_column``, or else the first DATE/TIMESTAMP column, becomes
+        the primary timestamp.
+        """
+        table = _json_object(
+            await self._request('POST', self._project_url('tables/'), json={'name': table_name})
+        )
+        table_id = table.get('uuid') or table.get('id')
+        await self._request(
+            'POST',
+            self._project_url(f'tables/{table_id}/transforms/'),
+            json=self._transform(table_name, schema),
+        )
+        logger.info(f"Created Hydrolix table {table_name} with {len(schema)} columns")
+
+    async def write_data(self, data: List[Dict[str, Any]], table: str) -> int:
+        """Stream rows through batched streaming ingest"""
+        requests = []
+        for start in range(0, len(data), self.stream_batch_rows):
+            requests.extend(self._ndjson_bodies(data[start:start + self.stream_batch_rows]))
+        await asyncio.gather(*[self._ingest(body, table) for body in requests])
+        return len(data)
+
+    async def ingest_batches(self, batches: Iterable[pa.RecordBatch], table: str) -> int:
+        """Stream Arrow record batches through batched streaming ingest"""
+        rows = 0
+        pending: set = set()
+        try:
+            for batch in batches:
+                for start in range(0, batch.num_rows, self.stream_batch_rows):
+                    chunk = batch.slice(start, self.stream_batch_rows)
+                    rows += chunk.num_rows
+                    for body in self._ndjson_bodies(chunk.to_pylist()):
+                        # Bound the encoded bodies in flight to what the semaphore lets through
+                        while len(pending) >= self.max_concurrent_uploads * 2:
+                            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                            for task in done:
+                                task.result()
+                        pending.add(asyncio.create_task(self._ingest(body, table)))
+            await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        return rows
+
+    async def upload_parquet(self, paths: List[str], table: str) -> int:
+        """
+        Load Parquet files into ``table``
+
+        Small files, or all files when no storage is configured, go through streaming
+        ingest. Larger files are uploaded concurrently and loaded by one batch job.
+        Returns the number of files loaded.
+        """
+        small = [p for p in paths if not self.storage_url or os.path.getsize(p) <= self.small_file_bytes]
+        large = [p for p in paths if p not in small]
+
+        for path in small:
+            await self.ingest_batches(pq.ParquetFile(path).iter_batches(self.stream_batch_rows), table)
+
+        if large:
+            uploaded = await asyncio.gather(*[self._upload_file(path) for path in large])
+            await self.trigger_batch_ingest(table, uploaded)
+        return len(paths)
+
+    async def trigger_batch_ingest(self, table: str, storage_paths: List[str]) -> Dict[str, Any]:
+        """Start a batch ingest job for files already in storage"""
+        job = await self._request('POST', f"{self.api_url}/config/v1/orgs/{self.org_id}/jobs/batch/", json={
+            'name': f"{table}-{random.getrandbits(32):08x}",
+            'type': 'batch_import',
+            'settings': {
+                'source': {
+                    'table': f"{self.project_name}.{table}",
+                    'type': 'batch',
+                    'transform': table,
+                    'settings': {'url': storage_paths},
+                },
+            },
+        })
+        logger.info(f"Started Hydrolix batch ingest of {len(storage_paths)} files into {table}")
+        return job
+
+    async def _upload_file(self, path: str) -> str:
+        name = os.path.basename(path)
+        await self.connect()
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with open(path, 'rb') as f:
+                        async with self.session.put(f"{self.storage_url}/{name}", data=f) as response:
+                            if response.status < 300:
+                                break
+                            if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                                raise HydrolixError(response.status, await response.text())
+                            await asyncio.sleep(_backoff(attempt, response))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == self.max_retries:
+                        raise HydrolixError(0, str(e))
+                    await asyncio.sleep(_backoff(attempt))
+        logger.info(f"Uploaded {name} to Hydrolix storage")
+        return f"{self.storage_path}/{name}" if self.storage_path else f"{self.storage_url}/{name}"
+
+    async def _ingest(self, body: bytes, table: str) -> None:
+        await self.connect()
+        async with self._semaphore:
+            await self._request('POST', self.ingest_url, data=body, headers={
+                'content-type': 'application/json',
+                'x-hdx-table': f"{self.project_name}.{table}",
+                'x-hdx-transform': table,
+            })
+
+    async def _request(self, method: str, url: str, **kwargs) -> Any:
+        """Send a request, retrying throttling, server and network errors with backoff"""
+        if self.session is None:
+            await self.connect()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    if response.status < 300:
+                        if response.content_type == 'application/json':
+                            return await response.json()
+                        return await response.text()
+                    if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                        raise HydrolixError(response.status, await response.text())
+                    delay = _backoff(attempt, response)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise HydrolixError(0, str(e))
+                delay = _backoff(attempt)
+            logger.warning(f"Retrying Hydrolix {method} {url} in {delay:.1f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+
+    def _ndjson_bodies(self, rows: List[Dict[str, Any]]) -> List[bytes]:
+        """Encode rows as newline-delimited JSON, split at ``stream_batch_bytes``"""
+        bodies: List[bytes] = []
+        lines: List[bytes] = []
+        size = 0
+        for row in rows:
+            line = json.dumps(row, default=_json_value).encode()
+            if lines and size + len(line) + 1 > self.stream_batch_bytes:
+                bodies.append(b'\n'.join(lines))
+                lines, size = [], 0
+            lines.append(line)
+            size += len(line) + 1
+        if lines:
+            bodies.append(b'\n'.join(lines))
+        return bodies
+
+    def _transform(self, table_name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+        primary = self.primary_column or next(
+            (name for name, t in schema.items() if str(t).upper() in ('DATE', 'TIMESTAMP')), None
+        )
+        output_columns = []
+        for name, parquet_type in schema.items():
+            type_name = str(parquet_type).upper()
+            datatype: Dict[str, Any] = {'type': PARQUET_TO_HYDROLIX_TYPES.get(type_name, 'string')}
+            if datatype['type'] == 'datetime':
+                datatype['format'] = DATETIME_FORMATS[type_name]
+            if name == primary:
+                datatype['primary'] = True
+            output_columns.append({'name': name, 'datatype': datatype})
+        return {
+            'name': table_name,
+            'type': 'json',
+            'settings': {
+                'is_default': True,
+                'output_columns': output_columns,
+                'format_details': {},
+            },
+        }
+
+    def _project_url(self, path: str = '') -> str:
+        return f"{self.api_url}/config/v1/orgs/{self.org_id}/projects/{self.project_id}/{path}"
+
+
+def _json_value(value: Any) -> Any:
+    """Serialize values ``json`` cannot, matching the formats declared in the transform"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, time):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+
+def _json_object(body: Any) -> Dict[str, Any]:
+    """A JSON object from a response ``_request`` may have returned as text"""
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            raise HydrolixError(0, f"Expected a JSON object, got: {body[:200]}")
+    if not isinstance(body, dict):
+        raise HydrolixError(0, f"Expected a JSON object, got: {str(body)[:200]}")
+    return body
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _backoff(attempt: int, response: Optional[aiohttp.ClientResponse] = None) -> float:
+    """Exponential backoff with full jitter, honouring Retry-After when the server sends it"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
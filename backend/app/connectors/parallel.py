@@ -0,0 +1,61 @@
+"""Helpers for reading one table over several concurrent range scans"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, List
+
+import pyarrow as pa
+
+from app.core.metrics import track_queue
+import app.core.pipeline  # noqa: F401
+from services.memory import governor
+
+# Batches buffered per scan before its reader waits for the consumer
+SCAN_QUEUE_BATCHES = 4
+
+
+@dataclass(frozen=True)
+class ScanRange:
+    """A slice of a table for one parallel worker: a key range or a ctid (page) range"""
+    column: str
+    lower: Any
+    upper: Any
+
+
+async def merge_batch_streams(streams: List[AsyncIterator[pa.RecordBatch]]) -> AsyncIterator[pa.RecordBatch]:
+    """
+    Drain several batch streams concurrently and yield batches as they arrive
+
+    The first failing stream cancels the others and its error is raised to the caller.
+    Order across streams is not defined.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SCAN_QUEUE_BATCHES * max(len(streams), 1))
+    track_queue('parallel_scan', queue)
+    done = object()
+    failures: List[BaseException] = []
+
+    async def drain(stream: AsyncIterator[pa.RecordBatch]) -> None:
+        try:
+            async for batch in stream:
+                await governor.wait_async()
+                await queue.put(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            failures.append(e)
+        await queue.put(done)
+
+    tasks = [asyncio.create_task(drain(stream)) for stream in streams]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await queue.get()
+            if item is not done:
+                yield item
+                continue
+            if failures:
+                raise failures[0]
+            remaining -= 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,468 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import re
+
+import asyncpg
+import pyarrow as pa
+
+from app.connectors.base import SourceConnector
+from app.connectors.parallel import ScanRange, merge_batch_streams
+from app.connectors.postgres_binary import DECODABLE_TYPE_OIDS, BinaryCopyDecoder
+from app.connectors.sql import POSTGRES, build_where, validate_projection as check_projection
+from app.core.metrics import track_queue
+import app.core.pipeline  # noqa: F401
+from services.memory import governor
+from services.verification import split_key_range
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAM_BATCH_ROWS = 50_000
+DEFAULT_PARALLEL_SCANS = 4
+# Decoded batches buffered per COPY before the reader waits for the consumer
+COPY_QUEUE_BATCHES = 4
+
+POSTGRES_TO_ARROW_TYPES = {
+    'smallint': pa.int16(),
+    'integer': pa.int32(),
+    'bigint': pa.int64(),
+    'oid': pa.uint32(),
+    'real': pa.float32(),
+    'double precision': pa.float64(),
+    'boolean': pa.bool_(),
+    'date': pa.date32(),
+    'time without time zone': pa.time64('us'),
+    'timestamp without time zone': pa.timestamp('us'),
+    'timestamp with time zone': pa.timestamp('us', tz='UTC'),
+    'bytea': pa.binary(),
+}
+
+_NUMERIC_TYPE = re.compile(r'^numeric\((\d+),(\d+)\)$')
+_TYPE_MODIFIER = re.compile(r'\(.*\)')
+
+
+@dataclass(frozen=True)
+class ColumnInfo:
+    name: str
+    type_name: str
+    type_oid: int
+
+
+class PostgresConnector(SourceConnector):
+    """
+    PostgreSQL (and Supabase) source connector on asyncpg.
+
+    Table data is read with ``COPY (SELECT ...) TO STDOUT (FORMAT binary)`` and decoded
+    straight into Arrow record batches. Large tables can be read by several workers over
+    primary-key or ctid ranges, all pinned to one exported snapshot so the combined
+    result is consistent.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.host = config.get('host', 'localhost')
+        self.port = int(config.get('port', 5432))
+        self.user = config.get('username', 'postgres')
+        self.password = config.get('password', '')
+        self.database = config.get('database', 'postgres')
+        self.schema = config.get('schema', 'public')
+        self.ssl = config.get('ssl')
+        self.pool_min_size = int(config.get('pool_min_size', 1))
+        self.pool_max_size = int(config.get('pool_max_size', 10))
+        self.pool = None
+        self._columns_cache: Dict[str, List[ColumnInfo]] = {}
+
+    async def connect(self) -> None:
+        self.pool = await asyncpg.create_pool(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            ssl=self.ssl,
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+        )
+
+    async def disconnect(self) -> None:
+        if self.pool:
+            await self.pool.close()
+
+    async def test_connection(self) -> bool:
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.fetchval("SELECT 1")
+                return True
+        except Exception as e:
+            logger.error(f"Connection test failed: {str(e)}")
+            return False
+
+    async def get_schema(self) -> Dict[str, Any]:
+        """Get the column schema of every table"""
+        return {table: await self.get_table_schema(table) for table in await self.get_tables()}
+
+    async def read_data(self, query: str) -> List[Dict[str, Any]]:
+        async with self.pool.acquire() as conn:
+            return [dict(row) for row in await conn.fetch(query)]
+
+    async def get_tables(self) -> List[str]:
+        """Get list of tables in the configured schema"""
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT table_name FROM information_schema.tables
+                    WHERE table_schema = $1 AND table_type = 'BASE TABLE'
+                    ORDER BY table_name
+                    """,
+                    self.schema,
+                )
+                return [row['table_name'] for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting tables: {str(e)}")
+            return []
+
+    async def get_table_schema(self, table_name: str, refresh: bool = False) -> Dict[str, str]:
+        """Get column names and types for a table (cached per connector)"""
+        return {column.name: column.type_name for column in await self._columns(table_name, refresh)}
+
+    async def get_row_count(self, table_name: str) -> int:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval(f"SELECT COUNT(*) FROM {self._qualified(table_name)}")
+
+    async def estimate_row_count(self, table_name: str) -> int:
+        """Get the planner's row estimate for a table without scanning it"""
+        async with self.pool.acquire() as conn:
+            estimate = await conn.fetchval(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = $1::regclass",
+                self._qualified(table_name),
+            )
+            # reltuples is -1 for tables that were never vacuumed or analyzed
+            return max(int(estimate or 0), 0)
+
+    async def get_table_sizes(self) -> Dict[str, Tuple[int, int]]:
+        """Get approximate (row count, data bytes) for every table from the catalog"""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT c.relname, GREATEST(c.reltuples, 0)::bigint AS row_estimate,
+                       pg_relation_size(c.oid) AS data_bytes
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = $1 AND c.relkind IN ('r', 'p')
+                """,
+                self.schema,
+            )
+            return {row['relname']: (int(row['row_estimate']), int(row['data_bytes'])) for row in rows}
+
+    async def get_primary_key_columns(self, table_name: str) -> List[str]:
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT a.attname
+                FROM pg_index i
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                WHERE i.indrelid = $1::regclass AND i.indisprimary
+                ORDER BY array_position(i.indkey::int2[], a.attnum)
+                """,
+                self._qualified(table_name),
+            )
+            return [row['attname'] for row in rows]
+
+    async def get_key_bounds(self, table_name: str, key_column: str) -> Tuple[Any, Any]:
+        key = POSTGRES.quote_identifier(key_column)
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(f"SELECT MIN({key}), MAX({key}) FROM {self._qualified(table_name)}")
+            return (row[0], row[1]) if row else (None, None)
+
+    async def validate_projection(
+        self,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+    ) -> None:
+        """
+        Check a column list and filter predicates against the cached table schema
+
+        Raises:
+            ValueError: if the table is unknown or the projection or filters do not fit it
+        """
+        schema = await self.get_table_schema(table_name)
+        if not schema:
+            raise ValueError(f"Table {table_name} not found or has no columns")
+        check_projection(schema, columns, filters)
+
+    async def get_arrow_schema(self, table_name: str, columns: Optional[List[str]] = None) -> pa.Schema:
+        """Get the Arrow schema for a table (or a column projection of it)"""
+        selected = self._select(await self._columns(table_name), columns)
+        return pa.schema([pa.field(c.name, self.map_to_arrow_type(c.type_name)) for c in selected])
+
+    async def stream_table(
+        self,
+        table_name: str,
+        interval: Optional[int] = None,
+        offset: int = 0,
+        batch_rows: int = DEFAULT_STREAM_BATCH_ROWS,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+        order_by: Optional[List[str]] = None,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """
+        Stream a table (or a LIMIT/OFFSET window of it) as Arrow record batches via binary COPY
+        """
+        if columns or filters:
+            await self.validate_projection(table_name, columns, filters)
+        query, params, fields = await self._copy_query(
+            table_name, columns, filters, order_by=order_by, limit=interval, offset=offset
+        )
+        async with self.pool.acquire() as conn:
+            async for batch in self._copy(conn, query, params, fields, batch_rows):
+                yield batch
+
+    async def stream_range(
+        self,
+        table_name: str,
+        key_column: str,
+        lower: Any,
+        upper: Any,
+        columns: Optional[List[str]] = None,
+        batch_rows: int = DEFAULT_STREAM_BATCH_ROWS,
+        filters: Optional[List[Any]] = None,
+        snapshot: Optional[str] = None,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """
+        Stream rows with ``lower <= key_column < upper`` as Arrow record batches
+
+        ``key_column`` may be ``ctid`` with ``(page, 0)`` tuple bounds. With ``snapshot``
+        (from :meth:`export_snapshot`) the range is read as of that snapshot.
+        """
+        if columns or filters:
+            await self.validate_projection(table_name, columns, filters)
+        query, params, fields = await self._copy_query(
+            table_name, columns, filters, key_column=key_column, lower=lower, upper=upper
+        )
+        async with self.pool.acquire() as conn:
+            if snapshot is None:
+                async for batch in self._copy(conn, query, params, fields, batch_rows):
+                    yield batch
+                return
+            async with conn.transaction(isolation='repeatable_read', readonly=True):
+                await conn.execute(f"SET TRANSACTION SNAPSHOT '{_snapshot_id(snapshot)}'")
+                async for batch in self._copy(conn, query, params, fields, batch_rows):
+                    yield batch
+
+    @asynccontextmanager
+    async def export_snapshot(self) -> AsyncIterator[str]:
+        """
+        Export a snapshot that parallel readers can share
+
+        The exporting transaction stays open (holding one pool connection) until the
+        context exits; readers pass the id to ``stream_range(snapshot=...)``.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction(isolation='repeatable_read', readonly=True):
+                yield await conn.fetchval("SELECT pg_export_snapshot()")
+
+    async def plan_scan_ranges(
+        self,
+        table_name: str,
+        parts: int = DEFAULT_PARALLEL_SCANS,
+        key_column: Optional[str] = None,
+    ) -> List[ScanRange]:
+        """
+        Split a table into ``parts`` ranges for parallel reads
+
+        Uses an integer primary key (or ``key_column``) when there is one, and ctid page
+        ranges otherwise. The last range is open-ended so rows added since planning are
+        still read.
+        """
+        parts = max(1, parts)
+        if key_column is None:
+            pk_columns = await self.get_primary_key_columns(table_name)
+            types = await self.get_table_schema(table_name)
+            if len(pk_columns) == 1 and types.get(pk_columns[0]) in ('smallint', 'integer', 'bigint'):
+                key_column = pk_columns[0]
+
+        if key_column is not None:
+            lower, upper = await self.get_key_bounds(table_name, key_column)
+            if lower is None:
+                return [ScanRange(key_column, None, None)]
+            bounds = split_key_range(int(lower), int(upper) + 1, parts)
+            ranges = [ScanRange(key_column, lo, hi) for lo, hi in bounds]
+        else:
+            async with self.pool.acquire() as conn:
+                pages = await conn.fetchval(
+                    "SELECT pg_relation_size($1::regclass) / current_setting('block_size')::int",
+                    self._qualified(table_name),
+                )
+            bounds = split_key_range(0, max(int(pages or 0), 1), parts)
+            ranges = [ScanRange('ctid', (lo, 0), (hi, 0)) for lo, hi in bounds]
+
+        ranges[-1] = ScanRange(ranges[-1].column, ranges[-1].lower, None)
+        return ranges
+
+    async def stream_parallel(
+        self,
+        table_name: str,
+        parts: int = DEFAULT_PARALLEL_SCANS,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+        key_column: Optional[str] = None,
+        batch_rows: int = DEFAULT_STREAM_BATCH_ROWS,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """
+        Read a table with ``parts`` concurrent COPY streams over one exported snapshot
+
+        Batches are yielded as they arrive, so their order across ranges is not defined.
+        """
+        ranges = await self.plan_scan_ranges(table_name, parts, key_column)
+        async with self.export_snapshot() as snapshot:
+            streams = [
+                self.stream_range(
+                    table_name, scan.column, scan.lower, scan.upper,
+                    columns=columns, batch_rows=batch_rows, filters=filters, snapshot=snapshot,
+                )
+                for scan in ranges
+            ]
+            async for batch in merge_batch_streams(streams):
+                yield batch
+
+    def map_to_arrow_type(self, postgres_type: str) -> pa.DataType:
+        """Convert a Postgres type name (as from format_type) to an Arrow type"""
+        postgres_type = postgres_type.lower()
+        numeric = _NUMERIC_TYPE.match(postgres_type.replace(' ', ''))
+        if numeric:
+            precision, scale = int(numeric.group(1)), int(numeric.group(2))
+            return pa.decimal128(precision, scale) if precision <= 38 else pa.decimal256(precision, scale)
+        # e.g. 'timestamp(3) without time zone' -> 'timestamp without time zone'
+        base_type = ' '.join(_TYPE_MODIFIER.sub('', postgres_type).split())
+        return POSTGRES_TO_ARROW_TYPES.get(base_type, pa.string())
+
+    async def _columns(self, table_name: str, refresh: bool = False) -> List[ColumnInfo]:
+        if not refresh and table_name in self._columns_cache:
+            return self._columns_cache[table_name]
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT a.attname, format_type(a.atttypid, a.atttypmod) AS type_name,
+                           a.atttypid::int AS type_oid
+                    FROM pg_attribute a
+                    WHERE a.attrelid = to_regclass($1) AND a.attnum > 0 AND NOT a.attisdropped
+                    ORDER BY a.attnum
+                    """,
+                    self._qualified(table_name),
+                )
+        except Exception as e:
+            logger.error(f"Error getting schema for table {table_name}: {str(e)}")
+            return []
+        columns = [ColumnInfo(row['attname'], row['type_name'], row['type_oid']) for row in rows]
+        if columns:
+            self._columns_cache[table_name] = columns
+        return columns
+
+    async def _copy_query(
+        self,
+        table_name: str,
+        columns: Optional[List[str]],
+        filters: Optional[List[Any]],
+        key_column: Optional[str] = None,
+        lower: Any = None,
+        upper: Any = None,
+        order_by: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ):
+        """Build the SELECT for a COPY, casting types without a binary decoder to text"""
+        selected = self._select(await self._columns(table_name), columns)
+        if not selected:
+            raise ValueError(f"Table {table_name} not found or has no columns")
+
+        select_list = []
+        fields = []
+        for column in selected:
+            quoted = POSTGRES.quote_identifier(column.name)
+            if column.type_oid in DECODABLE_TYPE_OIDS:
+                select_list.append(quoted)
+                fields.append((column.name, column.type_oid, self.map_to_arrow_type(column.type_name)))
+            else:
+                select_list.append(f"{quoted}::text AS {quoted}")
+                fields.append((column.name, 25, pa.string()))
+
+        where, params = build_where(filters, POSTGRES, key_column, lower, upper)
+        query = f"SELECT {', '.join(select_list)} FROM {self._qualified(table_name)}"
+        if where:
+            query += f" {where}"
+        if order_by:
+            query += " ORDER BY " + ", ".join(POSTGRES.quote_identifier(c) for c in order_by)
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        if offset:
+            query += f" OFFSET {int(offset)}"
+        return query, params, fields
+
+    async def _copy(
+        self,
+        conn,
+        query: str,
+        params: Sequence[Any],
+        fields: Sequence[Tuple[str, int, pa.DataType]],
+        batch_rows: int,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Run a binary COPY and yield decoded batches while the copy is still streaming"""
+        decoder = BinaryCopyDecoder(fields, batch_rows)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=COPY_QUEUE_BATCHES)
+        track_queue('postgres_copy', queue)
+        done = object()
+        failures: List[BaseException] = []
+
+        async def sink(chunk: bytes) -> None:
+            # Not returning holds the COPY stream, which backs up to the server
+            await governor.wait_async()
+            for batch in decoder.feed(chunk):
+                await queue.put(batch)
+
+        async def run_copy() -> None:
+            try:
+                await conn.copy_from_query(query, *params, output=sink, format='binary')
+                for batch in decoder.finish():
+                    await queue.put(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures.append(e)
+            await queue.put(done)
+
+        task = asyncio.create_task(run_copy())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+            if failures:
+                raise failures[0]
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    def _qualified(self, table_name: str) -> str:
+        if '.' in table_name:
+            return '.'.join(POSTGRES.quote_identifier(part) for part in table_name.split('.', 1))
+        return f"{POSTGRES.quote_identifier(self.schema)}.{POSTGRES.quote_identifier(table_name)}"
+
+    @staticmethod
+    def _select(columns: List[ColumnInfo], names: Optional[List[str]]) -> List[ColumnInfo]:
+        if not names:
+            return columns
+        by_name = {column.name: column for column in columns}
+        return [by_name[name] for name in names if name in by_name]
+
+
+def _snapshot_id(snapshot: str) -> str:
+    # Snapshot ids look like 00000003-0000001B-1; they cannot be bound as parameters
+    if not re.fullmatch(r'[0-9A-Fa-f-]+', snapshot):
+        raise ValueError(f"Invalid snapshot id: {snapshot}")
+    return snapshot
@@ -0,0 +1,288 @@
+"""
+Decoder for PostgreSQL ``COPY ... TO STDOUT (FORMAT binary)`` output into Arrow batches.
+
+Fixed-width columns are collected as raw big-endian bytes and converted with one numpy
+byte swap per batch; text and bytea columns are assembled straight into Arrow offset and
+data buffers. Only ``uuid`` and ``numeric`` go through Python objects. Columns of any other
+type are expected to be cast to ``text`` in the COPY query (see ``DECODABLE_TYPE_OIDS``).
+"""
+import struct
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+import pyarrow as pa
+
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+COPY_HEADER_SIZE = len(COPY_SIGNATURE) + 8  # signature, flags, extension length
+
+# Postgres stores dates and timestamps relative to 2000-01-01
+POSTGRES_EPOCH_DAYS = 10_957
+POSTGRES_EPOCH_MICROS = POSTGRES_EPOCH_DAYS * 86_400 * 1_000_000
+
+_INT16 = struct.Struct(">h")
+_INT32 = struct.Struct(">i")
+_NUMERIC_HEADER = struct.Struct(">hhHh")
+_NUMERIC_NEGATIVE = 0x4000
+
+# oid: (numpy big-endian dtype, arrow type)
+FIXED_WIDTH_TYPES = {
+    16: ("?", pa.bool_()),            # bool
+    21: (">i2", pa.int16()),          # int2
+    23: (">i4", pa.int32()),          # int4
+    20: (">i8", pa.int64()),          # int8
+    26: (">u4", pa.uint32()),         # oid
+    700: (">f4", pa.float32()),       # float4
+    701: (">f8", pa.float64()),       # float8
+    1082: (">i4", pa.date32()),       # date
+    1083: (">i8", pa.time64("us")),   # time
+    1114: (">i8", pa.timestamp("us")),  # timestamp
+    1184: (">i8", pa.timestamp("us", tz="UTC")),  # timestamptz
+}
+
+# oid: (arrow type, bytes to skip at the start of each value)
+VARIABLE_WIDTH_TYPES = {
+    25: (pa.string(), 0),     # text
+    1043: (pa.string(), 0),   # varchar
+    1042: (pa.string(), 0),   # bpchar
+    19: (pa.string(), 0),     # name
+    114: (pa.string(), 0),    # json
+    3802: (pa.string(), 1),   # jsonb, prefixed by a format version byte
+    17: (pa.binary(), 0),     # bytea
+}
+
+OBJECT_TYPES = {2950, 1700}  # uuid, numeric
+
+DECODABLE_TYPE_OIDS = set(FIXED_WIDTH_TYPES) | set(VARIABLE_WIDTH_TYPES) | OBJECT_TYPES
+
+
+class _FixedWidthColumn:
+    def __init__(self, dtype: str, arrow_type: pa.DataType):
+        self.dtype = np.dtype(dtype)
+        self.arrow_type = arrow_type
+        self.null_value = bytes(self.dtype.itemsize)
+        self.values = bytearray()
+        self.valid: List[bool] = []
+
+    def append(self, data: memoryview) -> None:
+        self.values += data
+        self.valid.append(True)
+
+    def append_null(self) -> None:
+        self.values += self.null_value
+        self.valid.append(False)
+
+    def build(self) -> pa.Array:
+        values = np.frombuffer(bytes(self.values), dtype=self.dtype).astype(self.dtype.newbyteorder("="))
+        valid = np.array(self.valid, dtype=bool)
+        if pa.types.is_date32(self.arrow_type):
+            valid &= (values != np.iinfo(np.int32).max) & (values != np.iinfo(np.int32).min)
+            values = values + POSTGRES_EPOCH_DAYS
+        elif pa.types.is_timestamp(self.arrow_type):
+            # 'infinity' / '-infinity' have no Arrow equivalent and become NULL
+            valid &= (values != np.iinfo(np.int64).max) & (values != np.iinfo(np.int64).min)
+            values = np.where(valid, values + POSTGRES_EPOCH_MICROS, 0)
+        self._reset()
+
+        if pa.types.is_boolean(self.arrow_type):
+            return pa.array(values, type=pa.bool_(), mask=~valid)
+        return pa.Array.from_buffers(
+            self.arrow_type,
+            len(values),
+            [_validity_buffer(valid), pa.py_buffer(np.ascontiguousarray(values))],
+            null_count=int(len(valid) - valid.sum()),
+        )
+
+    def _reset(self) -> None:
+        self.values = bytearray()
+        self.valid = []
+
+
+class _VariableWidthColumn:
+    def __init__(self, arrow_type: pa.DataType, skip: int):
+        self.arrow_type = arrow_type
+        self.skip = skip
+        self._reset()
+
+    def append(self, data: memoryview) -> None:
+        self.data += data[self.skip:]
+        self.offsets.append(len(self.data))
+        self.valid.append(True)
+
+    def append_null(self) -> None:
+        self.offsets.append(len(self.data))
+        self.valid.append(False)
+
+    def build(self) -> pa.Array:
+        valid = np.array(self.valid, dtype=bool)
+        offsets = np.array(self.offsets, dtype=np.int32)
+        array = pa.Array.from_buffers(
+            self.arrow_type,
+            len(valid),
+            [_validity_buffer(valid), pa.py_buffer(offsets), pa.py_buffer(bytes(self.data))],
+            null_count=int(len(valid) - valid.sum()),
+        )
+        self._reset()
+        return array
+
+    def _reset(self) -> None:
+        self.data = bytearray()
+        self.offsets = [0]
+        self.valid: List[bool] = []
+
+
+class _ObjectColumn:
+    def __init__(self, convert: Callable[[memoryview], Any], arrow_type: pa.DataType):
+        self.convert = convert
+        self.arrow_type = arrow_type
+        self.values: List[Any] = []
+
+    def append(self, data: memoryview) -> None:
+        self.values.append(self.convert(data))
+
+    def append_null(self) -> None:
+        self.values.append(None)
+
+    def build(self) -> pa.Array:
+        array = pa.array(self.values, type=self.arrow_type)
+        self.values = []
+        return array
+
+
+class BinaryCopyDecoder:
+    """
+    Incrementally decode binary COPY data into record batches of ``batch_rows`` rows.
+
+    ``fields`` are ``(name, type oid, arrow type)`` in COPY column order. Feed raw
+    chunks as they arrive with :meth:`feed`, then call :meth:`finish` for the rest.
+    """
+
+    def __init__(self, fields: Sequence[Tuple[str, int, pa.DataType]], batch_rows: int):
+        self.schema = pa.schema([pa.field(name, arrow_type) for name, _, arrow_type in fields])
+        self.batch_rows = batch_rows
+        self._columns = [_column_builder(oid, arrow_type) for _, oid, arrow_type in fields]
+        self._buffer = bytearray()
+        self._header_read = False
+        self._finished = False
+        self._rows = 0
+
+    def feed(self, chunk: bytes) -> List[pa.RecordBatch]:
+        self._buffer += chunk
+        batches: List[pa.RecordBatch] = []
+        view = memoryview(self._buffer)
+        pos = 0
+        try:
+            if not self._header_read:
+                if len(view) < COPY_HEADER_SIZE:
+                    return batches
+                if bytes(view[:len(COPY_SIGNATURE)]) != COPY_SIGNATURE:
+                    raise ValueError("Not a binary COPY stream")
+                extension = _INT32.unpack_from(view, len(COPY_SIGNATURE) + 4)[0]
+                if len(view) < COPY_HEADER_SIZE + extension:
+                    return batches
+                pos = COPY_HEADER_SIZE + extension
+                self._header_read = True
+
+            while not self._finished:
+                end = self._read_tuple(view, pos)
+                if end is None:
+                    break
+                pos = end
+                if self._rows >= self.batch_rows:
+                    batches.append(self._build_batch())
+        finally:
+            view.release()
+        del self._buffer[:pos]
+        return batches
+
+    def finish(self) -> List[pa.RecordBatch]:
+        if self._buffer and not self._finished:
+            raise ValueError("Binary COPY stream ended mid-tuple")
+        return [self._build_batch()] if self._rows else []
+
+    def _read_tuple(self, view: memoryview, pos: int) -> Optional[int]:
+        """Decode one tuple starting at ``pos``; returns the end offset or None if incomplete."""
+        size = len(view)
+        if pos + 2 > size:
+            return None
+        field_count = _INT16.unpack_from(view, pos)[0]
+        if field_count == -1:
+            self._finished = True
+            return pos + 2
+        if field_count != len(self._columns):
+            raise ValueError(f"Expected {len(self._columns)} fields, got {field_count}")
+
+        # Locate every field first so a partial tuple leaves the builders untouched.
+        cursor = pos + 2
+        spans = []
+        for _ in range(field_count):
+            if cursor + 4 > size:
+                return None
+            length = _INT32.unpack_from(view, cursor)[0]
+            cursor += 4
+            if length < 0:
+                spans.append(None)
+                continue
+            if cursor + length > size:
+                return None
+            spans.append((cursor, cursor + length))
+            cursor += length
+
+        for column, span in zip(self._columns, spans):
+            if span is None:
+                column.append_null()
+            else:
+                column.append(view[span[0]:span[1]])
+        self._rows += 1
+        return cursor
+
+    def _build_batch(self) -> pa.RecordBatch:
+        arrays = [column.build() for column in self._columns]
+        self._rows = 0
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def decode_numeric(data: memoryview) -> Optional[Decimal]:
+    """Decode a binary ``numeric``; NaN and infinities become None."""
+    ndigits, weight, sign, dscale = _NUMERIC_HEADER.unpack_from(data)
+    if sign not in (0, _NUMERIC_NEGATIVE):
+        return None
+    digits = struct.unpack_from(f">{ndigits}h", data, _NUMERIC_HEADER.size)
+    text = "".join(f"{digit:04d}" for digit in digits) or "0"
+    exponent = 4 * (weight - ndigits + 1)
+    if exponent > -dscale:
+        text += "0" * (exponent + dscale)
+    elif exponent < -dscale:
+        text = text[:len(text) - (-dscale - exponent)] or "0"
+    return Decimal((1 if sign == _NUMERIC_NEGATIVE else 0, tuple(int(c) for c in text), -dscale))
+
+
+def _decode_uuid(data: memoryview) -> str:
+    return str(UUID(bytes=bytes(data)))
+
+
+def _column_builder(oid: int, arrow_type: pa.DataType):
+    if oid in FIXED_WIDTH_TYPES:
+        dtype, _ = FIXED_WIDTH_TYPES[oid]
+        return _FixedWidthColumn(dtype, arrow_type)
+    if oid in VARIABLE_WIDTH_TYPES:
+        _, skip = VARIABLE_WIDTH_TYPES[oid]
+        return _VariableWidthColumn(arrow_type, skip)
+    if oid == 2950:
+        return _ObjectColumn(_decode_uuid, arrow_type)
+    if oid == 1700:
+        if pa.types.is_decimal(arrow_type):
+            return _ObjectColumn(decode_numeric, arrow_type)
+        return _ObjectColumn(lambda data: _numeric_text(decode_numeric(data)), arrow_type)
+    raise ValueError(f"No binary decoder for type oid {oid}; cast the column to text")
+
+
+def _numeric_text(value: Optional[Decimal]) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _validity_buffer(valid: np.ndarray) -> Optional[pa.Buffer]:
+    if valid.all():
+        return None
+    return pa.py_buffer(np.packbits(valid, bitorder="little"))
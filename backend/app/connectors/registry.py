@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, Type
+from uuid import UUID
+
+from app.connectors.dataset import DatasetConnector
+from app.connectors.hydrolix import HydrolixConnector
+from app.connectors.mysql import MySQLConnector
+from app.connectors.postgres import PostgresConnector
+from app.connectors.singlestore import SingleStoreConnector
+from app.connectors.synthetic import SyntheticConnector
+from app.core.metrics import SOURCE_POOLS, SOURCE_POOLS_OPENED
+from app.db import execute_single
+from app.schemas.database_types import DatabaseType
+
+logger = logging.getLogger(__name__)
+
+# Seconds a pool may sit unused before it is closed; db_variables.idle_timeout overrides it
+DEFAULT_IDLE_TIMEOUT = 300
+EVICTION_INTERVAL = 30
+
+CONNECTOR_TYPES: Dict[DatabaseType, Type] = {
+    DatabaseType.SINGLESTORE: SingleStoreConnector,
+    DatabaseType.MYSQL: MySQLConnector,
+    DatabaseType.POSTGRES: PostgresConnector,
+    DatabaseType.SUPABASE: PostgresConnector,
+    DatabaseType.HYDROLIX: HydrolixConnector,
+    DatabaseType.DATASET: DatasetConnector,
+    DatabaseType.SYNTHETIC: SyntheticConnector,
+}
+
+# db_type values stored by earlier versions, mapped to their current type
+LEGACY_DB_TYPES: Dict[str, DatabaseType] = {
+    'postgresql': DatabaseType.POSTGRES,
+}
+
+
+class ConnectionNotFoundError(LookupError):
+    """No stored connection exists for the requested db_uuid"""
+
+
+class UnsupportedDatabaseError(ValueError):
+    """No connector class is registered for the connection's db_type"""
+
+
+def register_connector(db_type: DatabaseType, connector_class: Type) -> None:
+    """Register the connector class used for connections of ``db_type``"""
+    CONNECTOR_TYPES[db_type] = connector_class
+
+
+@dataclass
+class _PooledConnector:
+    connector: Any
+    db_type: DatabaseType
+    idle_timeout: float
+    last_used: float
+    in_use: int = 0
+    # Set when invalidated while leased; the last lease to finish closes the pool
+    retired: bool = False
+
+
+class ConnectorRegistry:
+    """
+    Live connectors for stored connections, one warm pool per db_uuid.
+
+    Connectors are created on first use from the ``connections`` row, kept connected
+    between requests and closed once idle for ``idle_timeout`` seconds. Pool sizes
+    come from ``pool_min_size`` / ``pool_max_size`` in ``db_variables``.
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._entries: Dict[str, _PooledConnector] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._eviction_task: Optional[asyncio.Task] = None
+        SOURCE_POOLS.set_function(lambda: len(self._entries), 'open')
+        SOURCE_POOLS.set_function(
+            lambda: sum(1 for entry in list(self._entries.values()) if entry.in_use), 'leased'
+        )
+
+    @asynccontextmanager
+    async def lease(self, db_uuid: UUID) -> AsyncIterator[Any]:
+        """Borrow the connector for ``db_uuid``; it is not evicted while leased"""
+        entry = await self._acquire(str(db_uuid))
+        entry.in_use += 1
+        try:
+            yield entry.connector
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            if entry.retired and entry.in_use == 0:
+                await self._close(str(db_uuid), entry)
+
+    async def invalidate(self, db_uuid: UUID) -> None:
+        """Close the pool for ``db_uuid`` so the next lease reconnects with fresh settings"""
+        key = str(db_uuid)
+        async with self._lock_for(key):
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if entry.in_use:
+            entry.retired = True
+        else:
+            await self._close(key, entry)
+
+    async def evict_idle(self) -> int:
+        """Close pools that have been idle longer than their idle timeout"""
+        now = time.monotonic()
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry.in_use == 0 and now - entry.last_used > entry.idle_timeout
+        ]
+        for key in expired:
+            async with self._lock_for(key):
+                entry = self._entries.get(key)
+                if entry is None or entry.in_use or now - entry.last_used <= entry.idle_timeout:
+                    continue
+                del self._entries[key]
+            await self._close(key, entry)
+        return len(expired)
+
+    def start(self) -> None:
+        """Start the background idle-eviction loop"""
+        if self._eviction_task is None:
+            self._eviction_task = asyncio.create_task(self._eviction_loop())
+
+    async def close_all(self) -> None:
+        """Stop eviction and close every pool"""
+        if self._eviction_task is not None:
+            self._eviction_task.cancel()
+            self._eviction_task = None
+        entries, self._entries = self._entries, {}
+        for key, entry in entries.items():
+            await self._close(key, entry)
+
+    async def _acquire(self, key: str) -> _PooledConnector:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.last_used = time.monotonic()
+            return entry
+
+        async with self._lock_for(key):
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = await self._create(key)
+                self._entries[key] = entry
+            entry.last_used = time.monotonic()
+            return entry
+
+    async def _create(self, key: str) -> _PooledConnector:
+        row = execute_single(
+            "SELECT db_type, db_variables FROM connections WHERE db_uuid = UNHEX(REPLACE(%s, '-', ''))",
+            (key,)
+        )
+        if not row:
+            raise ConnectionNotFoundError(f"Database connection {key} not found")
+
+        try:
+            db_type = LEGACY_DB_TYPES.get(row['db_type']) or DatabaseType(row['db_type'])
+        except ValueError:
+            raise UnsupportedDatabaseError(f"Unsupported database type: {row['db_type']}")
+        connector_class = CONNECTOR_TYPES.get(db_type)
+        if connector_class is None:
+            raise UnsupportedDatabaseError(f"No connector available for database type: {db_type.value}")
+
+        db_variables = row['db_variables']
+        if isinstance(db_variables, str):
+            db_variables = json.loads(db_variables)
+        db_variables = db_variables or {}
+
+        connector = connector_class(db_variables)
+        await connector.connect()
+        SOURCE_POOLS_OPENED.labels(db_type.value).inc()
+        logger.info(f"Opened {db_type.value} connector pool for {key}")
+        return _PooledConnector(
+            connector=connector,
+            db_type=db_type,
+            idle_timeout=float(db_variables.get('idle_timeout', self.idle_timeout)),
+            last_used=time.monotonic(),
+        )
+
+    async def _close(self, key: str, entry: _PooledConnector) -> None:
+        try:
+            await entry.connector.disconnect()
+            logger.info(f"Closed {entry.db_type.value} connector pool for {key}")
+        except Exception as e:
+            logger.error(f"Error closing connector pool for {key}: {str(e)}")
+
+    def _lock_for(self, key: str) -> asyncio.Lock:
+        return self._locks.setdefault(key, asyncio.Lock())
+
+    async def _eviction_loop(self) -> None:
+        while True:
+            await asyncio.sleep(EVICTION_INTERVAL)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.error(f"Connector eviction failed: {str(e)}")
+
+
+connector_registry = ConnectorRegistry()
@@ -1,17 +1,52 @@
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 import aiomysql
 from app.core.config import settings
 import pandas as pd
-import time
+import pyarrow as pa
+from app.connectors.sql import MYSQL, build_select, build_where, validate_projection as check_projection
+import app.core.pipeline  # noqa: F401
+from services.memory import governor
+from services.tracing import span, tracer
+
+DEFAULT_STREAM_BATCH_ROWS = 50_000
+
+# Arrow types for the Parquet type names produced by map_to_parquet_type
+PARQUET_TO_ARROW_TYPES = {
+    'INT8': pa.int8(),
+    'INT16': pa.int16(),
+    'INT32': pa.int32(),
+    'INT64': pa.int64(),
+    'FLOAT': pa.float32(),
+    'DOUBLE': pa.float64(),
+    'STRING': pa.string(),
+    'BINARY': pa.binary(),
+    'DATE': pa.date32(),
+    'TIMESTAMP': pa.timestamp('us'),
+    'TIME': pa.duration('us'),  # the driver returns TIME values as timedelta
+    'BOOLEAN': pa.bool_(),
+}
+
+UNSIGNED_ARROW_TYPES = {
+    'INT8': pa.uint8(),
+    'INT16': pa.uint16(),
+    'INT32': pa.uint32(),
+    'INT64': pa.uint64(),
+}
 
 class SingleStoreConnector:
+    # Connectors sharing a dialect compute identical SQL range checksums
+    checksum_dialect = 'mysql'
+
     def __init__(self, config: Dict[str, Any]):
         self.host = config.get('host', settings.SINGLESTORE_HOST)
         self.port = int(config.get('port', settings.SINGLESTORE_PORT))
         self.user = config.get('username', settings.SINGLESTORE_USERNAME)
         self.password = config.get('password', settings.SINGLESTORE_PASSWORD)
         self.database = config.get('database', settings.SINGLESTORE_DATABASE)
+        self.pool_min_size = int(config.get('pool_min_size', 1))
+        self.pool_max_size = int(config.get('pool_max_size', 10))
         self.pool = None
+        self._schema_cache: Dict[str, Dict[str, str]] = {}
 
     async def connect(self) -> None:
         self.pool = await aiomysql.create_pool(
@@ -20,6 +55,8 @@ class SingleStoreConnector:
             user=self.user,
             password=self.password,
             db=self.database,
+            minsize=self.pool_min_size,
+            maxsize=self.pool_max_size,
             autocommit=True
         )
 
@@ -49,16 +86,20 @@ class SingleStoreConnector:
             print(f"Error getting tables: {str(e)}")
             return []
         
-    async def get_table_schema(self, table_name: str) -> Dict[str, str]:
-        """Get schema information for a specific table"""
+    async def get_table_schema(self, table_name: str, refresh: bool = False) -> Dict[str, str]:
+        """Get schema information for a specific table (cached per connector)"""
+        if not refresh and table_name in self._schema_cache:
+            return self._schema_cache[table_name]
         try:
             async with self.pool.acquire() as conn:
                 async with conn.cursor() as cur:
-                    await cur.execute(f"DESCRIBE {table_name}")
+                    await cur.execute(f"DESCRIBE {MYSQL.quote_identifier(table_name)}")
                     columns = await cur.fetchall()
                     schema = {}
                     for col in columns:
                         schema[col[0]] = col[1]
+                    if schema:
+                        self._schema_cache[table_name] = schema
                     return schema
         except Exception as e:
             print(f"Error getting schema for table {table_name}: {str(e)}")
@@ -69,33 +110,258 @@ class SingleStoreConnector:
         try:
             async with self.pool.acquire() as conn:
                 async with conn.cursor() as cur:
-                    await cur.execute(f"SELECT COUNT(*) FROM {table_name}")
+                    await cur.execute(f"SELECT COUNT(*) FROM {MYSQL.quote_identifier(table_name)}")
                     result = await cur.fetchone()
                     return result[0] if result else 0
         except Exception as e:
             print(f"Error getting row count for table {table_name}: {str(e)}")
             return 0
         
+    async def get_table_sizes(self) -> Dict[str, Tuple[int, int]]:
+        """Get approximate (row count, data bytes) for every table from table statistics"""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute("""
+                        SELECT TABLE_NAME, TABLE_ROWS, DATA_LENGTH
+                        FROM INFORMATION_SCHEMA.TABLES
+                        WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'BASE TABLE'
+                    """, (self.database,))
+                    rows = await cur.fetchall()
+                    return {row[0]: (int(row[1] or 0), int(row[2] or 0)) for row in rows}
+        except Exception as e:
+            print(f"Error getting table sizes: {str(e)}")
+            return {}
+
+    async def estimate_row_count(self, table_name: str) -> int:
+        """Get the approximate row count from table statistics, falling back to COUNT(*)"""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute("""
+                        SELECT TABLE_ROWS
+                        FROM INFORMATION_SCHEMA.TABLES
+                        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+                    """, (self.database, table_name))
+                    result = await cur.fetchone()
+                    if result and result[0] is not None:
+                        return int(result[0])
+        except Exception as e:
+            print(f"Error estimating row count for table {table_name}: {str(e)}")
+        return await self.get_row_count(table_name)
+        
     async def get_primary_key_columns(self, table_name: str) -> List[str]:
         """Get primary key columns for a table"""
         try:
             async with self.pool.acquire() as conn:
                 async with conn.cursor() as cur:
-                    await cur.execute(f"""
+                    await cur.execute("""
                         SELECT COLUMN_NAME 
                         FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE 
-                        WHERE TABLE_SCHEMA = '{self.database}' 
-                        AND TABLE_NAME = '{table_name}' 
+                        WHERE TABLE_SCHEMA = %s 
+                        AND TABLE_NAME = %s 
                         AND CONSTRAINT_NAME = 'PRIMARY'
                         ORDER BY ORDINAL_POSITION
-                    """)
+                    """, (self.database, table_name))
                     columns = await cur.fetchall()
                     return [col[0] for col in columns]
         except Exception as e:
             print(f"Error getting primary key columns for table {table_name}: {str(e)}")
             return []
 
-    def read_table(self, table_name: str, interval: int, offset: int = 0, sort_column: str = 'id') -> pd.DataFrame:
+    async def validate_projection(
+        self,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+    ) -> None:
+        """
+        Check a column list and filter predicates against the cached table schema
+        
+        Raises:
+            ValueError: if the table is unknown or the projection or filters do not fit it
+        """
+        schema = await self.get_table_schema(table_name)
+        if not schema:
+            raise ValueError(f"Table {table_name} not found or has no columns")
+        check_projection(schema, columns, filters)
+
+    async def stream_table(
+        self,
+        table_name: str,
+        interval: Optional[int] = None,
+        offset: int = 0,
+        batch_rows: int = DEFAULT_STREAM_BATCH_ROWS,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+        order_by: Optional[List[str]] = None,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """
+        Stream a table (or a LIMIT/OFFSET window of it) as Arrow record batches
+        
+        Uses an unbuffered server-side cursor so only ``batch_rows`` rows are held
+        in memory at a time. ``columns`` and ``filters`` are pushed into the source
+        query, so only the projected columns of matching rows cross the wire.
+        Windows of one table only line up without gaps or repeats when ``order_by``
+        names a unique key.
+        """
+        if columns or filters:
+            await self.validate_projection(table_name, columns, filters)
+        query, params = build_select(
+            table_name, columns, filters, order_by=order_by, limit=interval, offset=offset
+        )
+        async for batch in self._stream_query(table_name, query, params, batch_rows):
+            yield batch
+
+    async def stream_range(
+        self,
+        table_name: str,
+        key_column: str,
+        lower: Any,
+        upper: Any,
+        columns: Optional[List[str]] = None,
+        batch_rows: int = DEFAULT_STREAM_BATCH_ROWS,
+        filters: Optional[List[Any]] = None,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Stream rows with ``lower <= key_column < upper`` as Arrow record batches"""
+        if columns or filters:
+            await self.validate_projection(table_name, columns, filters)
+        query, params = build_select(
+            table_name, columns, filters, key_column=key_column, lower=lower, upper=upper
+        )
+        async for batch in self._stream_query(table_name, query, params, batch_rows):
+            yield batch
+
+    async def get_key_bounds(self, table_name: str, key_column: str) -> Tuple[Any, Any]:
+        """Get the minimum and maximum value of a key column"""
+        key = MYSQL.quote_identifier(key_column)
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(f"SELECT MIN({key}), MAX({key}) FROM {MYSQL.quote_identifier(table_name)}")
+                result = await cur.fetchone()
+                return (result[0], result[1]) if result else (None, None)
+
+    async def checksum_range(
+        self,
+        table_name: str,
+        key_column: str,
+        lower: Any,
+        upper: Any,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+    ) -> Tuple[int, int]:
+        """
+        Compute an order-independent checksum of a key range on the server
+        
+        Returns:
+            (row count, sum of per-row 64-bit MD5 prefixes modulo 2**64)
+        """
+        if not columns:
+            columns = list((await self.get_table_schema(table_name)).keys())
+        # Length-prefixed values keep ('a|', 'b') and ('a', '|b') apart, and a NULL
+        # marker that no length prefix starts with keeps NULL apart from any string
+        row_expr = ", ".join(
+            f"IFNULL(CONCAT(LENGTH({quoted}), ':', {quoted}), 'N')"
+            for quoted in (MYSQL.quote_identifier(c) for c in sorted(columns))
+        )
+        where, params = build_where(filters, key_column=key_column, lower=lower, upper=upper)
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    f"""
+                    SELECT COUNT(*),
+                           COALESCE(SUM(CAST(CONV(LEFT(MD5(CONCAT({row_expr})), 16), 16, 10) AS UNSIGNED)), 0)
+                    FROM {MYSQL.quote_identifier(table_name)}
+                    {where}
+                    """,
+                    params,
+                )
+                row_count, checksum = await cur.fetchone()
+                return int(row_count), int(checksum) % (1 << 64)
+
+    async def _stream_query(
+        self,
+        table_name: str,
+        query: str,
+        params: Sequence[Any],
+        batch_rows: int,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Run a query on an unbuffered cursor and yield typed record batches"""
+        schema = await self.get_arrow_schema(table_name)
+
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.SSCursor) as cur:
+                await cur.execute(query, params or None)
+                columns = [desc[0] for desc in cur.description]
+                batch_schema = pa.schema([
+                    schema.field(name) if name in schema.names else pa.field(name, pa.string())
+                    for name in columns
+                ])
+                while True:
+                    # Pause at the hard memory limit, fetch smaller batches near it
+                    await governor.wait_async()
+                    rows = await cur.fetchmany(governor.batch_rows(batch_rows))
+                    if not rows:
+                        break
+                    yield rows_to_record_batch(rows, batch_schema)
+
+    async def read_table_staged(
+        self,
+        table_name: str,
+        interval: int,
+        offset: int,
+        stage,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+    ) -> Any:
+        """
+        Read a chunk into a staging buffer instead of a DataFrame
+        
+        Args:
+            table_name: Name of the table to read
+            interval: Number of rows to read
+            offset: Starting offset
+            stage: Buffer with an ``append(batch)`` method, e.g. ``services.staging.SpillBuffer``,
+                which spills to disk once its memory budget is exceeded
+            columns: Optional column projection
+            filters: Optional filter predicates, ``(column, op, value)`` objects or dicts
+            
+        Returns:
+            The filled stage
+        """
+        async for batch in self.stream_table(
+            table_name, interval, offset, columns=columns, filters=filters
+        ):
+            stage.append(batch)
+        return stage
+
+    async def get_arrow_schema(self, table_name: str, columns: Optional[List[str]] = None) -> pa.Schema:
+        """Get the Arrow schema for a table (or a column projection of it) using map_to_arrow_type"""
+        schema = await self.get_table_schema(table_name)
+        return pa.schema([
+            pa.field(column, self.map_to_arrow_type(schema[column]))
+            for column in (columns or schema.keys())
+            if column in schema
+        ])
+
+    async def get_parquet_schema(self, table_name: str, columns: Optional[List[str]] = None) -> Dict[str, str]:
+        """Get Parquet column types for a table (or a column projection of it)"""
+        schema = await self.get_table_schema(table_name)
+        return {
+            column: self.map_to_parquet_type(schema[column])
+            for column in (columns or schema.keys())
+            if column in schema
+        }
+
+    def read_table(
+        self,
+        table_name: str,
+        interval: int,
+        offset: int = 0,
+        sort_column: str = 'id',
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+    ) -> pd.DataFrame:
         """
         Read a portion of a table and return as a pandas DataFrame
         
@@ -104,49 +370,45 @@ class SingleStoreConnector:
             interval: Number of rows to read
             offset: Starting offset
             sort_column: Column to sort by if no primary key found (default: 'id')
+            columns: Optional column projection pushed into the SELECT list
+            filters: Optional filter predicates pushed into the WHERE clause
             
         Returns:
             pandas DataFrame containing the query results
         """
         try:
-            start_time = time.time()
-            
-            # Get primary key columns for sorting
-            pk_columns = self.get_primary_key_columns(table_name)
-            if not pk_columns:
-                pk_columns = [sort_column]  # Fallback to sort_column if no primary key found
-                
-            # Build ORDER BY clause
-            order_by = ", ".join(pk_columns)
-            
-            with self.pool.acquire() as conn:
-                with conn.cursor() as cur:
-                    # Get column names
-                    cur.execute(f"SELECT * FROM {table_name} LIMIT 0")
-                    columns = [desc[0] for desc in cur.description]
-                    
-                    # Read data with consistent ordering
-                    query = f"""
-                        SELECT *
-                        FROM {table_name}
-                        LIMIT {interval}
-                        OFFSET {offset}
-                    """
-                    query_start = time.time()
-                    cur.execute(query)
-                    rows = cur.fetchall()
-                    query_time = time.time() - query_start
-                    print(f"Query execution time: {query_time:.2f} seconds")
-                    
-                    # Create DataFrame directly from rows
-                    df_start = time.time()
-                    df = pd.DataFrame(rows, columns=columns)
-                    df_time = time.time() - df_start
-                    print(f"DataFrame conversion time: {df_time:.2f} seconds")
-                    
-                    total_time = time.time() - start_time
-                    print(f"Total execution time: {total_time:.2f} seconds")
-                    return df
+            with span('read_table', table=table_name, offset=offset, limit=interval) as read_span:
+                # Get primary key columns for sorting
+                pk_columns = self.get_primary_key_columns(table_name)
+                if not pk_columns:
+                    pk_columns = [sort_column]  # Fallback to sort_column if no primary key found
+
+                # Build ORDER BY clause
+                order_by = ", ".join(pk_columns)
+
+                query, params = build_select(
+                    table_name, columns, filters, limit=interval, offset=offset
+                )
+                # The whole window is materialised at once, so wait for headroom first
+                governor.wait()
+                with self.pool.acquire() as conn:
+                    with conn.cursor() as cur:
+                        # Read data with consistent ordering
+                        with span('query', table=table_name) as query_span:
+                            cur.execute(query, params or None)
+                            columns = [desc[0] for desc in cur.description]
+                            rows = cur.fetchall()
+                            query_span.add_rows(len(rows))
+
+                        # Create DataFrame directly from rows
+                        with span('convert', table=table_name) as convert_span:
+                            df = pd.DataFrame(rows, columns=columns)
+                            convert_span.add_rows(len(df))
+                            if tracer.enabled:
+                                convert_span.add_bytes(df.memory_usage(deep=True).sum())
+
+                        read_span.add_rows(len(df))
+                        return df
         except Exception as e:
             print(f"Error reading table {table_name}: {str(e)}")
             return pd.DataFrame()  # Return empty DataFrame on error
@@ -194,4 +456,47 @@ class SingleStoreConnector:
             'boolean': 'BOOLEAN'
         }
         
-        return type_mapping.get(base_type, 'STRING')  # Default to STRING if type unknown
\ No newline at end of file
+        return type_mapping.get(base_type, 'STRING')  # Default to STRING if type unknown
+
+    def map_to_arrow_type(self, singlestore_type: str) -> pa.DataType:
+        """Convert SingleStore data type to the Arrow type used for streaming reads"""
+        parquet_type = self.map_to_parquet_type(singlestore_type)
+        if parquet_type == 'DECIMAL':
+            precision, scale = _type_parameters(singlestore_type, default=(10, 0))
+            if precision <= 38:
+                return pa.decimal128(precision, scale)
+            return pa.decimal256(precision, scale)
+        if 'unsigned' in singlestore_type.lower() and parquet_type in UNSIGNED_ARROW_TYPES:
+            return UNSIGNED_ARROW_TYPES[parquet_type]
+        return PARQUET_TO_ARROW_TYPES.get(parquet_type, pa.string())
+
+
+def _type_parameters(column_type: str, default: Sequence[int]) -> Sequence[int]:
+    """Parse ``(p, s)`` style parameters from a column type, e.g. decimal(18,4)"""
+    if '(' not in column_type:
+        return default
+    inner = column_type.split('(', 1)[1].split(')', 1)[0]
+    try:
+        values = [int(part) for part in inner.split(',')]
+    except ValueError:
+        return default
+    return tuple(values + list(default[len(values):]))
+
+
+def rows_to_record_batch(rows: Sequence[Sequence[Any]], schema: pa.Schema) -> pa.RecordBatch:
+    """Build a RecordBatch from driver row tuples, one column conversion at a time"""
+    columns = list(zip(*rows))
+    arrays = []
+    for i, field in enumerate(schema):
+        values = columns[i]
+        try:
+            arrays.append(pa.array(values, type=field.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if not pa.types.is_string(field.type):
+                raise
+            # Types we map to STRING (JSON, ENUM, YEAR, ...) may arrive as other objects
+            arrays.append(pa.array(
+                [None if v is None else (v.decode() if isinstance(v, bytes) else str(v)) for v in values],
+                type=pa.string(),
+            ))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
\ No newline at end of file
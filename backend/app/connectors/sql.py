@@ -0,0 +1,168 @@
+"""SQL generation shared by the SQL source connectors (projection, filters, key ranges)"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+COMPARISON_OPERATORS = {
+    '=': '=',
+    '!=': '<>',
+    '<': '<',
+    '<=': '<=',
+    '>': '>',
+    '>=': '>=',
+}
+LIST_OPERATORS = {'in': 'IN', 'not_in': 'NOT IN'}
+NULL_OPERATORS = {'is_null': 'IS NULL', 'is_not_null': 'IS NOT NULL'}
+FILTER_OPERATORS = (
+    set(COMPARISON_OPERATORS) | set(LIST_OPERATORS) | set(NULL_OPERATORS) | {'between', 'within_days'}
+)
+
+
+class Dialect:
+    """Identifier quoting, bind placeholders and date arithmetic for one SQL dialect"""
+
+    def __init__(self, name: str, quote: str, days_ago: str):
+        self.name = name
+        self.quote = quote
+        self.days_ago = days_ago  # expression taking one placeholder for the day count
+
+    def quote_identifier(self, identifier: str) -> str:
+        return f"{self.quote}{identifier.replace(self.quote, self.quote * 2)}{self.quote}"
+
+    def placeholder(self, index: int) -> str:
+        return '%s'
+
+
+class PostgresDialect(Dialect):
+    def placeholder(self, index: int) -> str:
+        return f'${index}'
+
+
+MYSQL = Dialect('mysql', '`', "NOW() - INTERVAL {} DAY")
+POSTGRES = PostgresDialect('postgres', '"', "NOW() - ({} * INTERVAL '1 day')")
+
+
+def filter_parts(column_filter: Any) -> Tuple[str, str, Any]:
+    """Accept filters as pydantic models / objects or plain dicts"""
+    if isinstance(column_filter, dict):
+        return column_filter['column'], _operator(column_filter['op']), column_filter.get('value')
+    return column_filter.column, _operator(column_filter.op), getattr(column_filter, 'value', None)
+
+
+def validate_projection(
+    schema: Dict[str, str],
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Sequence[Any]] = None,
+) -> None:
+    """
+    Check a projection and its filters against a cached table schema
+
+    Raises:
+        ValueError: on unknown columns, unknown operators or malformed filter values
+    """
+    unknown = [c for c in (columns or []) if c not in schema]
+    if unknown:
+        raise ValueError(f"Unknown columns in projection: {', '.join(unknown)}")
+    if columns is not None and len(columns) == 0:
+        raise ValueError("Projection must select at least one column")
+
+    for column_filter in filters or []:
+        column, op, value = filter_parts(column_filter)
+        if column not in schema:
+            raise ValueError(f"Unknown column in filter: {column}")
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if op in LIST_OPERATORS and (not isinstance(value, (list, tuple)) or not value):
+            raise ValueError(f"Filter '{op}' on {column} needs a non-empty list value")
+        if op == 'between' and (not isinstance(value, (list, tuple)) or len(value) != 2):
+            raise ValueError(f"Filter 'between' on {column} needs a [low, high] value")
+        if op == 'within_days' and (not isinstance(value, (int, float)) or value <= 0):
+            raise ValueError(f"Filter 'within_days' on {column} needs a positive number of days")
+        if op in COMPARISON_OPERATORS and value is None:
+            raise ValueError(f"Filter '{op}' on {column} needs a value; use is_null for NULL checks")
+
+
+def build_where(
+    filters: Optional[Sequence[Any]] = None,
+    dialect: Dialect = MYSQL,
+    key_column: Optional[str] = None,
+    lower: Any = None,
+    upper: Any = None,
+    start_index: int = 1,
+) -> Tuple[str, List[Any]]:
+    """
+    Render filters and an optional ``lower <= key < upper`` range as a WHERE clause
+
+    Returns:
+        (clause including the WHERE keyword or an empty string, bind parameters)
+    """
+    conditions: List[str] = []
+    params: List[Any] = []
+
+    def bind(value: Any) -> str:
+        params.append(value)
+        return dialect.placeholder(start_index + len(params) - 1)
+
+    if key_column is not None:
+        key = dialect.quote_identifier(key_column)
+        if lower is not None:
+            conditions.append(f"{key} >= {bind(lower)}")
+        if upper is not None:
+            conditions.append(f"{key} < {bind(upper)}")
+
+    for column_filter in filters or []:
+        column, op, value = filter_parts(column_filter)
+        quoted = dialect.quote_identifier(column)
+        if op in COMPARISON_OPERATORS:
+            conditions.append(f"{quoted} {COMPARISON_OPERATORS[op]} {bind(value)}")
+        elif op in LIST_OPERATORS:
+            values = ", ".join(bind(v) for v in value)
+            conditions.append(f"{quoted} {LIST_OPERATORS[op]} ({values})")
+        elif op in NULL_OPERATORS:
+            conditions.append(f"{quoted} {NULL_OPERATORS[op]}")
+        elif op == 'between':
+            conditions.append(f"{quoted} BETWEEN {bind(value[0])} AND {bind(value[1])}")
+        elif op == 'within_days':
+            conditions.append(f"{quoted} >= {dialect.days_ago.format(bind(value))}")
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+
+    if not conditions:
+        return "", params
+    return "WHERE " + " AND ".join(conditions), params
+
+
+def build_select(
+    table_name: str,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Sequence[Any]] = None,
+    dialect: Dialect = MYSQL,
+    key_column: Optional[str] = None,
+    lower: Any = None,
+    upper: Any = None,
+    order_by: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> Tuple[str, List[Any]]:
+    """Build a parameterized SELECT with projection, filters, key range and paging"""
+    select_list = ", ".join(dialect.quote_identifier(c) for c in columns) if columns else "*"
+    where, params = build_where(filters, dialect, key_column, lower, upper)
+
+    query = f"SELECT {select_list} FROM {dialect.quote_identifier(table_name)}"
+    if where:
+        query += f" {where}"
+    if order_by:
+        query += " ORDER BY " + ", ".join(dialect.quote_identifier(c) for c in order_by)
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+        if offset:
+            query += f" OFFSET {int(offset)}"
+    elif offset:
+        if dialect is MYSQL:
+            # MySQL syntax has no OFFSET without LIMIT; use the maximum row count
+            query += f" LIMIT 18446744073709551615 OFFSET {int(offset)}"
+        else:
+            query += f" OFFSET {int(offset)}"
+    return query, params
+
+
+def _operator(op: Any) -> str:
+    return getattr(op, 'value', op)
@@ -0,0 +1,290 @@
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from app.connectors.base import SourceConnector
+
+DEFAULT_ROWS = 1_000_000
+DEFAULT_STREAM_BATCH_ROWS = 65_536
+# Rows are generated in fixed blocks seeded by (seed, block index), so any window of a
+# table is identical no matter how it is read or batched.
+BLOCK_ROWS = 65_536
+EPOCH_MICROS = 1_700_000_000 * 1_000_000
+
+
+@dataclass(frozen=True)
+class SyntheticColumn:
+    name: str
+    kind: str  # id, int, float, string, category, zipf_int, timestamp, decimal, json, bool
+    null_fraction: float = 0.0
+    cardinality: int = 1_000
+    width: int = 12
+
+
+def _profile_wide() -> List[SyntheticColumn]:
+    columns = [SyntheticColumn('id', 'id')]
+    kinds = ('int', 'float', 'string', 'timestamp')
+    for i in range(199):
+        columns.append(SyntheticColumn(f'c{i:03d}', kinds[i % len(kinds)], cardinality=10_000))
+    return columns
+
+
+PROFILES: Dict[str, List[SyntheticColumn]] = {
+    'narrow': [
+        SyntheticColumn('id', 'id'),
+        SyntheticColumn('value', 'int'),
+        SyntheticColumn('score', 'float'),
+        SyntheticColumn('created_at', 'timestamp'),
+    ],
+    'wide': _profile_wide(),
+    'skewed': [
+        SyntheticColumn('id', 'id'),
+        SyntheticColumn('tenant', 'category', cardinality=50_000),
+        SyntheticColumn('event_type', 'category', cardinality=200),
+        SyntheticColumn('user_id', 'zipf_int', cardinality=1_000_000),
+        SyntheticColumn('latency_ms', 'float'),
+        SyntheticColumn('created_at', 'timestamp'),
+    ],
+    'null_heavy': [SyntheticColumn('id', 'id')] + [
+        SyntheticColumn(f'n{i:02d}', ('int', 'float', 'string', 'bool')[i % 4], null_fraction=0.7)
+        for i in range(20)
+    ],
+    'decimal_json': [
+        SyntheticColumn('id', 'id'),
+        SyntheticColumn('amount', 'decimal'),
+        SyntheticColumn('tax', 'decimal'),
+        SyntheticColumn('balance', 'decimal'),
+        SyntheticColumn('payload', 'json'),
+        SyntheticColumn('attributes', 'json', null_fraction=0.2),
+        SyntheticColumn('created_at', 'timestamp'),
+    ],
+}
+
+ARROW_TYPES = {
+    'id': pa.int64(),
+    'int': pa.int64(),
+    'zipf_int': pa.int64(),
+    'float': pa.float64(),
+    'string': pa.string(),
+    'category': pa.string(),
+    'json': pa.string(),
+    'bool': pa.bool_(),
+    'timestamp': pa.timestamp('us'),
+    'decimal': pa.decimal128(18, 2),
+}
+
+SOURCE_TYPES = {
+    'id': 'bigint',
+    'int': 'bigint',
+    'zipf_int': 'bigint',
+    'float': 'double',
+    'string': 'varchar(255)',
+    'category': 'varchar(255)',
+    'json': 'json',
+    'bool': 'tinyint(1)',
+    'timestamp': 'datetime(6)',
+    'decimal': 'decimal(18,2)',
+}
+
+
+class SyntheticConnector(SourceConnector):
+    """
+    Deterministic, offline source of generated tables for benchmarks.
+
+    Every profile in ``PROFILES`` is exposed as a table of ``rows`` rows. Columns are
+    built with vectorized numpy / Arrow kernels, and each block of rows is seeded from
+    ``(seed, block index)``, so reads are reproducible across runs and commits.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.rows = int(config.get('rows', DEFAULT_ROWS))
+        self.seed = int(config.get('seed', 0))
+        self.profiles: Dict[str, List[SyntheticColumn]] = dict(PROFILES)
+        self.profiles.update(config.get('profiles') or {})
+        self._vocabularies: Dict[Tuple[str, int, int], pa.Array] = {}
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def test_connection(self) -> bool:
+        return True
+
+    async def get_schema(self) -> Dict[str, Any]:
+        return {table: await self.get_table_schema(table) for table in self.profiles}
+
+    async def read_data(self, query: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError("The synthetic source does not run SQL")
+
+    async def get_tables(self) -> List[str]:
+        return list(self.profiles)
+
+    async def get_table_schema(self, table_name: str) -> Dict[str, str]:
+        return {column.name: SOURCE_TYPES[column.kind] for column in self.profiles.get(table_name, [])}
+
+    async def get_row_count(self, table_name: str) -> int:
+        return self.rows if table_name in self.profiles else 0
+
+    async def estimate_row_count(self, table_name: str) -> int:
+        return await self.get_row_count(table_name)
+
+    async def get_table_sizes(self) -> Dict[str, Tuple[int, int]]:
+        sizes = {}
+        for table in self.profiles:
+            sample = self.generate(table, 0, min(self.rows, 1_000))
+            row_bytes = sample.nbytes / max(sample.num_rows, 1)
+            sizes[table] = (self.rows, int(row_bytes * self.rows))
+        return sizes
+
+    async def get_primary_key_columns(self, table_name: str) -> List[str]:
+        return ['id']
+
+    async def get_key_bounds(self, table_name: str, key_column: str) -> Tuple[Any, Any]:
+        return (0, self.rows - 1) if self.rows else (None, None)
+
+    async def get_arrow_schema(self, table_name: str, columns: Optional[List[str]] = None) -> pa.Schema:
+        selected = self._columns(table_name, columns)
+        return pa.schema([pa.field(c.name, ARROW_TYPES[c.kind]) for c in selected])
+
+    async def stream_table(
+        self,
+        table_name: str,
+        interval: Optional[int] = None,
+        offset: int = 0,
+        batch_rows: int = DEFAULT_STREAM_BATCH_ROWS,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+        order_by: Optional[List[str]] = None,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Yield generated batches for rows ``[offset, offset + interval)``, always in ``id`` order"""
+        if filters:
+            raise ValueError("The synthetic source does not support filters")
+        end = self.rows if interval is None else min(self.rows, offset + interval)
+        for start in range(offset, end, batch_rows):
+            yield self.generate(table_name, start, min(batch_rows, end - start), columns)
+
+    async def stream_range(
+        self,
+        table_name: str,
+        key_column: str,
+        lower: Any,
+        upper: Any,
+        columns: Optional[List[str]] = None,
+        batch_rows: int = DEFAULT_STREAM_BATCH_ROWS,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """``id`` equals the row number, so key ranges map directly onto row windows"""
+        lower = 0 if lower is None else max(int(lower), 0)
+        upper = self.rows if upper is None else min(int(upper), self.rows)
+        async for batch in self.stream_table(table_name, upper - lower, lower, batch_rows, columns):
+            yield batch
+
+    def read_table(self, table_name: str, interval: int, offset: int = 0, sort_column: str = 'id') -> pd.DataFrame:
+        """Generate a window of a table as a pandas DataFrame"""
+        count = max(0, min(interval, self.rows - offset))
+        return self.generate(table_name, offset, count).to_pandas()
+
+    def generate(
+        self,
+        table_name: str,
+        offset: int,
+        count: int,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pa.RecordBatch:
+        """Generate rows ``[offset, offset + count)`` of a table"""
+        selected = self._columns(table_name, columns)
+        schema = pa.schema([pa.field(c.name, ARROW_TYPES[c.kind]) for c in selected])
+        if count <= 0:
+            return pa.RecordBatch.from_pylist([], schema=schema)
+
+        first_block = offset // BLOCK_ROWS
+        last_block = (offset + count - 1) // BLOCK_ROWS
+        blocks = [self._block(table_name, index, selected) for index in range(first_block, last_block + 1)]
+        table = pa.Table.from_batches(blocks, schema=schema)
+        return table.slice(offset - first_block * BLOCK_ROWS, count).combine_chunks().to_batches()[0]
+
+    def _columns(self, table_name: str, columns: Optional[Sequence[str]]) -> List[SyntheticColumn]:
+        if table_name not in self.profiles:
+            raise ValueError(f"Unknown synthetic table: {table_name}")
+        profile = self.profiles[table_name]
+        if not columns:
+            return profile
+        by_name = {column.name: column for column in profile}
+        unknown = [name for name in columns if name not in by_name]
+        if unknown:
+            raise ValueError(f"Unknown columns in projection: {', '.join(unknown)}")
+        return [by_name[name] for name in columns]
+
+    def _block(self, table_name: str, index: int, columns: List[SyntheticColumn]) -> pa.RecordBatch:
+        profile = self.profiles[table_name]
+        arrays = []
+        for column in columns:
+            # Seeded per column, so a column's values do not depend on the projection
+            rng = np.random.default_rng([self.seed, index, profile.index(column), *table_name.encode()])
+            arrays.append(self._generate_column(column, rng, index * BLOCK_ROWS, BLOCK_ROWS))
+        return pa.RecordBatch.from_arrays(arrays, names=[c.name for c in columns])
+
+    def _generate_column(self, column: SyntheticColumn, rng: np.random.Generator, start: int, count: int) -> pa.Array:
+        kind = column.kind
+        if kind == 'id':
+            return pa.array(np.arange(start, start + count, dtype=np.int64))
+
+        mask = rng.random(count) < column.null_fraction if column.null_fraction else None
+        if kind == 'int':
+            values = pa.array(rng.integers(-1_000_000, 1_000_000, count, dtype=np.int64), mask=mask)
+        elif kind == 'zipf_int':
+            values = pa.array(np.minimum(rng.zipf(1.3, count), column.cardinality).astype(np.int64), mask=mask)
+        elif kind == 'float':
+            values = pa.array(rng.standard_normal(count) * 100.0, mask=mask)
+        elif kind == 'bool':
+            values = pa.array(rng.random(count) < 0.5, mask=mask)
+        elif kind == 'timestamp':
+            micros = EPOCH_MICROS + (start + np.arange(count, dtype=np.int64)) * 1_000_000 \
+                + rng.integers(0, 1_000_000, count, dtype=np.int64)
+            values = pa.array(micros, type=pa.timestamp('us'), mask=mask)
+        elif kind == 'decimal':
+            unscaled = rng.integers(-10_000_000_00, 10_000_000_00, count, dtype=np.int64)
+            # decimal128 values are 16-byte little-endian two's complement integers
+            words = np.empty((count, 2), dtype=np.int64)
+            words[:, 0] = unscaled
+            words[:, 1] = unscaled >> 63
+            values = pa.Array.from_buffers(pa.decimal128(18, 2), count, [None, pa.py_buffer(words)])
+        elif kind == 'string':
+            indices = rng.integers(0, column.cardinality, count)
+            values = self._vocabulary(column).take(pa.array(indices))
+        elif kind == 'category':
+            # Zipf-distributed picks: a few hot values and a long tail
+            indices = np.minimum(rng.zipf(1.2, count), column.cardinality) - 1
+            values = self._vocabulary(column).take(pa.array(indices))
+        elif kind == 'json':
+            user = pc.cast(pa.array(rng.integers(0, 1_000_000, count)), pa.string())
+            score = pc.cast(pa.array(np.round(rng.random(count) * 100, 3)), pa.string())
+            tags = self._vocabulary(SyntheticColumn(column.name, 'string', cardinality=64, width=6)).take(
+                pa.array(rng.integers(0, 64, count))
+            )
+            values = pc.binary_join_element_wise(
+                '{"user_id": ', user, ', "score": ', score, ', "tag": "', tags, '"}', ''
+            )
+        else:
+            raise ValueError(f"Unknown synthetic column kind: {kind}")
+
+        if mask is not None and kind in ('string', 'category', 'json', 'decimal'):
+            values = pc.if_else(pa.array(mask), pa.scalar(None, values.type), values)
+        return values
+
+    def _vocabulary(self, column: SyntheticColumn) -> pa.Array:
+        key = (column.name, column.cardinality, column.width)
+        if key not in self._vocabularies:
+            rng = np.random.default_rng([self.seed, column.cardinality, column.width])
+            letters = rng.integers(ord('a'), ord('z') + 1, (column.cardinality, column.width), dtype=np.uint8)
+            data = letters.tobytes()
+            offsets = np.arange(0, column.cardinality * column.width + 1, column.width, dtype=np.int32)
+            self._vocabularies[key] = pa.Array.from_buffers(
+                pa.string(), column.cardinality, [None, pa.py_buffer(offsets), pa.py_buffer(data)]
+            )
+        return self._vocabularies[key]
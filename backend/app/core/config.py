@@ -10,6 +10,28 @@ class Settings(BaseSettings):
     SINGLESTORE_PASSWORD: str = os.getenv("SINGLESTORE_PASSWORD", "")
     SINGLESTORE_DATABASE: str = os.getenv("SINGLESTORE_DATABASE", "epic_shelter")
 
+    # Hydrolix Settings
+    HYDROLIX_API_URL: str = os.getenv("HYDROLIX_API_URL", "")
+    HYDROLIX_TOKEN: str = os.getenv("HYDROLIX_TOKEN", "")
+    HYDROLIX_ORG_ID: str = os.getenv("HYDROLIX_ORG_ID", "")
+    HYDROLIX_PROJECT_ID: str = os.getenv("HYDROLIX_PROJECT_ID", "")
+    HYDROLIX_MAX_CONCURRENT_UPLOADS: int = int(os.getenv("HYDROLIX_MAX_CONCURRENT_UPLOADS", "4"))
+    HYDROLIX_MAX_RETRIES: int = int(os.getenv("HYDROLIX_MAX_RETRIES", "5"))
+
+    # Span exporters to enable: comma-separated "log", "buffer", "metrics", "prometheus"
+    # (empty disables tracing); "prometheus" feeds per-stage rows/bytes/latency to /metrics
+    TRACING_EXPORTERS: str = os.getenv("TRACING_EXPORTERS", "prometheus")
+
+    # Process memory budget shared by all migrations (0: 75% of the host or cgroup limit)
+    MEMORY_BUDGET_BYTES: int = int(os.getenv("MEMORY_BUDGET_BYTES", "0"))
+
+    # migration_metrics rollups: seconds between passes (0 disables) and retention in
+    # days per resolution (0 keeps forever)
+    METRICS_ROLLUP_INTERVAL_SECONDS: int = int(os.getenv("METRICS_ROLLUP_INTERVAL_SECONDS", "60"))
+    METRICS_RAW_RETENTION_DAYS: int = int(os.getenv("METRICS_RAW_RETENTION_DAYS", "7"))
+    METRICS_1M_RETENTION_DAYS: int = int(os.getenv("METRICS_1M_RETENTION_DAYS", "30"))
+    METRICS_1H_RETENTION_DAYS: int = int(os.getenv("METRICS_1H_RETENTION_DAYS", "730"))
+
     class Config:
         case_sensitive = True
         env_file = ".env"
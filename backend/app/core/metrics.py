@@ -0,0 +1,341 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Updates are lock-free on the hot path: every labelled series keeps one shard per
+thread, and a thread only ever writes its own shard, so an increment or observation is
+a thread-local lookup plus a list-element add. A scrape sums the shards. Locks are
+taken only when a thread first touches a series or when a new label set is created.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+import threading
+import time
+import weakref
+
+import app.core.pipeline  # noqa: F401
+from services.memory import current_rss
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond metadata queries up to multi-minute pipeline stages
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+class _Sharded:
+    """A fixed-size vector of floats with one copy per writing thread"""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> List[float]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = [0.0] * self._size
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0.0] * self._size
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild:
+    def __init__(self):
+        self._values = _Sharded(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] += amount
+
+    def get(self) -> float:
+        return self._values.totals()[0]
+
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] -= amount
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # Per-bucket counts (plus +Inf), then sum, then count
+        self._values = _Sharded(len(buckets) + 3)
+
+    def observe(self, value: float) -> None:
+        shard = self._values.shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def get(self) -> Tuple[List[float], float, float]:
+        totals = self._values.totals()
+        return totals[:-2], totals[-2], totals[-1]
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str, **kwargs: str):
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        return self.labels()
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+    def _series(self):
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            yield dict(zip(self.labelnames, key)), child
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def samples(self):
+        for labels, child in self._series():
+            yield self.name + '_total', labels, child.get()
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float], *values: str) -> None:
+        """Read the value from ``function`` at scrape time instead of tracking it"""
+        self._functions[tuple(str(value) for value in values)] = function
+
+    def samples(self):
+        for labels, child in self._series():
+            yield self.name, labels, child.get()
+        for key, function in list(self._functions.items()):
+            try:
+                value = float(function())
+            except Exception:
+                continue
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def samples(self):
+        for labels, child in self._series():
+            counts, total, count = child.get()
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield self.name + '_bucket', {**labels, 'le': _format_bound(bound)}, cumulative
+            yield self.name + '_sum', labels, total
+            yield self.name + '_count', labels, count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{_escape_label(str(value))}"' for key, value in labels.items())
+    return '{' + pairs + '}'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template',
+    ('method', 'route', 'status'),
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    'http_requests_in_progress', 'HTTP requests currently being served',
+)
+DB_QUERY_SECONDS = registry.histogram(
+    'metadata_db_query_duration_seconds', 'Metadata database statement latency by operation',
+    ('operation',),
+)
+DB_QUERY_ERRORS = registry.counter(
+    'metadata_db_query_errors', 'Metadata database statements that raised', ('operation',),
+)
+DB_CONNECT_SECONDS = registry.histogram(
+    'metadata_db_connect_duration_seconds', 'Time to open a metadata database connection',
+)
+DB_CONNECTIONS_OPENED = registry.counter(
+    'metadata_db_connections_opened', 'Metadata database connections opened',
+)
+DB_CONNECTIONS_OPEN = registry.gauge(
+    'metadata_db_connections_open', 'Metadata database connections currently open',
+)
+SOURCE_POOLS = registry.gauge(
+    'connector_pools', 'Warm connector pools held by the registry', ('state',),
+)
+SOURCE_POOLS_OPENED = registry.counter(
+    'connector_pools_opened', 'Connector pools opened by the registry', ('db_type',),
+)
+QUEUE_DEPTH = registry.gauge(
+    'pipeline_queue_depth', 'Batches buffered in pipeline queues', ('queue',),
+)
+STAGE_SECONDS = registry.histogram(
+    'pipeline_stage_duration_seconds', 'Pipeline stage latency from tracing spans', ('stage',),
+)
+STAGE_ROWS = registry.counter('pipeline_stage_rows', 'Rows handled per pipeline stage', ('stage',))
+STAGE_BYTES = registry.counter('pipeline_stage_bytes', 'Bytes handled per pipeline stage', ('stage',))
+STAGE_ERRORS = registry.counter('pipeline_stage_errors', 'Pipeline stage spans that raised', ('stage',))
+PROCESS_RSS = registry.gauge('process_resident_memory_bytes', 'Resident memory size in bytes')
+PROCESS_RSS.set_function(current_rss)
+MEMORY = registry.gauge(
+    'memory_governor_bytes', 'Memory governor budget, RSS, Arrow pool and reserved bytes', ('kind',),
+)
+MEMORY_PRESSURE = registry.gauge(
+    'memory_governor_pressure', 'Memory pressure level: 0 ok, 1 shrink/spill, 2 pause',
+)
+PROCESS_THREADS = registry.gauge('process_threads', 'Live Python threads')
+PROCESS_THREADS.set_function(threading.active_count)
+
+_tracked_queues: Dict[str, "weakref.WeakSet[Any]"] = {}
+
+
+def track_queue(name: str, queue: Any) -> None:
+    """
+    Report ``queue`` (anything with ``qsize()``) under ``pipeline_queue_depth{queue=name}``
+
+    Depth is read at scrape time and summed over all live queues sharing the name; the
+    queue is held weakly, so nothing needs to be undone when it goes away.
+    """
+    queues = _tracked_queues.get(name)
+    if queues is None:
+        queues = _tracked_queues.setdefault(name, weakref.WeakSet())
+        QUEUE_DEPTH.set_function(lambda: sum(q.qsize() for q in list(queues)), name)
+    queues.add(queue)
@@ -0,0 +1,13 @@
+"""
+Make the repository-level ``services`` package (Parquet, staging, verification, ...)
+importable from the backend, which runs with ``backend/`` as its working directory.
+
+Import this module before any ``services.*`` import.
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
@@ -1,7 +1,17 @@
 import singlestoredb as s2
 from contextlib import contextmanager
 from fastapi import HTTPException
+from functools import wraps
 import logging
+import time
+from app.core.metrics import (
+    DB_CONNECT_SECONDS,
+    DB_CONNECTIONS_OPEN,
+    DB_CONNECTIONS_OPENED,
+    DB_QUERY_ERRORS,
+    DB_QUERY_SECONDS,
+)
+from app.rows import decoder
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +32,7 @@ def init_db():
             # Create connections table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS connections (
-                    db_uuid VARCHAR(36) PRIMARY KEY,
+                    db_uuid BINARY(16) PRIMARY KEY,
                     db_name VARCHAR(255) NOT NULL,
                     db_type VARCHAR(50) NOT NULL,
                     db_variables JSON,
@@ -33,10 +43,10 @@ def init_db():
             # Create migrations table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS migrations (
-                    migration_uuid VARCHAR(36) PRIMARY KEY,
+                    migration_uuid BINARY(16) PRIMARY KEY,
                     migration_name VARCHAR(255) NOT NULL,
-                    source_uuid VARCHAR(36) NOT NULL,
-                    target_uuid VARCHAR(36) NOT NULL,
+                    source_uuid BINARY(16) NOT NULL,
+                    target_uuid BINARY(16) NOT NULL,
                     source_type VARCHAR(50) NOT NULL,
                     target_type VARCHAR(50) NOT NULL,
                     status VARCHAR(50) NOT NULL,
@@ -45,14 +55,17 @@ def init_db():
                     time_start DATETIME,
                     time_finish DATETIME,
                     last_run DATETIME,
-                    creation_time DATETIME NOT NULL
+                    creation_time DATETIME NOT NULL,
+                    source_table VARCHAR(255),
+                    source_columns JSON,
+                    source_filters JSON
                 )
             """)
 
             # Create job_chunks table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS job_chunks (
-                    migration_uuid VARCHAR(36),
+                    migration_uuid BINARY(16),
                     chunk_id INT,
                     is_completed BOOLEAN DEFAULT FALSE,
                     created_at DATETIME NOT NULL,
@@ -62,15 +75,32 @@ def init_db():
                 )
             """)
 
+            # Create chunk_fingerprints table (source content per chunk key range,
+            # used to skip unchanged ranges on recurring full refreshes)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chunk_fingerprints (
+                    migration_uuid BINARY(16),
+                    chunk_id INT,
+                    range_start BIGINT NOT NULL,
+                    range_end BIGINT NOT NULL,
+                    row_count BIGINT NOT NULL,
+                    content_hash BIGINT UNSIGNED NOT NULL,
+                    computed_at DATETIME NOT NULL,
+                    PRIMARY KEY (migration_uuid, chunk_id)
+                )
+            """)
+
             # Create migration_logs table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS migration_logs (
                     log_id INT AUTO_INCREMENT PRIMARY KEY,
-                    migration_uuid VARCHAR(36),
+                    migration_uuid BINARY(16),
                     chunk_id INT,
                     log_level VARCHAR(20),
                     message TEXT,
-                    timestamp DATETIME NOT NULL
+                    timestamp DATETIME NOT NULL,
+                    KEY idx_migration_logs_migration_time (migration_uuid, timestamp),
+                    KEY idx_migration_logs_migration_log (migration_uuid, log_id)
                 )
             """)
 
@@ -78,26 +108,89 @@ def init_db():
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS migration_metrics (
                     metric_id INT AUTO_INCREMENT PRIMARY KEY,
-                    migration_uuid VARCHAR(36),
+                    migration_uuid BINARY(16),
                     chunk_id INT,
                     records_processed INT,
                     bytes_processed BIGINT,
                     processing_time INT, -- in milliseconds
-                    timestamp DATETIME NOT NULL
+                    timestamp DATETIME NOT NULL,
+                    KEY idx_migration_metrics_migration_time (migration_uuid, timestamp),
+                    KEY idx_migration_metrics_time (timestamp)
                 )
             """)
 
+            # Create 1-minute and 1-hour metric rollups (see app/metrics_rollup.py)
+            for table in ('migration_metrics_1m', 'migration_metrics_1h'):
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        migration_uuid BINARY(16),
+                        bucket_start DATETIME NOT NULL,
+                        chunks INT NOT NULL,
+                        records_processed BIGINT,
+                        bytes_processed BIGINT,
+                        processing_time BIGINT, -- summed, in milliseconds
+                        max_processing_time INT,
+                        PRIMARY KEY (migration_uuid, bucket_start),
+                        KEY idx_{table}_time (bucket_start)
+                    )
+                """)
+
+            # Create metrics_rollup_state table (last migration_metrics row rolled up)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS metrics_rollup_state (
+                    name VARCHAR(32) PRIMARY KEY,
+                    last_metric_id BIGINT NOT NULL,
+                    updated_at DATETIME NOT NULL
+                )
+            """)
+
+            # Columns added to migrations after its first release
+            _ensure_column(cursor, 'migrations', 'source_table', 'VARCHAR(255)')
+            _ensure_column(cursor, 'migrations', 'source_columns', 'JSON')
+            _ensure_column(cursor, 'migrations', 'source_filters', 'JSON')
+
+            # Tables created before these indexes existed
+            _ensure_index(cursor, 'migration_logs', 'idx_migration_logs_migration_time', 'migration_uuid, timestamp')
+            _ensure_index(cursor, 'migration_logs', 'idx_migration_logs_migration_log', 'migration_uuid, log_id')
+            _ensure_index(cursor, 'migration_metrics', 'idx_migration_metrics_migration_time', 'migration_uuid, timestamp')
+            _ensure_index(cursor, 'migration_metrics', 'idx_migration_metrics_time', 'timestamp')
+
             logger.info("Database tables initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
         raise
 
+def _ensure_column(cursor, table, name, definition):
+    """Add a column to an existing table unless it is already there"""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        LIMIT 1
+    """, (table, name))
+    if cursor.fetchone() is None:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+        logger.info(f"Added column {name} to {table}")
+
+def _ensure_index(cursor, table, name, columns):
+    """Create an index on an existing table unless one with that name is already there"""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, name))
+    if cursor.fetchone() is None:
+        cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+        logger.info(f"Created index {name} on {table}")
+
 @contextmanager
 def get_db():
     """Get a database connection"""
     conn = None
     try:
-        conn = s2.connect(CONN_STR)
+        with DB_CONNECT_SECONDS.labels().time():
+            conn = s2.connect(CONN_STR)
+        DB_CONNECTIONS_OPENED.inc()
+        DB_CONNECTIONS_OPEN.inc()
         cursor = conn.cursor()
         yield cursor
         conn.commit()
@@ -109,7 +202,28 @@ def get_db():
     finally:
         if conn:
             conn.close()
+            DB_CONNECTIONS_OPEN.dec()
 
+def _instrumented(operation):
+    """Record latency and errors of a metadata statement helper under ``operation``"""
+    latency = DB_QUERY_SECONDS.labels(operation)
+    errors = DB_QUERY_ERRORS.labels(operation)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+@_instrumented('query')
 def execute_query(query, params=None):
     """Execute a query and return all results"""
     try:
@@ -126,6 +240,7 @@ def execute_query(query, params=None):
             detail=f"Database error: {str(e)}"
         )
 
+@_instrumented('single')
 def execute_single(query, params=None):
     """Execute a query and return a single result"""
     try:
@@ -142,6 +257,40 @@ def execute_single(query, params=None):
             detail=f"Database error: {str(e)}"
         )
 
+@_instrumented('models')
+def fetch_models(model, query, params=None):
+    """Execute a query and decode every row straight into ``model`` instances"""
+    try:
+        with get_db() as cursor:
+            cursor.execute(query, params or ())
+            if not cursor.description:
+                return []
+            return decoder(model, cursor.description).all(cursor.fetchall())
+    except Exception as e:
+        logger.error(f"Query execution error: {str(e)}\nQuery: {query}\nParams: {params}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error: {str(e)}"
+        )
+
+@_instrumented('model')
+def fetch_model(model, query, params=None):
+    """Execute a query and decode the first row into a ``model`` instance, or None"""
+    try:
+        with get_db() as cursor:
+            cursor.execute(query, params or ())
+            if not cursor.description:
+                return None
+            row = cursor.fetchone()
+            return decoder(model, cursor.description)(row) if row else None
+    except Exception as e:
+        logger.error(f"Query execution error: {str(e)}\nQuery: {query}\nParams: {params}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error: {str(e)}"
+        )
+
+@_instrumented('write')
 def execute_write(query, params=None):
     """Execute a write query (INSERT, UPDATE, DELETE)"""
     try:
@@ -152,6 +301,17 @@ def execute_write(query, params=None):
         logger.error(f"Write operation error: {str(e)}")
         raise
 
+@_instrumented('many')
+def execute_many(query, params_seq):
+    """Execute a write query once per parameter tuple in a single round trip batch"""
+    try:
+        with get_db() as cursor:
+            cursor.executemany(query, params_seq)
+            return cursor.rowcount
+    except Exception as e:
+        logger.error(f"Batch write operation error: {str(e)}")
+        raise
+
 def test_connection():
     """Test the database connection and return diagnostic information"""
     try:
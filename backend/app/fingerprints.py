@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Dict, List
+from uuid import UUID
+import logging
+
+import app.core.pipeline  # noqa: F401
+from app.db import execute_many, execute_query
+from services.change_detection import ChunkFingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def load_fingerprints(migration_uuid: UUID) -> Dict[int, ChunkFingerprint]:
+    """Load the fingerprints stored by the previous run of a migration, keyed by chunk id"""
+    rows = execute_query("""
+        SELECT chunk_id, range_start, range_end, row_count, content_hash
+        FROM chunk_fingerprints
+        WHERE migration_uuid = UNHEX(REPLACE(%s, '-', ''))
+    """, (str(migration_uuid),))
+    return {
+        row['chunk_id']: ChunkFingerprint(
+            chunk_id=row['chunk_id'],
+            lower=int(row['range_start']),
+            upper=int(row['range_end']),
+            row_count=int(row['row_count']),
+            checksum=int(row['content_hash']),
+        )
+        for row in rows
+    }
+
+
+def save_fingerprints(migration_uuid: UUID, fingerprints: List[ChunkFingerprint]) -> int:
+    """Upsert fingerprints for chunks that were transferred successfully"""
+    if not fingerprints:
+        return 0
+    computed_at = datetime.utcnow()
+    count = execute_many("""
+        INSERT INTO chunk_fingerprints (
+            migration_uuid, chunk_id, range_start, range_end, row_count, content_hash, computed_at
+        )
+        VALUES (UNHEX(REPLACE(%s, '-', '')), %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            range_start = VALUES(range_start),
+            range_end = VALUES(range_end),
+            row_count = VALUES(row_count),
+            content_hash = VALUES(content_hash),
+            computed_at = VALUES(computed_at)
+    """, [
+        (str(migration_uuid), fp.chunk_id, fp.lower, fp.upper, fp.row_count, fp.checksum, computed_at)
+        for fp in fingerprints
+    ])
+    logger.info(f"Stored {len(fingerprints)} chunk fingerprints for migration {migration_uuid}")
+    return count
@@ -2,13 +2,29 @@ import os
 from app.connectors.singlestore import SingleStoreConnector
 # from app.services.parquet import ParquetService
 # from app.services.parquet_gpu import GPUParquetService
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from app.routes import router
 from app.db import init_db
+from app.connectors.registry import connector_registry
+from app.core.config import settings
+from app.core.metrics import (
+    CONTENT_TYPE,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    MEMORY,
+    MEMORY_PRESSURE,
+    registry,
+)
+from app.metrics_rollup import metrics_rollup
+from app.tracing import configure_tracing, tracer
+import app.core.pipeline  # noqa: F401
+from services.memory import governor
+import asyncio
 import logging
+import time
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -38,9 +54,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Observe request latency per route template (not per raw path, to bound cardinality)"""
+    HTTP_REQUESTS_IN_PROGRESS.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_PROGRESS.dec()
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            request.method, getattr(route, "path", "unmatched"), str(status)
+        ).observe(time.perf_counter() - start)
+
 # Include routes
 app.include_router(router, prefix="/api")
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 # Custom OpenAPI endpoint
 @app.get("/openapi.json", include_in_schema=False)
 async def get_open_api_endpoint():
@@ -67,3 +105,26 @@ async def startup_event():
     logger.info("Initializing database...")
     init_db()
     logger.info("Database initialization complete")
+    configure_tracing(settings.TRACING_EXPORTERS)
+    governor.configure(settings.MEMORY_BUDGET_BYTES)
+    MEMORY.set_function(lambda: governor.budget_bytes, 'budget')
+    MEMORY.set_function(lambda: governor.usage().rss_bytes, 'rss')
+    MEMORY.set_function(lambda: governor.usage().arrow_bytes, 'arrow')
+    MEMORY.set_function(lambda: governor.usage().reserved_bytes, 'reserved')
+    MEMORY_PRESSURE.set_function(lambda: int(governor.pressure()))
+    connector_registry.start()
+    metrics_rollup.configure(
+        settings.METRICS_RAW_RETENTION_DAYS,
+        settings.METRICS_1M_RETENTION_DAYS,
+        settings.METRICS_1H_RETENTION_DAYS,
+        settings.METRICS_ROLLUP_INTERVAL_SECONDS,
+    )
+    metrics_rollup.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled source connections, stop metric rollups and flush buffered spans"""
+    await connector_registry.close_all()
+    await metrics_rollup.stop()
+    # Exporters write to the metadata database; keep that off the event loop
+    await asyncio.to_thread(tracer.flush)
@@ -0,0 +1,273 @@
+"""
+Downsampling and retention for ``migration_metrics``
+
+Raw per-chunk rows are rolled up into 1-minute (``migration_metrics_1m``) and 1-hour
+(``migration_metrics_1h``) buckets per migration. Each pass picks up the raw rows
+added since the last pass (by ``metric_id``, since the tracing exporter may insert
+rows well after their ``timestamp``) and recomputes every bucket they fall in, so a
+pass is idempotent and concurrent passes from several API processes are harmless.
+Ids are allocated before the inserting transaction commits, so a row can become
+visible after a higher id was already rolled up; each pass therefore rescans the
+last ``ROLLUP_ID_SLACK`` ids as well. Buckets whose source rows are partly past
+retention are never recomputed, since that would overwrite them with what is left.
+
+Chart queries read whichever resolution keeps a time range under ``max_points``
+buckets, so their cost depends on the number of points returned, not on how much
+history the migration has.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import math
+
+from app.db import execute_query, execute_single, execute_write
+
+logger = logging.getLogger(__name__)
+
+# Bucket arithmetic is done relative to a fixed DATETIME rather than through
+# UNIX_TIMESTAMP, so it does not depend on the session time zone
+EPOCH = '1970-01-01 00:00:00'
+DEFAULT_MAX_POINTS = 300
+MAX_POINTS = 1_000
+DELETE_BATCH_ROWS = 10_000
+# Raw ids below the last rolled-up one that each pass scans again for late commits
+ROLLUP_ID_SLACK = 5_000
+# Bucket widths offered to charts, in seconds
+BUCKET_STEPS = (
+    1, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800,
+    3600, 7200, 10800, 21600, 43200, 86400, 172800, 604800,
+)
+
+RAW_AGGREGATES = """
+    COUNT(*) AS chunks,
+    SUM(records_processed) AS records_processed,
+    SUM(bytes_processed) AS bytes_processed,
+    SUM(processing_time) AS processing_time,
+    MAX(processing_time) AS max_processing_time
+"""
+ROLLUP_AGGREGATES = """
+    SUM(chunks) AS chunks,
+    SUM(records_processed) AS records_processed,
+    SUM(bytes_processed) AS bytes_processed,
+    SUM(processing_time) AS processing_time,
+    MAX(max_processing_time) AS max_processing_time
+"""
+
+
+@dataclass(frozen=True)
+class Resolution:
+    name: str
+    table: str
+    time_column: str
+    seconds: int
+    aggregates: str
+    retention_days: int
+
+
+def resolutions(raw_days: int, minute_days: int, hour_days: int) -> Tuple[Resolution, ...]:
+    """Finest first"""
+    return (
+        Resolution('raw', 'migration_metrics', 'timestamp', 1, RAW_AGGREGATES, raw_days),
+        Resolution('1m', 'migration_metrics_1m', 'bucket_start', 60, ROLLUP_AGGREGATES, minute_days),
+        Resolution('1h', 'migration_metrics_1h', 'bucket_start', 3600, ROLLUP_AGGREGATES, hour_days),
+    )
+
+
+def _bucket(column: str, seconds: int) -> str:
+    return f"TIMESTAMPADD(SECOND, TIMESTAMPDIFF(SECOND, '{EPOCH}', {column}) DIV {seconds} * {seconds}, '{EPOCH}')"
+
+
+def _floor(moment: datetime, seconds: int) -> datetime:
+    epoch = datetime(1970, 1, 1)
+    return epoch + timedelta(seconds=int((moment - epoch).total_seconds()) // seconds * seconds)
+
+
+class MetricsRollup:
+    """
+    Maintain the rollup tables and answer time-bucketed chart queries
+
+    Args:
+        raw_days / minute_days / hour_days: Retention per resolution; 0 keeps forever
+        interval: Seconds between background passes
+    """
+
+    def __init__(self, raw_days: int = 7, minute_days: int = 30, hour_days: int = 730, interval: float = 60.0):
+        self.resolutions = resolutions(raw_days, minute_days, hour_days)
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, raw_days: int, minute_days: int, hour_days: int, interval: float) -> None:
+        self.resolutions = resolutions(raw_days, minute_days, hour_days)
+        self.interval = interval
+
+    def start(self) -> None:
+        """Start the background rollup and retention loop"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                # Metadata helpers are blocking; keep them off the event loop
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error(f"Metrics rollup pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def run_once(self) -> None:
+        self.rollup()
+        self.apply_retention()
+
+    def rollup(self, now: Optional[datetime] = None) -> int:
+        """Fold raw rows added since the previous pass into the 1m and 1h tables"""
+        now = now or datetime.utcnow()
+        state = execute_single("SELECT last_metric_id FROM metrics_rollup_state WHERE name = 'rollup'")
+        last_id = int(state['last_metric_id']) if state else 0
+        latest = execute_single("SELECT MAX(metric_id) AS metric_id FROM migration_metrics")
+        new_id = max(int(latest['metric_id'] or 0) if latest else 0, last_id)
+        from_id = max(last_id - ROLLUP_ID_SLACK, 0)
+        if new_id <= from_id:
+            return 0
+
+        touched = execute_query("""
+            SELECT HEX(migration_uuid) AS migration_uuid, MIN(timestamp) AS first_seen, MAX(timestamp) AS last_seen
+            FROM migration_metrics
+            WHERE metric_id > %s AND metric_id <= %s AND migration_uuid IS NOT NULL
+            GROUP BY migration_uuid
+        """, (from_id, new_id))
+        raw, minute, hour = self.resolutions
+        for row in touched:
+            for source, target in ((raw, minute), (minute, hour)):
+                start = max(_floor(row['first_seen'], target.seconds), self._complete_from(source, target, now))
+                end = _floor(row['last_seen'], target.seconds) + timedelta(seconds=target.seconds)
+                if start < end:
+                    self._recompute(source, target, row['migration_uuid'], start, end)
+
+        if new_id > last_id:
+            execute_write("""
+                INSERT INTO metrics_rollup_state (name, last_metric_id, updated_at)
+                VALUES ('rollup', %s, %s)
+                ON DUPLICATE KEY UPDATE last_metric_id = VALUES(last_metric_id), updated_at = VALUES(updated_at)
+            """, (new_id, now))
+            logger.info(f"Rolled up metrics {last_id + 1}..{new_id} for {len(touched)} migrations")
+        return len(touched)
+
+    @staticmethod
+    def _complete_from(source: Resolution, target: Resolution, now: datetime) -> datetime:
+        """Start of the oldest ``target`` bucket whose ``source`` rows are all still retained"""
+        if source.retention_days <= 0:
+            return datetime.min
+        cutoff = now - timedelta(days=source.retention_days)
+        bucket = _floor(cutoff, target.seconds)
+        return bucket if bucket == cutoff else bucket + timedelta(seconds=target.seconds)
+
+    def _recompute(self, source: Resolution, target: Resolution, migration_hex: str, start: datetime, end: datetime) -> None:
+        execute_write(f"""
+            INSERT INTO {target.table} (
+                migration_uuid, bucket_start, chunks, records_processed, bytes_processed,
+                processing_time, max_processing_time
+            )
+            SELECT migration_uuid, {_bucket(source.time_column, target.seconds)} AS bucket, {source.aggregates}
+            FROM {source.table}
+            WHERE migration_uuid = UNHEX(%s) AND {source.time_column} >= %s AND {source.time_column} < %s
+            GROUP BY migration_uuid, bucket
+            ON DUPLICATE KEY UPDATE
+                chunks = VALUES(chunks),
+                records_processed = VALUES(records_processed),
+                bytes_processed = VALUES(bytes_processed),
+                processing_time = VALUES(processing_time),
+                max_processing_time = VALUES(max_processing_time)
+        """, (migration_hex, start, end))
+
+    def apply_retention(self, now: Optional[datetime] = None) -> int:
+        """Delete rows past each resolution's retention, in batches to keep locks short"""
+        now = now or datetime.utcnow()
+        total = 0
+        for resolution in self.resolutions:
+            if resolution.retention_days <= 0:
+                continue
+            cutoff = now - timedelta(days=resolution.retention_days)
+            while True:
+                deleted = execute_write(
+                    f"DELETE FROM {resolution.table} WHERE {resolution.time_column} < %s LIMIT {DELETE_BATCH_ROWS}",
+                    (cutoff,),
+                )
+                total += deleted
+                if deleted < DELETE_BATCH_ROWS:
+                    break
+        if total:
+            logger.info(f"Metrics retention removed {total} rows")
+        return total
+
+    def choose(self, start: datetime, end: datetime, max_points: int, now: Optional[datetime] = None) -> Tuple[Resolution, int]:
+        """
+        Coarsest resolution no wider than the bucket ``max_points`` allows and still
+        retained at ``start``, plus the bucket width (a multiple of its resolution)
+        """
+        now = now or datetime.utcnow()
+        wanted = math.ceil((end - start).total_seconds() / max_points)
+        step = next((s for s in BUCKET_STEPS if s >= wanted), BUCKET_STEPS[-1])
+        retained = [
+            r for r in self.resolutions
+            if r.retention_days <= 0 or start >= now - timedelta(days=r.retention_days)
+        ]
+        candidates = [r for r in retained if r.seconds <= step] or retained[:1] or [self.resolutions[-1]]
+        resolution = candidates[-1]
+        return resolution, max(step, resolution.seconds)
+
+    def first_seen(self, migration_uuid: UUID) -> Optional[datetime]:
+        """Earliest recorded metric of a migration, from the coarsest table that has any"""
+        for resolution in reversed(self.resolutions):
+            row = execute_single(f"""
+                SELECT MIN({resolution.time_column}) AS first_seen FROM {resolution.table}
+                WHERE migration_uuid = UNHEX(REPLACE(%s, '-', ''))
+            """, (str(migration_uuid),))
+            if row and row['first_seen'] is not None:
+                return row['first_seen']
+        return None
+
+    def series(
+        self,
+        migration_uuid: UUID,
+        start: datetime,
+        end: datetime,
+        max_points: int = DEFAULT_MAX_POINTS,
+    ) -> Tuple[Resolution, int, List[dict]]:
+        """Metrics of one migration in ``[start, end)`` in at most ~``max_points`` buckets"""
+        resolution, seconds = self.choose(start, end, max_points)
+        rows = execute_query(f"""
+            SELECT {_bucket(resolution.time_column, seconds)} AS bucket, {resolution.aggregates}
+            FROM {resolution.table}
+            WHERE migration_uuid = UNHEX(REPLACE(%s, '-', ''))
+                AND {resolution.time_column} >= %s AND {resolution.time_column} < %s
+            GROUP BY bucket
+            ORDER BY bucket
+        """, (str(migration_uuid), start, end))
+        points = []
+        for row in rows:
+            chunks = int(row['chunks'] or 0)
+            records = int(row['records_processed'] or 0)
+            size = int(row['bytes_processed'] or 0)
+            processing = int(row['processing_time'] or 0)
+            points.append({
+                'timestamp': row['bucket'],
+                'chunks': chunks,
+                'records_processed': records,
+                'bytes_processed': size,
+                'avg_processing_time_ms': processing / chunks if chunks else 0.0,
+                'max_processing_time_ms': int(row['max_processing_time'] or 0),
+                'records_per_second': records / seconds,
+                'bytes_per_second': size / seconds,
+            })
+        return resolution, seconds, points
+
+
+metrics_rollup = MetricsRollup()
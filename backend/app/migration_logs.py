@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from uuid import UUID
+import json
+
+from app.db import execute_query
+
+DEFAULT_PAGE_ROWS = 100
+MAX_PAGE_ROWS = 1_000
+# Rows fetched per keyset query while streaming an export
+EXPORT_PAGE_ROWS = 5_000
+
+
+class LogFilter:
+    """
+    Filters over one migration's ``migration_logs`` rows
+
+    Pages are keyset-paginated on ``log_id`` (``log_id > cursor`` ascending, ``<``
+    descending), which the ``(migration_uuid, log_id)`` index serves without scanning
+    the rows before the cursor.
+    """
+
+    def __init__(
+        self,
+        migration_uuid: UUID,
+        levels: Optional[List[str]] = None,
+        chunk_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        descending: bool = False,
+    ):
+        self.migration_uuid = migration_uuid
+        self.levels = [level.upper() for level in levels or []]
+        self.chunk_id = chunk_id
+        self.start = start
+        self.end = end
+        self.descending = descending
+
+    def query(self, cursor: Optional[int], limit: int) -> Tuple[str, tuple]:
+        clauses = ["migration_uuid = UNHEX(REPLACE(%s, '-', ''))"]
+        params: list = [str(self.migration_uuid)]
+        if cursor is not None:
+            clauses.append("log_id < %s" if self.descending else "log_id > %s")
+            params.append(cursor)
+        if self.levels:
+            clauses.append(f"UPPER(log_level) IN ({', '.join(['%s'] * len(self.levels))})")
+            params.extend(self.levels)
+        if self.chunk_id is not None:
+            clauses.append("chunk_id = %s")
+            params.append(self.chunk_id)
+        if self.start is not None:
+            clauses.append("timestamp >= %s")
+            params.append(self.start)
+        if self.end is not None:
+            clauses.append("timestamp < %s")
+            params.append(self.end)
+        params.append(limit)
+        return f"""
+            SELECT log_id, chunk_id, log_level, message, timestamp
+            FROM migration_logs
+            WHERE {' AND '.join(clauses)}
+            ORDER BY log_id {'DESC' if self.descending else 'ASC'}
+            LIMIT %s
+        """, tuple(params)
+
+    def page(self, cursor: Optional[int] = None, limit: int = DEFAULT_PAGE_ROWS) -> Tuple[List[dict], Optional[int]]:
+        """Up to ``limit`` rows after ``cursor`` and the cursor of the next page (None at the end)"""
+        # One extra row tells whether another page exists without a COUNT query
+        rows = execute_query(*self.query(cursor, limit + 1))
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, rows[-1]['log_id']
+        return rows, None
+
+    def iter_ndjson(self, cursor: Optional[int] = None) -> Iterator[str]:
+        """Every matching row as one JSON line, fetched a page at a time"""
+        while True:
+            rows, cursor = self.page(cursor, EXPORT_PAGE_ROWS)
+            for row in rows:
+                yield json.dumps(row, default=_json_default) + '\n'
+            if cursor is None:
+                return
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
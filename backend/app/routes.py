@@ -1,11 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 import uuid
 from uuid import UUID
-from datetime import datetime
-from app.db import execute_query, execute_single, execute_write, test_connection
+from datetime import datetime, timedelta
+import asyncio
+from app.db import execute_single, execute_write, fetch_model, fetch_models, test_connection
 from app.schemas.connection import ConnectionCreate, Connection
-from app.schemas.migration import MigrationCreate, Migration, MigrationStatus
+from app.schemas.migration import MigrationCreate, Migration, MigrationLogPage, MigrationStatus
+from app.schemas.metrics import MetricsSeries
+from app.schemas.plan import (
+    MigrationPlanRequest,
+    MigrationPlan,
+    DatabaseMigrationPlanRequest,
+    DatabaseMigrationPlan,
+)
+from app.connectors.registry import (
+    ConnectionNotFoundError,
+    UnsupportedDatabaseError,
+    connector_registry,
+)
+from app import tracing
+from app.metrics_rollup import DEFAULT_MAX_POINTS, MAX_POINTS, metrics_rollup
+from app.migration_logs import DEFAULT_PAGE_ROWS, MAX_PAGE_ROWS, LogFilter
+import app.core.pipeline  # noqa: F401
+from services.database_migration import DatabaseMigrator, summarize_plan
+from services.planner import MigrationPlanner
+from services.profiler import SamplingProfiler, spans_with, thread_named
 import logging
 import json
 
@@ -16,6 +38,38 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Columns are named after the response model fields; BINARY(16) UUIDs and JSON
+# columns are decoded by app.rows
+CONNECTION_COLUMNS = """
+    db_uuid,
+    db_name,
+    CASE WHEN db_type = 'postgresql' THEN 'postgres' ELSE db_type END AS db_type,
+    db_variables
+"""
+MIGRATION_COLUMNS = """
+    m.migration_uuid,
+    m.migration_name,
+    m.source_uuid,
+    m.target_uuid,
+    m.source_type,
+    m.target_type,
+    LOWER(m.status) AS status,
+    m.is_recurring,
+    m.scheduled_time,
+    m.time_start,
+    m.time_finish,
+    m.creation_time,
+    m.last_run,
+    m.source_table,
+    m.source_columns AS columns,
+    m.source_filters AS filters,
+    CASE 
+        WHEN m.scheduled_time IS NOT NULL 
+        THEN TIMESTAMPDIFF(SECOND, NOW(), m.scheduled_time) 
+        ELSE NULL 
+    END AS time_until_next_run
+"""
+
 # Health check
 @router.get("/health", tags=["Health"])
 def health_check():
@@ -32,30 +86,11 @@ def health_check():
 async def list_databases():
     """List all database connections"""
     try:
-        results = execute_query("""
-            SELECT HEX(db_uuid) as db_uuid, db_name, db_type, db_variables
+        return fetch_models(Connection, f"""
+            SELECT {CONNECTION_COLUMNS}
             FROM connections 
             ORDER BY created_at DESC
         """)
-        
-        # Convert hex string UUIDs to UUID objects and normalize database types
-        normalized_results = []
-        for result in results:
-            try:
-                # Convert hex string to UUID
-                hex_uuid = result['db_uuid']
-                uuid_str = f"{hex_uuid[0:8]}-{hex_uuid[8:12]}-{hex_uuid[12:16]}-{hex_uuid[16:20]}-{hex_uuid[20:32]}"
-                result['db_uuid'] = UUID(uuid_str.lower())
-                
-                # Normalize postgresql to postgres
-                if result['db_type'] == 'postgresql':
-                    result['db_type'] = 'postgres'
-                normalized_results.append(result)
-            except (ValueError, AttributeError) as e:
-                logger.error(f"Invalid database record: {result}, Error: {str(e)}")
-                continue
-                
-        return normalized_results
     except Exception as e:
         logger.error(f"Database query failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch database connections: {str(e)}")
@@ -85,8 +120,8 @@ async def create_database(connection: ConnectionCreate):
 async def get_database(db_uuid: UUID):
     """Get a specific database connection"""
     try:
-        result = execute_single("""
-            SELECT HEX(db_uuid) as db_uuid, db_name, db_type, db_variables
+        result = fetch_model(Connection, f"""
+            SELECT {CONNECTION_COLUMNS}
             FROM connections 
             WHERE db_uuid = UNHEX(REPLACE(%s, '-', ''))
         """, (str(db_uuid),))
@@ -94,11 +129,6 @@ async def get_database(db_uuid: UUID):
         if not result:
             raise HTTPException(status_code=404, detail="Database connection not found")
         
-        # Convert hex string to UUID
-        hex_uuid = result['db_uuid']
-        uuid_str = f"{hex_uuid[0:8]}-{hex_uuid[8:12]}-{hex_uuid[12:16]}-{hex_uuid[16:20]}-{hex_uuid[20:32]}"
-        result['db_uuid'] = UUID(uuid_str.lower())
-        
         return result
     except HTTPException:
         raise
@@ -120,6 +150,8 @@ async def update_database(db_uuid: UUID, connection: ConnectionCreate):
                 db_variables = %s
             WHERE db_uuid = UNHEX(REPLACE(%s, '-', ''))
         """, (connection.db_name, connection.db_type, db_variables_json, str(db_uuid)))
+        # Credentials or pool settings may have changed; reconnect on next use
+        await connector_registry.invalidate(db_uuid)
         
         return {
             "db_uuid": db_uuid,
@@ -130,51 +162,34 @@ async def update_database(db_uuid: UUID, connection: ConnectionCreate):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/databases/{db_uuid}/tables", response_model=List[str])
+async def list_database_tables(db_uuid: UUID):
+    """List the tables of a stored connection"""
+    async with _source_connector(db_uuid) as connector:
+        return await connector.get_tables()
+
+@router.get("/databases/{db_uuid}/tables/{table_name}/schema", response_model=Dict[str, str])
+async def get_database_table_schema(db_uuid: UUID, table_name: str):
+    """Get column names and source types of a table"""
+    async with _source_connector(db_uuid) as connector:
+        # Only describe known tables; the name is interpolated into the source query
+        if table_name not in await connector.get_tables():
+            raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+        schema = await connector.get_table_schema(table_name)
+    if not schema:
+        raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+    return schema
+
 # Migration Routes
 @router.get("/migrations", response_model=List[Migration])
 async def list_migrations():
     """List all migrations"""
     try:
-        results = execute_query("""
-            SELECT 
-                HEX(m.migration_uuid) as migration_uuid,
-                m.migration_name,
-                HEX(m.source_uuid) as source_uuid,
-                HEX(m.target_uuid) as target_uuid,
-                m.source_type,
-                m.target_type,
-                LOWER(m.status) as status,
-                m.is_recurring,
-                m.scheduled_time,
-                m.time_start,
-                m.time_finish,
-                m.creation_time,
-                m.last_run,
-                CASE 
-                    WHEN m.scheduled_time IS NOT NULL 
-                    THEN TIMESTAMPDIFF(SECOND, NOW(), m.scheduled_time) 
-                    ELSE NULL 
-                END as time_until_next_run
+        return fetch_models(Migration, f"""
+            SELECT {MIGRATION_COLUMNS}
             FROM migrations m
             ORDER BY m.creation_time DESC
         """)
-        
-        # Convert hex UUIDs to string format
-        normalized_results = []
-        for result in results:
-            try:
-                # Convert hex to UUID string format
-                for uuid_field in ['migration_uuid', 'source_uuid', 'target_uuid']:
-                    hex_str = result[uuid_field]
-                    uuid_str = f"{hex_str[0:8]}-{hex_str[8:12]}-{hex_str[12:16]}-{hex_str[16:20]}-{hex_str[20:32]}".lower()
-                    result[uuid_field] = uuid_str
-                
-                normalized_results.append(result)
-            except (ValueError, AttributeError) as e:
-                logger.error(f"Invalid migration record: {result}, Error: {str(e)}")
-                continue
-                
-        return normalized_results
     except Exception as e:
         logger.error(f"Failed to list migrations: {str(e)}")
         raise HTTPException(
@@ -193,6 +208,9 @@ async def create_migration(migration: MigrationCreate):
         if not source or not target:
             raise HTTPException(status_code=404, detail="Source or target database not found")
         
+        if migration.source_table or migration.columns is not None or migration.filters:
+            await _validate_source(migration)
+        
         migration_uuid = uuid.uuid4()
         creation_time = datetime.utcnow()
         
@@ -200,14 +218,18 @@ async def create_migration(migration: MigrationCreate):
             INSERT INTO migrations (
                 migration_uuid, migration_name, source_uuid, target_uuid,
                 source_type, target_type, status, is_recurring,
-                scheduled_time, creation_time
+                scheduled_time, creation_time,
+                source_table, source_columns, source_filters
             )
             VALUES (UNHEX(REPLACE(%s, '-', '')), %s, UNHEX(REPLACE(%s, '-', '')), UNHEX(REPLACE(%s, '-', '')),
-                    %s, %s, %s, %s, %s, %s)
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, (
             str(migration_uuid), migration.migration_name, str(migration.source_uuid), str(migration.target_uuid),
             migration.source_type, migration.target_type, MigrationStatus.SCHEDULED, migration.is_recurring,
-            migration.scheduled_time, creation_time
+            migration.scheduled_time, creation_time,
+            migration.source_table,
+            json.dumps(migration.columns) if migration.columns is not None else None,
+            json.dumps([f.model_dump(mode='json') for f in migration.filters]) if migration.filters else None,
         ))
         
         return {
@@ -224,33 +246,101 @@ async def create_migration(migration: MigrationCreate):
             "time_finish": None,
             "creation_time": creation_time,
             "last_run": None,
-            "time_until_next_run": None
+            "time_until_next_run": None,
+            "source_table": migration.source_table,
+            "columns": migration.columns,
+            "filters": migration.filters,
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/migrations/plan", response_model=MigrationPlan)
+async def plan_migration(request: MigrationPlanRequest):
+    """
+    Dry-run a table migration and predict its cost without scheduling it.
+    
+    Samples the source table, times a probe read and a local Parquet encode, and
+    returns chunk count, bytes, wall time per parallelism level and peak memory.
+    """
+    try:
+        async with _source_connector(request.source_uuid) as connector:
+            # The name is interpolated into the sampling and probe queries
+            if request.table_name not in await connector.get_tables():
+                raise HTTPException(status_code=404, detail=f"Table {request.table_name} not found")
+            planner = MigrationPlanner(sample_rows=request.sample_rows)
+            plan = await planner.plan(
+                connector, request.table_name, request.chunk_rows, request.parallelism,
+                columns=request.columns, filters=request.filters,
+            )
+            return MigrationPlan.model_validate(plan)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # The table is known at this point; the planner rejects the columns or filters
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Migration planning failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/migrations/database/plan", response_model=DatabaseMigrationPlan)
+async def plan_database_migration(request: DatabaseMigrationPlanRequest):
+    """
+    Plan a whole-database migration.
+    
+    Discovers every table, splits large tables into chunks and orders all work
+    largest-first across the concurrency budget, returning the per-table schedule
+    and the predicted per-worker makespan.
+    """
+    try:
+        async with _source_connector(request.source_uuid) as connector:
+            migrator = DatabaseMigrator(
+                connector,
+                max_concurrency=request.max_concurrency,
+                split_threshold_bytes=request.split_threshold_bytes,
+                chunk_bytes=request.chunk_bytes,
+            )
+            plan = migrator.plan(await migrator.discover(request.tables))
+            return summarize_plan(plan)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Database migration planning failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@asynccontextmanager
+async def _source_connector(db_uuid: UUID) -> AsyncIterator[Any]:
+    """Lease the warm connector for a stored connection from the registry"""
+    try:
+        async with connector_registry.lease(db_uuid) as connector:
+            yield connector
+    except ConnectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UnsupportedDatabaseError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _validate_source(migration: MigrationCreate) -> None:
+    """Reject unknown source tables, and column lists or filters that do not match the table's schema"""
+    if not migration.source_table:
+        raise HTTPException(status_code=400, detail="source_table is required with columns or filters")
+    async with _source_connector(migration.source_uuid) as connector:
+        # The name ends up in source queries; only accept tables the source lists
+        if migration.source_table not in await connector.get_tables():
+            raise HTTPException(status_code=404, detail=f"Table {migration.source_table} not found")
+        if migration.columns is None and not migration.filters:
+            return
+        try:
+            await connector.validate_projection(migration.source_table, migration.columns, migration.filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/migrations/{migration_uuid}", response_model=Migration)
 async def get_migration(migration_uuid: UUID):
     """Get a specific migration"""
     try:
-        result = execute_single("""
-            SELECT 
-                HEX(m.migration_uuid) as migration_uuid,
-                m.migration_name,
-                HEX(m.source_uuid) as source_uuid,
-                HEX(m.target_uuid) as target_uuid,
-                m.source_type,
-                m.target_type,
-                m.status,
-                m.is_recurring,
-                m.scheduled_time,
-                m.time_start,
-                m.time_finish,
-                m.creation_time,
-                m.last_run,
-                EXTRACT(EPOCH FROM (m.scheduled_time - NOW())) as time_until_next_run
+        result = fetch_model(Migration, f"""
+            SELECT {MIGRATION_COLUMNS}
             FROM migrations m
             WHERE m.migration_uuid = UNHEX(REPLACE(%s, '-', ''))
         """, (str(migration_uuid),))
@@ -258,19 +348,6 @@ async def get_migration(migration_uuid: UUID):
         if not result:
             raise HTTPException(status_code=404, detail="Migration not found")
         
-        # Convert hex string to UUID
-        hex_uuid = result['migration_uuid']
-        uuid_str = f"{hex_uuid[0:8]}-{hex_uuid[8:12]}-{hex_uuid[12:16]}-{hex_uuid[16:20]}-{hex_uuid[20:32]}"
-        result['migration_uuid'] = UUID(uuid_str.lower())
-        
-        hex_uuid = result['source_uuid']
-        uuid_str = f"{hex_uuid[0:8]}-{hex_uuid[8:12]}-{hex_uuid[12:16]}-{hex_uuid[16:20]}-{hex_uuid[20:32]}"
-        result['source_uuid'] = UUID(uuid_str.lower())
-        
-        hex_uuid = result['target_uuid']
-        uuid_str = f"{hex_uuid[0:8]}-{hex_uuid[8:12]}-{hex_uuid[12:16]}-{hex_uuid[16:20]}-{hex_uuid[20:32]}"
-        result['target_uuid'] = UUID(uuid_str.lower())
-        
         return result
     except HTTPException:
         raise
@@ -307,6 +384,127 @@ async def get_migration_status(migration_uuid: UUID):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/migrations/{migration_uuid}/metrics", response_model=MetricsSeries)
+async def get_migration_metrics(
+    migration_uuid: UUID,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = Query(DEFAULT_MAX_POINTS, ge=1, le=MAX_POINTS),
+):
+    """
+    Time-bucketed chunk metrics of a migration for charting
+
+    Reads raw rows, 1-minute or 1-hour rollups, whichever keeps ``[start, end)`` (UTC,
+    default: the migration's whole history) within ``max_points`` buckets.
+    """
+    end = end or datetime.utcnow()
+    start = start or metrics_rollup.first_seen(migration_uuid) or end - timedelta(hours=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    resolution, bucket_seconds, points = metrics_rollup.series(migration_uuid, start, end, max_points)
+    return {
+        "migration_uuid": migration_uuid,
+        "start": start,
+        "end": end,
+        "resolution": resolution.name,
+        "bucket_seconds": bucket_seconds,
+        "points": points,
+    }
+
+@router.get("/migrations/{migration_uuid}/logs", response_model=MigrationLogPage)
+async def list_migration_logs(
+    migration_uuid: UUID,
+    level: Optional[List[str]] = Query(None),
+    chunk_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_ROWS, ge=1, le=MAX_PAGE_ROWS),
+    order: str = "asc",
+    format: str = "json",
+):
+    """
+    Logs of a migration, filtered by ``level`` (repeatable), ``chunk_id`` and ``[start, end)``
+
+    ``format=json`` returns one page of ``limit`` rows; pass the returned ``next_cursor``
+    as ``cursor`` for the next one. ``format=ndjson`` streams every matching row from
+    ``cursor`` on as newline-delimited JSON, fetching from the database page by page.
+    """
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    logs = LogFilter(migration_uuid, level, chunk_id, start, end, descending=order == "desc")
+
+    if format == "ndjson":
+        name = f"migration-{migration_uuid}-logs.ndjson"
+        return StreamingResponse(
+            logs.iter_ndjson(cursor),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{name}"'},
+        )
+    rows, next_cursor = logs.page(cursor, limit)
+    return {"logs": rows, "next_cursor": next_cursor}
+
+@router.get("/traces", tags=["Diagnostics"])
+async def list_traces(name: Optional[str] = None, trace_id: Optional[int] = None, limit: int = 500):
+    """Most recent finished spans, newest first (requires the 'buffer' span exporter)"""
+    if tracing.recent_spans is None:
+        raise HTTPException(status_code=404, detail="Span buffer is not enabled")
+    spans = tracing.recent_spans.spans(name=name, trace_id=trace_id)
+    return [s.to_dict() for s in reversed(spans[-limit:])]
+
+MAX_PROFILE_SECONDS = 300
+# One profile at a time; checked and set without awaiting, so no lock is needed
+_profile_running = False
+
+@router.post("/admin/profile", tags=["Admin"])
+async def profile_process(
+    seconds: float = 10.0,
+    migration_uuid: Optional[UUID] = None,
+    thread: Optional[str] = None,
+    interval_ms: float = 5.0,
+    format: str = "collapsed",
+):
+    """
+    Sample thread stacks of the running process for ``seconds``
+
+    Restrict sampling to threads working on ``migration_uuid`` (threads with an open
+    span carrying it) or to a worker by ``thread`` name or id. ``format=collapsed``
+    returns a flamegraph-ready ``.folded`` file labelled by pipeline stage and CPU/wait
+    state; ``format=json`` returns per-stage and per-state sample counts as well.
+    """
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_PROFILE_SECONDS}]")
+    if format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'collapsed' or 'json'")
+    global _profile_running
+    if _profile_running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    thread_filter = None
+    if migration_uuid is not None:
+        thread_filter = spans_with("migration_uuid", str(migration_uuid))
+    elif thread:
+        thread_filter = thread_named(thread)
+
+    _profile_running = True
+    profiler = SamplingProfiler(interval=interval_ms / 1000, thread_filter=thread_filter)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = profiler.stop()
+        _profile_running = False
+
+    if format == "json":
+        return {**profile.summary(), "collapsed": profile.collapsed().splitlines()}
+    name = f"profile-{migration_uuid or thread or 'process'}-{datetime.utcnow():%Y%m%dT%H%M%S}.folded"
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{name}"'},
+    )
+
 @router.get("/test-connection", 
     summary="Test database connection",
     description="Test the connection to SingleStore and return diagnostic information",
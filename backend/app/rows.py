@@ -0,0 +1,105 @@
+"""
+Typed decoding of metadata query rows into Pydantic models
+
+A decoder is compiled once per (model, result columns) pair: it knows which column
+positions need converting (``BINARY(16)`` bytes to ``UUID``, JSON text to lists and
+dicts, chosen from the model's field annotations) and builds a lightweight named
+tuple per row that the model validates from attributes, so rows never pass through
+an intermediate dict or string formatting.
+"""
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union, get_args, get_origin
+from uuid import UUID
+import json
+import logging
+import threading
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+Model = TypeVar('Model', bound=BaseModel)
+Converter = Callable[[Any], Any]
+
+
+def uuid_value(value: Any) -> Optional[UUID]:
+    """A UUID from ``BINARY(16)`` bytes, 32-digit hex or the dashed text form"""
+    if value is None or isinstance(value, UUID):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        if len(value) == 16:
+            return UUID(bytes=bytes(value))
+        value = value.decode()
+    return UUID(value)
+
+
+def json_value(value: Any) -> Any:
+    """Decode JSON columns that the driver returns as text"""
+    if isinstance(value, (str, bytes, bytearray)):
+        return json.loads(value)
+    return value
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def converter_for(annotation: Any) -> Optional[Converter]:
+    """The converter a field of this type needs on top of Pydantic's own coercion"""
+    annotation = _unwrap_optional(annotation)
+    if annotation is UUID:
+        return uuid_value
+    if get_origin(annotation) in (list, dict, List, Dict):
+        return json_value
+    return None
+
+
+class RowDecoder:
+    """Decode rows of one result shape into ``model`` instances"""
+
+    def __init__(self, model: Type[Model], columns: Sequence[str]):
+        self.model = model
+        self.columns = tuple(columns)
+        fields = model.model_fields
+        self._converters: List[Tuple[int, Converter]] = []
+        for index, name in enumerate(self.columns):
+            field = fields.get(name)
+            converter = converter_for(field.annotation) if field is not None else None
+            if converter is not None:
+                self._converters.append((index, converter))
+        self._row = namedtuple(f'{model.__name__}Row', self.columns, rename=True, module=__name__)
+
+    def __call__(self, row: Sequence[Any]) -> Model:
+        if self._converters:
+            row = list(row)
+            for index, converter in self._converters:
+                row[index] = converter(row[index])
+        return self.model.model_validate(self._row._make(row), from_attributes=True)
+
+    def all(self, rows: Sequence[Sequence[Any]]) -> List[Model]:
+        """Decode every row, logging and skipping rows the model rejects"""
+        decoded = []
+        for row in rows:
+            try:
+                decoded.append(self(row))
+            except ValueError as e:
+                logger.error(f"Invalid {self.model.__name__} record: {row}, Error: {str(e)}")
+        return decoded
+
+
+_decoders: Dict[Tuple[type, Tuple[str, ...]], RowDecoder] = {}
+_lock = threading.Lock()
+
+
+def decoder(model: Type[Model], description: Sequence[Sequence[Any]]) -> RowDecoder:
+    """The cached decoder for ``model`` and a cursor's ``description``"""
+    key = (model, tuple(column[0] for column in description))
+    found = _decoders.get(key)
+    if found is None:
+        with _lock:
+            found = _decoders.setdefault(key, RowDecoder(model, key[1]))
+    return found
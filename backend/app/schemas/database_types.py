@@ -6,3 +6,6 @@ class DatabaseType(str, Enum):
     SNOWFLAKE = "snowflake"
     SINGLESTORE = "singlestore"
     SUPABASE = "supabase"
+    HYDROLIX = "hydrolix"
+    DATASET = "dataset"
+    SYNTHETIC = "synthetic"
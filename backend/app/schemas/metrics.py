@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+class MetricsPoint(BaseModel):
+    timestamp: datetime
+    chunks: int
+    records_processed: int
+    bytes_processed: int
+    avg_processing_time_ms: float
+    max_processing_time_ms: int
+    records_per_second: float
+    bytes_per_second: float
+
+    class Config:
+        from_attributes = True
+
+class MetricsSeries(BaseModel):
+    migration_uuid: UUID
+    start: datetime
+    end: datetime
+    resolution: str
+    bucket_seconds: int
+    points: List[MetricsPoint]
+
+    class Config:
+        from_attributes = True
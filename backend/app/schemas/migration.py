@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Any, List, Optional
 from enum import Enum
 from uuid import UUID
 from app.schemas.database_types import DatabaseType
@@ -11,6 +11,26 @@ class MigrationStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+class FilterOperator(str, Enum):
+    EQ = "="
+    NE = "!="
+    LT = "<"
+    LTE = "<="
+    GT = ">"
+    GTE = ">="
+    IN = "in"
+    NOT_IN = "not_in"
+    IS_NULL = "is_null"
+    IS_NOT_NULL = "is_not_null"
+    BETWEEN = "between"
+    WITHIN_DAYS = "within_days"
+
+class ColumnFilter(BaseModel):
+    """A predicate pushed into the source query, e.g. ("created_at", "within_days", 90)"""
+    column: str
+    op: FilterOperator
+    value: Optional[Any] = None
+
 class MigrationBase(BaseModel):
     source_uuid: UUID
     target_uuid: UUID
@@ -19,6 +39,9 @@ class MigrationBase(BaseModel):
     migration_name: str
     is_recurring: bool = False
     scheduled_time: Optional[datetime] = None
+    source_table: Optional[str] = None
+    columns: Optional[List[str]] = None
+    filters: Optional[List[ColumnFilter]] = None
 
 class MigrationCreate(MigrationBase):
     pass
@@ -34,3 +57,17 @@ class Migration(MigrationBase):
     
     class Config:
         from_attributes = True
+
+class MigrationLog(BaseModel):
+    log_id: int
+    chunk_id: Optional[int] = None
+    log_level: Optional[str] = None
+    message: Optional[str] = None
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+class MigrationLogPage(BaseModel):
+    logs: List[MigrationLog]
+    next_cursor: Optional[int] = None
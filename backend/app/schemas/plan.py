@@ -0,0 +1,58 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from uuid import UUID
+from app.schemas.migration import ColumnFilter
+
+class MigrationPlanRequest(BaseModel):
+    source_uuid: UUID
+    table_name: str
+    chunk_rows: int = Field(default=1_000_000, gt=0)
+    parallelism: List[int] = [1, 2, 4, 8, 16]
+    sample_rows: int = Field(default=10_000, gt=0, le=1_000_000)
+    columns: Optional[List[str]] = None
+    filters: Optional[List[ColumnFilter]] = None
+
+class ParallelismEstimate(BaseModel):
+    workers: int
+    wall_seconds: float
+    peak_memory_bytes: int
+
+    class Config:
+        from_attributes = True
+
+class MigrationPlan(BaseModel):
+    table_name: str
+    column_count: int
+    estimated_rows: int
+    sample_rows: int
+    chunk_rows: int
+    chunk_count: int
+    avg_row_bytes: float
+    estimated_source_bytes: int
+    estimated_parquet_bytes: int
+    probe_latency_seconds: float
+    fetch_rows_per_second: float
+    encode_rows_per_second: float
+    estimates: List[ParallelismEstimate]
+
+    class Config:
+        from_attributes = True
+
+class DatabaseMigrationPlanRequest(BaseModel):
+    source_uuid: UUID
+    tables: Optional[List[str]] = None  # all tables when omitted
+    max_concurrency: int = Field(default=8, gt=0)
+    split_threshold_bytes: int = Field(default=1024 * 1024 * 1024, gt=0)
+    chunk_bytes: int = Field(default=256 * 1024 * 1024, gt=0)
+
+class TablePlan(BaseModel):
+    table_name: str
+    chunks: int
+    estimated_bytes: int
+
+class DatabaseMigrationPlan(BaseModel):
+    workers: int
+    work_items: int
+    total_bytes: int
+    predicted_makespan_bytes: int
+    tables: List[TablePlan]  # ordered largest-first, as they will start
@@ -33,17 +33,17 @@ def migrate_job_chunks():
                     completed_at
                 ) VALUES
                 -- Completed migration chunks
-                ('660e8400-e29b-41d4-a716-446655440000', 1, true, '2025-01-11 00:00:00', '2025-01-11 00:30:00'),
-                ('660e8400-e29b-41d4-a716-446655440000', 2, true, '2025-01-11 00:30:00', '2025-01-11 01:00:00'),
-                ('660e8400-e29b-41d4-a716-446655440000', 3, true, '2025-01-11 01:00:00', '2025-01-11 01:30:00'),
+                (UNHEX(REPLACE('660e8400-e29b-41d4-a716-446655440000', '-', '')), 1, true, '2025-01-11 00:00:00', '2025-01-11 00:30:00'),
+                (UNHEX(REPLACE('660e8400-e29b-41d4-a716-446655440000', '-', '')), 2, true, '2025-01-11 00:30:00', '2025-01-11 01:00:00'),
+                (UNHEX(REPLACE('660e8400-e29b-41d4-a716-446655440000', '-', '')), 3, true, '2025-01-11 01:00:00', '2025-01-11 01:30:00'),
                 -- Running migration chunks
-                ('660e8400-e29b-41d4-a716-446655440001', 1, true, '2025-01-11 22:00:00', '2025-01-11 22:20:00'),
-                ('660e8400-e29b-41d4-a716-446655440001', 2, true, '2025-01-11 22:20:00', '2025-01-11 22:40:00'),
-                ('660e8400-e29b-41d4-a716-446655440001', 3, false, '2025-01-11 22:40:00', NULL),
-                ('660e8400-e29b-41d4-a716-446655440001', 4, false, '2025-01-11 22:40:00', NULL),
+                (UNHEX(REPLACE('660e8400-e29b-41d4-a716-446655440001', '-', '')), 1, true, '2025-01-11 22:00:00', '2025-01-11 22:20:00'),
+                (UNHEX(REPLACE('660e8400-e29b-41d4-a716-446655440001', '-', '')), 2, true, '2025-01-11 22:20:00', '2025-01-11 22:40:00'),
+                (UNHEX(REPLACE('660e8400-e29b-41d4-a716-446655440001', '-', '')), 3, false, '2025-01-11 22:40:00', NULL),
+                (UNHEX(REPLACE('660e8400-e29b-41d4-a716-446655440001', '-', '')), 4, false, '2025-01-11 22:40:00', NULL),
                 -- Failed migration chunks
-                ('660e8400-e29b-41d4-a716-446655440003', 1, true, '2025-01-11 21:00:00', '2025-01-11 21:10:00'),
-                ('660e8400-e29b-41d4-a716-446655440003', 2, false, '2025-01-11 21:10:00', NULL)
+                (UNHEX(REPLACE('660e8400-e29b-41d4-a716-446655440003', '-', '')), 1, true, '2025-01-11 21:00:00', '2025-01-11 21:10:00'),
+                (UNHEX(REPLACE('660e8400-e29b-41d4-a716-446655440003', '-', '')), 2, false, '2025-01-11 21:10:00', NULL)
             """)
 
             logger.info("Migration completed successfully")
@@ -12,8 +12,12 @@ def migrate_to_uuid():
     try:
         # Drop existing tables in reverse order to handle foreign keys
         logger.info("Dropping existing tables...")
+        execute_write("DROP TABLE IF EXISTS metrics_rollup_state")
+        execute_write("DROP TABLE IF EXISTS migration_metrics_1h")
+        execute_write("DROP TABLE IF EXISTS migration_metrics_1m")
         execute_write("DROP TABLE IF EXISTS migration_metrics")
         execute_write("DROP TABLE IF EXISTS migration_logs")
+        execute_write("DROP TABLE IF EXISTS chunk_fingerprints")
         execute_write("DROP TABLE IF EXISTS job_chunks")
         execute_write("DROP TABLE IF EXISTS migrations")
         execute_write("DROP TABLE IF EXISTS connections")
@@ -47,7 +51,10 @@ def migrate_to_uuid():
                 time_start DATETIME,
                 time_finish DATETIME,
                 last_run DATETIME,
-                creation_time DATETIME NOT NULL
+                creation_time DATETIME NOT NULL,
+                source_table VARCHAR(255),
+                source_columns JSON,
+                source_filters JSON
             )
         """)
         
@@ -64,6 +71,20 @@ def migrate_to_uuid():
             )
         """)
         
+        # Chunk fingerprints table
+        execute_write("""
+            CREATE TABLE chunk_fingerprints (
+                migration_uuid BINARY(16),
+                chunk_id INT,
+                range_start BIGINT NOT NULL,
+                range_end BIGINT NOT NULL,
+                row_count BIGINT NOT NULL,
+                content_hash BIGINT UNSIGNED NOT NULL,
+                computed_at DATETIME NOT NULL,
+                PRIMARY KEY (migration_uuid, chunk_id)
+            )
+        """)
+        
         # Migration logs table
         execute_write("""
             CREATE TABLE migration_logs (
@@ -72,7 +93,9 @@ def migrate_to_uuid():
                 chunk_id INT,
                 log_level VARCHAR(20),
                 message TEXT,
-                timestamp DATETIME NOT NULL
+                timestamp DATETIME NOT NULL,
+                KEY idx_migration_logs_migration_time (migration_uuid, timestamp),
+                KEY idx_migration_logs_migration_log (migration_uuid, log_id)
             )
         """)
         
@@ -85,7 +108,33 @@ def migrate_to_uuid():
                 records_processed INT,
                 bytes_processed BIGINT,
                 processing_time INT,
-                timestamp DATETIME NOT NULL
+                timestamp DATETIME NOT NULL,
+                KEY idx_migration_metrics_migration_time (migration_uuid, timestamp),
+                KEY idx_migration_metrics_time (timestamp)
+            )
+        """)
+
+        # Metric rollup tables
+        for table in ('migration_metrics_1m', 'migration_metrics_1h'):
+            execute_write(f"""
+                CREATE TABLE {table} (
+                    migration_uuid BINARY(16),
+                    bucket_start DATETIME NOT NULL,
+                    chunks INT NOT NULL,
+                    records_processed BIGINT,
+                    bytes_processed BIGINT,
+                    processing_time BIGINT,
+                    max_processing_time INT,
+                    PRIMARY KEY (migration_uuid, bucket_start),
+                    KEY idx_{table}_time (bucket_start)
+                )
+            """)
+
+        execute_write("""
+            CREATE TABLE metrics_rollup_state (
+                name VARCHAR(32) PRIMARY KEY,
+                last_metric_id BIGINT NOT NULL,
+                updated_at DATETIME NOT NULL
             )
         """)
         
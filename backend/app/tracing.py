@@ -0,0 +1,137 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import logging
+import threading
+
+from app.core.metrics import STAGE_BYTES, STAGE_ERRORS, STAGE_ROWS, STAGE_SECONDS
+import app.core.pipeline  # noqa: F401
+from app.db import execute_many
+from services.tracing import LogExporter, RingBufferExporter, Span, SpanExporter, tracer
+
+logger = logging.getLogger(__name__)
+
+# Spans whose rows and bytes count towards their chunk's migration_metrics row
+VOLUME_SPANS = ('write',)
+DEFAULT_FLUSH_ROWS = 100
+# Rows kept while the metadata database is unreachable; the oldest are dropped beyond this
+MAX_PENDING_ROWS = 100_000
+
+
+class MigrationMetricsExporter(SpanExporter):
+    """
+    Turn finished ``chunk`` spans into ``migration_metrics`` rows
+
+    A chunk span (or one of its ancestors) must carry a ``migration_uuid`` attribute;
+    ``chunk_id`` falls back to ``chunk_index``. Rows and bytes are the chunk's own
+    counts, or the totals of the ``write`` spans inside it when the chunk has none.
+    Rows are buffered and written in one batch when a ``migration`` span ends, when
+    ``flush_rows`` are pending, or on :meth:`flush`. Spans often end on the event loop,
+    so writes run on a dedicated thread; rows stay buffered until a write succeeds.
+    """
+
+    def __init__(self, flush_rows: int = DEFAULT_FLUSH_ROWS):
+        self.flush_rows = flush_rows
+        self._volumes: Dict[int, Tuple[int, int]] = {}
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+        # One writer, so batches never overlap or reorder
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='migration-metrics')
+
+    def export(self, span: Span) -> None:
+        if span.name in VOLUME_SPANS:
+            chunk = span.ancestor('chunk')
+            if chunk is not None:
+                with self._lock:
+                    rows, size = self._volumes.get(chunk.span_id, (0, 0))
+                    self._volumes[chunk.span_id] = (rows + span.rows, size + span.bytes)
+            return
+
+        if span.name == 'chunk':
+            with self._lock:
+                rows, size = self._volumes.pop(span.span_id, (0, 0))
+            migration_uuid = span.lookup('migration_uuid')
+            if migration_uuid is None:
+                return
+            with self._lock:
+                self._pending.append((
+                    str(migration_uuid),
+                    span.lookup('chunk_id', span.attributes.get('chunk_index')),
+                    span.rows or rows,
+                    span.bytes or size,
+                    int(span.duration_ms),
+                    datetime.utcnow(),
+                ))
+                if len(self._pending) > MAX_PENDING_ROWS:
+                    del self._pending[:len(self._pending) - MAX_PENDING_ROWS]
+                    logger.warning(f"Dropped chunk metrics beyond {MAX_PENDING_ROWS} unwritten rows")
+                full = len(self._pending) >= self.flush_rows
+            if full:
+                self._schedule()
+        elif span.name == 'migration':
+            self._schedule()
+
+    def flush(self) -> None:
+        """Write pending rows and wait for the write (blocking; call off the event loop)"""
+        self._schedule().result()
+
+    def _schedule(self) -> Future:
+        return self._writer.submit(self._write)
+
+    def _write(self) -> None:
+        with self._lock:
+            batch = list(self._pending)
+        if not batch:
+            return
+        try:
+            execute_many("""
+                INSERT INTO migration_metrics (
+                    migration_uuid, chunk_id, records_processed, bytes_processed, processing_time, timestamp
+                )
+                VALUES (UNHEX(REPLACE(%s, '-', '')), %s, %s, %s, %s, %s)
+            """, batch)
+        except Exception as e:
+            logger.error(f"Writing {len(batch)} chunk metrics failed, keeping them for the next flush: {e}")
+            return
+        with self._lock:
+            # Only this thread removes rows, and new rows are appended after the batch
+            # (unless the cap dropped some of it meanwhile)
+            written = next((i for i, row in enumerate(self._pending) if row is batch[-1]), -1) + 1
+            del self._pending[:written]
+        logger.info(f"Wrote {len(batch)} chunk metrics from traces")
+
+
+class StageMetricsExporter(SpanExporter):
+    """Feed span latency, rows, bytes and errors into the pipeline_stage_* metrics"""
+
+    def export(self, span: Span) -> None:
+        STAGE_SECONDS.labels(span.name).observe(span.duration_ms / 1000)
+        if span.rows:
+            STAGE_ROWS.labels(span.name).inc(span.rows)
+        if span.bytes:
+            STAGE_BYTES.labels(span.name).inc(span.bytes)
+        if span.error:
+            STAGE_ERRORS.labels(span.name).inc()
+
+
+recent_spans: Optional[RingBufferExporter] = None
+
+
+def configure_tracing(exporters: str) -> None:
+    """Register the exporters named in a comma-separated list: log, buffer, metrics, prometheus"""
+    global recent_spans
+    for name in (part.strip().lower() for part in exporters.split(',')):
+        if not name:
+            continue
+        if name == 'log':
+            tracer.add_exporter(LogExporter())
+        elif name == 'buffer':
+            recent_spans = tracer.add_exporter(RingBufferExporter())
+        elif name == 'metrics':
+            tracer.add_exporter(MigrationMetricsExporter())
+        elif name == 'prometheus':
+            tracer.add_exporter(StageMetricsExporter())
+        else:
+            logger.warning(f"Unknown span exporter '{name}' ignored")
+    if tracer.enabled:
+        logger.info(f"Tracing enabled with exporters: {exporters}")
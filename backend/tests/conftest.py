@@ -0,0 +1,10 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(BACKEND_DIR)
+
+# Tests import the backend as ``app`` and the shared pipeline as ``services``
+for path in (BACKEND_DIR, REPO_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
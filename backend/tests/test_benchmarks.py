@@ -0,0 +1,36 @@
+"""Tiny runs of the benchmark suites, so a broken write path fails the tests"""
+import json
+
+from benchmarks import e2e, parquet_matrix
+
+
+def test_e2e_suite_completes(tmp_path):
+    output = tmp_path / 'e2e.json'
+    status = e2e.main([
+        '--rows', '2000', '--profiles', 'narrow', '--batch-rows', '500',
+        '--workdir', str(tmp_path), '--output', str(output), '--quiet',
+    ])
+    assert status == 0
+    cases = json.loads(output.read_text())['cases']
+    assert set(cases) == {'narrow/stream', 'narrow/dataframe'}
+    for case in cases.values():
+        assert case['rows'] == 2000
+        assert case['files'] >= 1 and case['output_bytes'] > 0
+
+
+def test_parquet_matrix_completes(tmp_path):
+    output = tmp_path / 'matrix.json'
+    status = parquet_matrix.main([
+        '--rows', '2000', '--profiles', 'narrow', '--batch-sizes', 'none', '1000',
+        '--workdir', str(tmp_path), '--output', str(output), '--quiet',
+    ])
+    assert status == 0
+    cases = json.loads(output.read_text())['cases']
+    assert set(cases) == {
+        'narrow/2000/DBSCAN/none',
+        'narrow/2000/SEQUENTIAL/none', 'narrow/2000/SEQUENTIAL/1000',
+        'narrow/2000/STREAMING/none', 'narrow/2000/STREAMING/1000',
+    }
+    for case in cases.values():
+        assert case['rows'] == 2000
+        assert case['files'] >= 1 and case['output_bytes'] > 0
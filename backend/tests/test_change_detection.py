@@ -0,0 +1,69 @@
+import asyncio
+
+import pyarrow as pa
+
+from services.change_detection import ChangeDetector, ChunkFingerprint, ChunkRange, plan_chunk_ranges
+
+
+class Table:
+    """An in-memory source read through ``stream_range``, like a connector without pushdown"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def stream_range(self, table_name, key_column, lower, upper, columns=None):
+        rows = [row for row in self.rows if lower <= row['id'] < upper]
+        if rows:
+            yield pa.RecordBatch.from_pylist(rows)
+
+
+def rows(ids, name='a'):
+    return [{'id': i, 'name': name} for i in ids]
+
+
+def detect(table, ranges, previous):
+    async def main():
+        return await ChangeDetector(table).changed_ranges('events', 'id', ranges, previous)
+    return asyncio.run(main())
+
+
+def stored(fingerprints):
+    return {fingerprint.chunk_id: fingerprint for fingerprint in fingerprints}
+
+
+def test_chunk_ranges_are_anchored_at_multiples_of_the_width():
+    assert plan_chunk_ranges(5, 25, 10) == [ChunkRange(0, 0, 10), ChunkRange(1, 10, 20), ChunkRange(2, 20, 30)]
+    assert plan_chunk_ranges(12, 13, 10) == [ChunkRange(1, 10, 20)]
+
+
+def test_only_modified_chunks_are_reported():
+    table = Table(rows(range(30)))
+    changed, first = detect(table, plan_chunk_ranges(0, 30, 10), {})
+    assert [chunk.chunk_id for chunk in changed] == [0, 1, 2]
+
+    table.rows[15]['name'] = 'b'
+    changed, current = detect(table, plan_chunk_ranges(0, 30, 10), stored(first))
+    assert changed == [ChunkRange(1, 10, 20)]
+    assert [fp.chunk_id for fp in current] == [0, 1, 2]
+
+
+def test_chunks_emptied_by_deleted_tail_rows_are_reported():
+    table = Table(rows(range(30)))
+    _, first = detect(table, plan_chunk_ranges(0, 30, 10), {})
+
+    table.rows = rows(range(12))
+    changed, current = detect(table, plan_chunk_ranges(0, 12, 10), stored(first))
+    assert changed == [ChunkRange(1, 10, 20), ChunkRange(2, 20, 30)]
+    assert current[-1] == ChunkFingerprint(2, 20, 30, 0, 0)
+
+    # Once stored as empty, the vanished chunk is not reported again
+    changed, _ = detect(table, plan_chunk_ranges(0, 12, 10), stored(current))
+    assert changed == []
+
+
+def test_fingerprints_tell_delimiters_and_nulls_apart():
+    fingerprints = [
+        detect(Table([{'id': 1, 'a': a, 'b': b}]), [ChunkRange(0, 0, 10)], {})[1][0].checksum
+        for a, b in [('a|', 'b'), ('a', '|b'), (None, 'a'), ('a', None), ('', None)]
+    ]
+    assert len(set(fingerprints)) == len(fingerprints)
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from services.database_migration import DatabaseMigrator, TableSize, WorkItem, summarize_plan
+
+GB = 1024 ** 3
+
+
+class Catalog:
+    """A source answering the migrator's catalog calls and recording the reads it gets"""
+
+    def __init__(self, sizes, primary_keys=None, bounds=None):
+        self.sizes = sizes
+        self.primary_keys = primary_keys or {}
+        self.bounds = bounds or {}
+        self.reads = []
+
+    async def get_table_sizes(self):
+        return self.sizes
+
+    async def get_primary_key_columns(self, table_name):
+        return self.primary_keys.get(table_name, [])
+
+    async def get_key_bounds(self, table_name, key_column):
+        return self.bounds.get(table_name, (None, None))
+
+    def stream_range(self, table_name, key_column, lower, upper, **kwargs):
+        self.reads.append(('range', table_name, key_column, lower, upper))
+
+    def stream_table(self, table_name, interval, offset, order_by=None, **kwargs):
+        self.reads.append(('table', table_name, interval, offset, order_by))
+
+
+def plan(source, tables=None, **options):
+    async def main():
+        migrator = DatabaseMigrator(source, split_threshold_bytes=GB, chunk_bytes=GB // 4, **options)
+        return migrator, migrator.plan(await migrator.discover(tables))
+    return asyncio.run(main())
+
+
+def chunks(plan_, table_name):
+    return [item for item in plan_.items if item.table_name == table_name]
+
+
+def test_integer_keys_split_into_ranges_with_open_outer_bounds():
+    source = Catalog({'events': (4000, 2 * GB)}, {'events': ['id']}, {'events': (1, 800)})
+    migrator, result = plan(source)
+
+    items = chunks(result, 'events')
+    assert [(item.lower, item.upper) for item in items] == [
+        (None, 101), (101, 201), (201, 301), (301, 401), (401, 501), (501, 601), (601, 701), (701, None),
+    ]
+    assert {item.key_column for item in items} == {'id'}
+    assert sum(item.estimated_rows for item in items) == 4000
+
+    migrator.stream_item(items[-1], batch_rows=10)
+    assert source.reads == [('range', 'events', 'id', 701, None)]
+
+
+def test_non_integer_keys_split_into_ordered_offset_windows():
+    source = Catalog({'users': (1000, GB + 1)}, {'users': ['email']}, {'users': ('a@x', 'z@x')})
+    migrator, result = plan(source)
+
+    items = chunks(result, 'users')
+    assert [(item.offset, item.limit) for item in items] == [(0, 200), (200, 200), (400, 200), (600, 200), (800, None)]
+    assert {item.order_by for item in items} == {('email',)}
+    assert all(item.key_column is None for item in items)
+
+    migrator.stream_item(items[1])
+    assert source.reads == [('table', 'users', 200, 200, ['email'])]
+
+
+def test_tables_without_a_primary_key_stay_whole():
+    source = Catalog({'logs': (1000, 3 * GB)}, {'logs': []})
+    migrator, result = plan(source)
+
+    assert chunks(result, 'logs') == [WorkItem('logs', 3 * GB, 1000)]
+    migrator.stream_item(result.items[0])
+    assert source.reads == [('table', 'logs', None, 0, None)]
+
+
+def test_small_tables_are_not_split_or_probed():
+    source = Catalog({'small': (10, 100), 'empty': (0, 0)}, {'small': ['id']}, {'small': (1, 10)})
+    source.get_primary_key_columns = None  # any key lookup would fail
+    _, result = plan(source, tables=['small'])
+    assert result.items == [WorkItem('small', 100, 10)]
+
+
+def test_items_run_largest_first_and_loads_follow_lpt():
+    sizes = {'a': (10, 700), 'b': (10, 500), 'c': (10, 400), 'd': (10, 300), 'e': (10, 200)}
+    _, result = plan(Catalog(sizes), max_concurrency=2)
+
+    assert [item.table_name for item in result.items] == ['a', 'b', 'c', 'd', 'e']
+    # a | b, then c, d and e each go to the lighter worker
+    assert sorted(result.worker_loads) == [1000, 1100]
+    assert result.predicted_makespan_bytes == 1100
+    assert summarize_plan(result)['tables'][0] == {'table_name': 'a', 'chunks': 1, 'estimated_bytes': 700}
+
+
+def test_run_takes_items_in_plan_order_and_records_failures():
+    sizes = {name: (10, size) for name, size in [('a', 500), ('b', 400), ('c', 300), ('d', 200)]}
+    started = []
+
+    async def transfer(item):
+        started.append(item.table_name)
+        await asyncio.sleep(0)
+        if item.table_name == 'c':
+            raise RuntimeError('copy failed')
+
+    async def main():
+        migrator = DatabaseMigrator(Catalog(sizes), max_concurrency=2)
+        return await migrator.run(migrator.plan(await migrator.discover()), transfer)
+
+    result = asyncio.run(main())
+    assert started == ['a', 'b', 'c', 'd']
+    assert sorted(item.table_name for item in result.completed) == ['a', 'b', 'd']
+    assert [(item.table_name, error) for item, error in result.failed] == [('c', 'copy failed')]
+
+
+def test_sources_without_sizes_or_counts_are_rejected():
+    with pytest.raises(TypeError, match='neither table sizes nor row counts'):
+        asyncio.run(DatabaseMigrator(object()).discover())
+
+
+def test_row_estimates_size_tables_from_their_schema():
+    class Counts:
+        async def get_tables(self):
+            return ['events']
+
+        async def estimate_row_count(self, table_name):
+            return 100
+
+        async def get_table_schema(self, table_name):
+            return {'id': 'int', 'name': 'text'}
+
+    tables = asyncio.run(DatabaseMigrator(Counts()).discover())
+    assert tables == [TableSize('events', 100, 100 * 2 * 16)]
@@ -0,0 +1,89 @@
+import asyncio
+import os
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+
+from app.connectors.dataset import PENDING_PREFIX, DatasetConnector
+
+
+def connector(tmp_path, **config) -> DatasetConnector:
+    dataset = DatasetConnector({'root': str(tmp_path), 'partition_by': ['region'], **config})
+    asyncio.run(dataset.connect())
+    return dataset
+
+
+def batch(ids, region='eu') -> pa.RecordBatch:
+    return pa.RecordBatch.from_pydict({'id': list(ids), 'region': [region] * len(ids)})
+
+
+def listed_rows(tmp_path, table='events') -> int:
+    # What an engine listing the directories sees: hive partitions, '_'/'.' paths skipped
+    return ds.dataset(str(tmp_path / table), format='parquet', partitioning='hive').count_rows()
+
+
+def files_under(tmp_path, table='events'):
+    root = tmp_path / table
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(root) for name in names
+    )
+
+
+def test_write_publishes_committed_files_under_final_names(tmp_path):
+    dataset = connector(tmp_path)
+    commit = dataset.write_batches('events', [batch(range(10)), batch(range(10, 15), region='us')])
+
+    assert commit['rows'] == 15
+    assert sorted(dataset.committed_files('events')) == sorted(entry['path'] for entry in commit['added'])
+    assert all(os.path.isfile(path) for path in dataset.committed_files('events'))
+    assert not any(PENDING_PREFIX in path for path in files_under(tmp_path))
+    assert listed_rows(tmp_path) == 15
+
+
+def test_failed_commit_stays_invisible_to_directory_readers(tmp_path, monkeypatch):
+    dataset = connector(tmp_path)
+    dataset.write_batches('events', [batch(range(10))])
+
+    def fail(*args, **kwargs):
+        raise OSError('marker write failed')
+    monkeypatch.setattr(dataset, '_commit', fail)
+    with pytest.raises(OSError):
+        dataset.write_batches('events', [batch(range(10, 30)), batch(range(30, 35), region='us')])
+
+    assert listed_rows(tmp_path) == 10
+    assert sum(PENDING_PREFIX in path for path in files_under(tmp_path)) == 2
+    assert dataset.vacuum('events') == 2
+    assert not any(PENDING_PREFIX in path for path in files_under(tmp_path))
+    assert listed_rows(tmp_path) == 10
+
+
+def test_vacuum_finishes_publishing_committed_runs(tmp_path, monkeypatch):
+    dataset = connector(tmp_path, partition_by=[])
+    monkeypatch.setattr(dataset, '_finish_publish', lambda added: None)
+    commit = dataset.write_batches('events', [batch(range(20))])
+
+    assert dataset.committed_files('events') == [entry['path'] for entry in commit['added']]
+    assert listed_rows(tmp_path) == 0
+
+    assert dataset.vacuum('events') == 0
+    assert all(os.path.isfile(path) for path in dataset.committed_files('events'))
+    assert listed_rows(tmp_path) == 20
+
+
+def test_compact_merges_small_files_per_partition(tmp_path):
+    dataset = connector(tmp_path)
+    for start in (0, 10, 20):
+        dataset.write_batches('events', [batch(range(start, start + 10)), batch([start], region='us')])
+    assert len(dataset.committed_files('events')) == 6
+
+    commit = dataset.compact('events')
+
+    assert len(commit['removed']) == 6
+    assert len(dataset.committed_files('events')) == 2
+    assert files_under(tmp_path) == sorted(
+        [os.path.relpath(path, tmp_path / 'events') for path in dataset.committed_files('events')]
+        + [os.path.join('_commits', name) for name in os.listdir(tmp_path / 'events' / '_commits')]
+    )
+    assert listed_rows(tmp_path) == 33
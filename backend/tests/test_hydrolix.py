@@ -0,0 +1,149 @@
+import asyncio
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pyarrow as pa
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.connectors.hydrolix import HydrolixConnector
+
+ORG = 'org-1'
+PROJECT = 'proj-1'
+
+
+class MockHydrolix:
+    """Config and streaming-ingest endpoints that record what they receive"""
+
+    def __init__(self, fail_ingests: int = 0, table_content_type: str = 'application/json'):
+        self.fail_ingests = fail_ingests
+        self.table_content_type = table_content_type
+        self.transforms = []
+        self.bodies = []
+        self.ingest_headers = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        base = f'/config/v1/orgs/{ORG}/projects/{PROJECT}'
+        app.router.add_post(f'{base}/tables/', self.create_table)
+        app.router.add_post(f'{base}/tables/{{table_id}}/transforms/', self.create_transform)
+        app.router.add_post('/ingest/event', self.ingest)
+        return app
+
+    async def create_table(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        return web.Response(
+            text=json.dumps({'uuid': 'table-1', 'name': body['name']}),
+            content_type=self.table_content_type,
+        )
+
+    async def create_transform(self, request: web.Request) -> web.Response:
+        self.transforms.append((request.match_info['table_id'], await request.json()))
+        return web.json_response({'uuid': 'transform-1'})
+
+    async def ingest(self, request: web.Request) -> web.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.fail_ingests:
+                self.fail_ingests -= 1
+                return web.Response(status=503, headers={'Retry-After': '0'})
+            self.bodies.append(await request.read())
+            self.ingest_headers.append(dict(request.headers))
+            return web.json_response({'code': 200})
+        finally:
+            self.in_flight -= 1
+
+
+def run_against(mock: MockHydrolix, scenario, **config):
+    async def main():
+        server = TestServer(mock.app())
+        await server.start_server()
+        base = str(server.make_url('')).rstrip('/')
+        connector = HydrolixConnector({
+            'api_url': base,
+            'ingest_url': f'{base}/ingest/event',
+            'token': 'token',
+            'org_id': ORG,
+            'project_id': PROJECT,
+            'max_retries': 2,
+            **config,
+        })
+        try:
+            return await scenario(connector)
+        finally:
+            await connector.disconnect()
+            await server.close()
+    return asyncio.run(main())
+
+
+def ingested_rows(mock: MockHydrolix):
+    return [json.loads(line) for body in mock.bodies for line in body.splitlines()]
+
+
+def test_create_table_declares_formats_per_type():
+    mock = MockHydrolix()
+    schema = {'id': 'INT64', 'day': 'DATE', 'created_at': 'TIMESTAMP', 'price': 'DECIMAL'}
+    run_against(mock, lambda c: c.create_table('events', schema))
+
+    table_id, transform = mock.transforms[0]
+    assert table_id == 'table-1'
+    columns = {c['name']: c['datatype'] for c in transform['settings']['output_columns']}
+    assert columns['day'] == {'type': 'datetime', 'format': '2006-01-02', 'primary': True}
+    assert columns['created_at'] == {'type': 'datetime', 'format': '2006-01-02 15:04:05.000000'}
+    assert columns['price'] == {'type': 'string'}
+
+
+def test_create_table_accepts_json_sent_as_text():
+    mock = MockHydrolix(table_content_type='text/plain')
+    run_against(mock, lambda c: c.create_table('events', {'created_at': 'TIMESTAMP'}))
+    assert mock.transforms[0][0] == 'table-1'
+
+
+def test_rows_serialize_in_the_declared_formats():
+    mock = MockHydrolix()
+    batch = pa.RecordBatch.from_pylist([
+        {
+            'day': date(2025, 1, 11),
+            'created_at': datetime(2025, 1, 11, 22, 40, 5, 123456),
+            'price': Decimal('12345678901234567.89'),
+        },
+        {
+            'day': date(2025, 1, 12),
+            'created_at': datetime(2025, 1, 12, 8, 0, tzinfo=timezone.utc),
+            'price': None,
+        },
+    ])
+    rows = run_against(mock, lambda c: c.ingest_batches([batch], 'events'))
+
+    assert rows == 2
+    assert ingested_rows(mock) == [
+        {'day': '2025-01-11', 'created_at': '2025-01-11 22:40:05.123456', 'price': '12345678901234567.89'},
+        {'day': '2025-01-12', 'created_at': '2025-01-12 08:00:00.000000', 'price': None},
+    ]
+    assert mock.ingest_headers[0]['x-hdx-table'] == f'{PROJECT}.events'
+    assert mock.ingest_headers[0]['x-hdx-transform'] == 'events'
+
+
+def test_ingest_retries_throttled_requests():
+    mock = MockHydrolix(fail_ingests=2)
+    batch = pa.RecordBatch.from_pylist([{'id': 1}, {'id': 2}])
+    run_against(mock, lambda c: c.ingest_batches([batch], 'events'))
+    assert ingested_rows(mock) == [{'id': 1}, {'id': 2}]
+
+
+def test_ingest_bounds_requests_in_flight_within_one_batch():
+    mock = MockHydrolix()
+    # One large batch split into 50 single-row requests
+    batch = pa.RecordBatch.from_pylist([{'id': i} for i in range(50)])
+    rows = run_against(
+        mock, lambda c: c.ingest_batches([batch], 'events'),
+        stream_batch_rows=1, max_concurrent_uploads=3,
+    )
+    assert rows == 50
+    assert sorted(row['id'] for row in ingested_rows(mock)) == list(range(50))
+    assert mock.max_in_flight <= 3
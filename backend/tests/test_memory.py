@@ -0,0 +1,40 @@
+import services.memory as memory
+from services.memory import MemoryGovernor, MemoryPressure, MemoryUsage
+
+MIB = 2**20
+
+
+def test_reservation_is_not_counted_again_once_allocated(monkeypatch):
+    rss = [100 * MIB]
+    monkeypatch.setattr(memory, 'current_rss', lambda: rss[0])
+    monkeypatch.setattr(memory, 'SAMPLE_TTL', -1)
+    governor = MemoryGovernor(budget_bytes=1000 * MIB)
+
+    with governor.reserve(300 * MIB):
+        assert governor.usage().used_bytes == 400 * MIB
+        # The stage allocates what it reserved: usage stays put instead of doubling
+        rss[0] = 400 * MIB
+        assert governor.usage().used_bytes == 400 * MIB
+        # Allocating beyond the reservation shows up as usual
+        rss[0] = 450 * MIB
+        assert governor.usage().used_bytes == 450 * MIB
+    assert governor.usage().used_bytes == 450 * MIB
+
+
+def test_overlapping_reservations_share_the_lowest_base(monkeypatch):
+    rss = [100 * MIB]
+    monkeypatch.setattr(memory, 'current_rss', lambda: rss[0])
+    monkeypatch.setattr(memory, 'SAMPLE_TTL', -1)
+    governor = MemoryGovernor(budget_bytes=1000 * MIB)
+
+    with governor.reserve(200 * MIB):
+        rss[0] = 250 * MIB
+        with governor.reserve(600 * MIB):
+            assert governor.usage().used_bytes == 900 * MIB
+            assert governor.pressure() == MemoryPressure.HARD
+    assert governor.usage().reserved_bytes == 0
+
+
+def test_used_bytes_is_rss_without_reservations():
+    assert MemoryUsage(100, 0, 0, 1000, reserve_base_bytes=50).used_bytes == 100
+    assert MemoryUsage(100, 0, 30, 1000, reserve_base_bytes=90).used_bytes == 120
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import pytest
+
+import app.metrics_rollup as rollup_module
+from app.metrics_rollup import ROLLUP_ID_SLACK, MetricsRollup
+
+MIGRATION = 'AB' * 16
+NOW = datetime(2025, 3, 1, 12, 0, 30)
+
+
+class FakeMetadata:
+    """Answers the rollup's state queries and records the buckets it recomputes"""
+
+    def __init__(self, last_id, max_id, first_seen, last_seen):
+        self.last_id = last_id
+        self.max_id = max_id
+        self.seen = (first_seen, last_seen)
+        self.scanned = None
+        self.recomputed = []
+        self.state_writes = []
+
+    def single(self, query, params=None):
+        if 'metrics_rollup_state' in query:
+            return {'last_metric_id': self.last_id} if self.last_id else None
+        return {'metric_id': self.max_id}
+
+    def query(self, query, params=None):
+        self.scanned = params
+        return [{'migration_uuid': MIGRATION, 'first_seen': self.seen[0], 'last_seen': self.seen[1]}]
+
+    def write(self, query, params=None):
+        if 'metrics_rollup_state' in query:
+            self.state_writes.append(params[0])
+        else:
+            table = query.split('INSERT INTO')[1].split()[0]
+            self.recomputed.append((table, params[1], params[2]))
+        return 1
+
+
+@pytest.fixture
+def metadata(monkeypatch):
+    def install(*args):
+        fake = FakeMetadata(*args)
+        monkeypatch.setattr(rollup_module, 'execute_single', fake.single)
+        monkeypatch.setattr(rollup_module, 'execute_query', fake.query)
+        monkeypatch.setattr(rollup_module, 'execute_write', fake.write)
+        return fake
+    return install
+
+
+def test_rescans_ids_below_the_last_pass(metadata):
+    fake = metadata(20_000, 20_000, datetime(2025, 3, 1, 11, 59, 10), datetime(2025, 3, 1, 11, 59, 50))
+    # No id beyond the last pass, but a late commit below it is still picked up
+    assert MetricsRollup().rollup(now=NOW) == 1
+    assert fake.scanned == (20_000 - ROLLUP_ID_SLACK, 20_000)
+    assert fake.recomputed[0] == ('migration_metrics_1m', datetime(2025, 3, 1, 11, 59), datetime(2025, 3, 1, 12, 0))
+    assert fake.state_writes == []
+
+
+def test_advances_the_watermark(metadata):
+    fake = metadata(0, 42, datetime(2025, 3, 1, 11, 59, 10), datetime(2025, 3, 1, 11, 59, 50))
+    MetricsRollup().rollup(now=NOW)
+    assert fake.scanned == (0, 42)
+    assert fake.state_writes == [42]
+
+
+def test_skips_buckets_whose_raw_rows_are_past_retention(metadata):
+    # A late row from 10 days ago next to a fresh one; raw rows are kept for 7 days
+    fake = metadata(0, 42, datetime(2025, 2, 19, 9, 30, 15), datetime(2025, 3, 1, 11, 59, 50))
+    MetricsRollup(raw_days=7, minute_days=30).rollup(now=NOW)
+    starts = {table: start for table, start, _ in fake.recomputed}
+    # The oldest 1m bucket recomputed is the first one fully inside raw retention
+    assert starts['migration_metrics_1m'] == datetime(2025, 2, 22, 12, 1)
+    # 1h buckets come from 1m rows, which are still retained there
+    assert starts['migration_metrics_1h'] == datetime(2025, 2, 19, 9)
+
+
+def test_keeps_everything_without_retention(metadata):
+    fake = metadata(0, 42, datetime(2020, 1, 1, 0, 0, 5), datetime(2020, 1, 1, 0, 0, 5))
+    MetricsRollup(raw_days=0).rollup(now=NOW)
+    assert fake.recomputed[0][1] == datetime(2020, 1, 1, 0, 0)
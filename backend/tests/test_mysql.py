@@ -0,0 +1,120 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pyarrow as pa
+import pytest
+
+from app.connectors.mysql import MySQLConnector
+from app.connectors.parallel import ScanRange
+
+CONFIG = {'host': 'db', 'username': 'app', 'database': 'shop'}
+SCHEMA = {'id': 'bigint(20)', 'name': 'varchar(64)'}
+
+
+class Cursor:
+    """Records executed SQL; answers catalog queries and serves ``rows`` to range scans"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.description = None
+        self._rows = []
+
+    async def execute(self, query, params=None):
+        self.pool.executed.append((' '.join(query.split()), tuple(params or ())))
+        if 'KEY_COLUMN_USAGE' in query:
+            self._rows = [(column,) for column in self.pool.primary_key]
+        elif query.startswith('DESCRIBE'):
+            self._rows = list(SCHEMA.items())
+        elif query.startswith('SELECT MIN('):
+            self._rows = [self.pool.bounds]
+        elif 'MD5(' in query:
+            self._rows = [(3, 2**64 + 5)]
+        else:
+            self.description = [('id',), ('name',)]
+            self._rows = [(params[0] if params else 0, 'row')]
+
+    async def fetchall(self):
+        return self._rows
+
+    async def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    async def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+
+class Pool:
+    def __init__(self, primary_key=('id',), bounds=(1, 100)):
+        self.primary_key = primary_key
+        self.bounds = bounds
+        self.executed = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    @asynccontextmanager
+    async def cursor(self, cursor_class=None):
+        yield Cursor(self)
+
+
+def connector(**pool) -> MySQLConnector:
+    mysql = MySQLConnector(CONFIG)
+    mysql.pool = Pool(**pool)
+    return mysql
+
+
+def test_requires_a_database():
+    with pytest.raises(ValueError, match='need a database'):
+        MySQLConnector({'host': 'db'})
+
+
+def test_catalog_queries_filter_on_the_configured_database():
+    mysql = connector()
+    assert asyncio.run(mysql.get_primary_key_columns('orders')) == ['id']
+    assert mysql.pool.executed[0][1] == ('shop', 'orders')
+
+
+def test_splits_integer_keys_into_ranges_with_an_open_last_range():
+    ranges = asyncio.run(connector(bounds=(1, 100)).plan_scan_ranges('orders', parts=4))
+    assert ranges[0] == ScanRange('id', 1, 26)
+    assert [(r.lower, r.upper) for r in ranges[1:]] == [(26, 51), (51, 76), (76, None)]
+
+
+@pytest.mark.parametrize('pool, expected', [
+    ({'primary_key': ('id', 'name')}, [ScanRange('', None, None)]),
+    ({'primary_key': ('name',)}, [ScanRange('', None, None)]),
+    ({'bounds': (None, None)}, [ScanRange('id', None, None)]),
+])
+def test_tables_without_an_integer_key_or_rows_are_one_range(pool, expected):
+    assert asyncio.run(connector(**pool).plan_scan_ranges('orders', parts=4)) == expected
+
+
+def test_parallel_scan_queries_cover_each_range():
+    mysql = connector(bounds=(1, 100))
+
+    async def read():
+        return [batch async for batch in mysql.stream_parallel(
+            'orders', parts=2, columns=['id', 'name'], filters=[{'column': 'name', 'op': '=', 'value': 'a'}],
+        )]
+
+    batches = asyncio.run(read())
+    scans = sorted(entry for entry in mysql.pool.executed if entry[0].startswith('SELECT `id`'))
+    assert scans == [
+        ('SELECT `id`, `name` FROM `orders` WHERE `id` >= %s AND `id` < %s AND `name` = %s', (1, 51, 'a')),
+        ('SELECT `id`, `name` FROM `orders` WHERE `id` >= %s AND `name` = %s', (51, 'a')),
+    ]
+    assert pa.Table.from_batches(batches).num_rows == 2
+
+
+def test_range_checksums_hash_length_prefixed_values():
+    mysql = connector()
+    assert asyncio.run(mysql.checksum_range('orders', 'id', 1, 51, ['name', 'id'])) == (3, 5)
+    query, params = mysql.pool.executed[-1]
+    assert params == (1, 51)
+    assert (
+        "MD5(CONCAT(IFNULL(CONCAT(LENGTH(`id`), ':', `id`), 'N'), "
+        "IFNULL(CONCAT(LENGTH(`name`), ':', `name`), 'N')))"
+    ) in query
+    assert 'CRC32' not in query and 'CONCAT_WS' not in query
@@ -0,0 +1,74 @@
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import services.parquet as parquet
+from services.parquet_manifest import ParquetManifest, manifest_path_for
+
+
+# The worker's segment handle can only be released once the traceback is gone
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnraisableExceptionWarning')
+def test_shared_table_encode_errors_are_not_masked(monkeypatch, tmp_path):
+    segment, size = parquet._table_to_shared_memory(pa.table({'id': [1, 2, 3]}))
+
+    def fail(table, *args):
+        raise RuntimeError('encode failed')
+
+    monkeypatch.setattr(parquet, '_encode_table', fail)
+    try:
+        with pytest.raises(RuntimeError, match='encode failed'):
+            parquet._encode_shared_table(segment.name, size, str(tmp_path / 'out.parquet'), {})
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': range(rows),
+        'amount': [i * 0.5 for i in range(rows)],
+        'name': [f'name-{i % 7}' for i in range(rows)],
+    })
+
+
+def assert_manifest_matches(paths, manifest_path, rows):
+    assert paths and all(os.path.exists(path) for path in paths)
+    manifest = ParquetManifest.load(manifest_path)
+    assert manifest.paths == paths
+    assert manifest.total_rows == rows == sum(pq.read_metadata(path).num_rows for path in paths)
+    for entry in manifest.entries:
+        with open(entry.path, 'rb') as f:
+            content = f.read()
+        assert entry.byte_size == len(content)
+        assert entry.checksum == f'sha256:{hashlib.sha256(content).hexdigest()}'
+        assert entry.column_stats['id']['min'] >= 0
+
+
+@pytest.mark.parametrize('mode', list(parquet.ProcessingMode))
+@pytest.mark.parametrize('parallel', [False, True])
+def test_dataframe_to_parquet_writes_files_and_manifest(tmp_path, mode, parallel):
+    service = parquet.ParquetService(max_workers=2)
+    output = str(tmp_path / 'events.parquet')
+    try:
+        paths = service.dataframe_to_parquet(
+            frame(100), output, mode=mode, batch_size=40, parallel=parallel, manifest=True,
+        )
+    finally:
+        service.thread_pool.shutdown()
+    assert_manifest_matches(paths, manifest_path_for(output), 100)
+    assert sorted(pd.concat(pd.read_parquet(path) for path in paths)['id']) == list(range(100))
+
+
+def test_write_batches_writes_files_and_manifest(tmp_path):
+    service = parquet.ParquetService(max_workers=1)
+    output = str(tmp_path / 'events.parquet')
+    batches = [pa.RecordBatch.from_pandas(frame(100).iloc[i:i + 25], preserve_index=False) for i in range(0, 100, 25)]
+    try:
+        paths = service.write_batches(batches, output, row_group_rows=30, manifest=True, auto_tune=True)
+    finally:
+        service.thread_pool.shutdown()
+    assert_manifest_matches(paths, manifest_path_for(output), 100)
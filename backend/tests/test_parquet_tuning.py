@@ -0,0 +1,61 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.parquet import ParquetService, ProcessingMode
+from services.parquet_tuning import EncodingTuner, cover_all_columns, leaf_paths
+
+
+def codecs(path_or_buffer):
+    metadata = pq.ParquetFile(path_or_buffer).metadata
+    row_group = metadata.row_group(0)
+    return {row_group.column(i).path_in_schema: row_group.column(i).compression for i in range(row_group.num_columns)}
+
+
+def nested_table(rows: int = 2000) -> pa.Table:
+    return pa.table({
+        'id': pa.array(range(rows), pa.int64()),
+        'amount': pa.array([i * 0.25 for i in range(rows)]),
+        'n': pa.array([{'x': i, 'y': f'v{i % 5}'} for i in range(rows)]),
+        'l': pa.array([[i, i + 1] for i in range(rows)]),
+    })
+
+
+def test_leaf_paths_follow_the_writer():
+    assert leaf_paths(nested_table(1).schema) == ['id', 'amount', 'n.x', 'n.y', 'l.list.element']
+
+
+def test_tuned_options_compress_nested_leaves():
+    table = nested_table()
+    options = EncodingTuner(sample_rows=500, min_encode_mbps=0).tune(table).writer_options(table.schema)
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink, **options)
+    found = codecs(pa.BufferReader(sink.getvalue()))
+    assert set(found) == set(leaf_paths(table.schema))
+    assert 'UNCOMPRESSED' not in found.values()
+
+
+def test_cover_all_columns_adds_missing_columns_with_the_default():
+    schema = pa.schema([('id', pa.int64()), ('__index_level_0__', pa.int64())])
+    options = {'compression': {'id': 'zstd'}, 'use_dictionary': []}
+    completed = cover_all_columns(options, schema)
+    assert completed['compression'] == {'id': 'zstd', '__index_level_0__': 'snappy'}
+    assert completed['use_dictionary'] == ['__index_level_0__']
+    assert cover_all_columns({'compression': 'snappy'}, schema) == {'compression': 'snappy'}
+
+
+def test_auto_tuned_chunks_compress_the_pandas_index(tmp_path):
+    df = pd.DataFrame({'id': range(1000), 'name': [f'n{i % 3}' for i in range(1000)]})
+    # Not a RangeIndex, so pandas stores it as the __index_level_0__ column
+    df.index = pd.Index([i * 2 for i in range(1000)])
+    service = ParquetService(max_workers=1)
+    try:
+        paths = service.dataframe_to_parquet(
+            df, str(tmp_path / 'events.parquet'), mode=ProcessingMode.SEQUENTIAL, batch_size=400, auto_tune=True,
+        )
+    finally:
+        service.thread_pool.shutdown()
+    for path in paths:
+        found = codecs(path)
+        assert '__index_level_0__' in found
+        assert 'UNCOMPRESSED' not in found.values()
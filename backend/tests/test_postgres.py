@@ -0,0 +1,32 @@
+import asyncio
+
+from app.connectors.parallel import ScanRange
+from app.connectors.postgres import PostgresConnector
+
+
+class KeyedTable(PostgresConnector):
+    """A connector answering the planner's catalog queries for one integer-keyed table"""
+
+    def __init__(self, lower, upper):
+        super().__init__({})
+        self.bounds = (lower, upper)
+
+    async def get_primary_key_columns(self, table_name):
+        return ['id']
+
+    async def get_table_schema(self, table_name):
+        return {'id': 'bigint', 'name': 'text'}
+
+    async def get_key_bounds(self, table_name, key_column):
+        return self.bounds
+
+
+def test_last_key_range_is_open_ended():
+    ranges = asyncio.run(KeyedTable(1, 100).plan_scan_ranges('events', parts=4))
+    assert ranges[0] == ScanRange('id', 1, 26)
+    assert [(r.lower, r.upper) for r in ranges[1:]] == [(26, 51), (51, 76), (76, None)]
+
+
+def test_empty_table_is_one_open_range():
+    ranges = asyncio.run(KeyedTable(None, None).plan_scan_ranges('events', parts=4))
+    assert ranges == [ScanRange('id', None, None)]
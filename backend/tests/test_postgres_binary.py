@@ -0,0 +1,133 @@
+import struct
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pyarrow as pa
+import pytest
+
+from app.connectors.postgres_binary import COPY_SIGNATURE, BinaryCopyDecoder, decode_numeric
+
+# Canned `COPY (SELECT ...) TO STDOUT (FORMAT binary)` output, built field by field from
+# the wire format: header, then per tuple an int16 field count and int32-length-prefixed
+# values (-1 for NULL), then an int16 -1 trailer.
+HEADER = COPY_SIGNATURE + struct.pack('>ii', 0, 0)
+TRAILER = struct.pack('>h', -1)
+NULL = None
+
+
+def tuple_bytes(*values) -> bytes:
+    out = struct.pack('>h', len(values))
+    for value in values:
+        out += struct.pack('>i', -1) if value is None else struct.pack('>i', len(value)) + value
+    return out
+
+
+def int4(value: int) -> bytes:
+    return struct.pack('>i', value)
+
+
+def numeric(ndigits_weight_sign_dscale, digits) -> bytes:
+    return struct.pack('>hhHh', *ndigits_weight_sign_dscale) + struct.pack(f'>{len(digits)}h', *digits)
+
+
+def micros_since_2000(value: datetime) -> bytes:
+    delta = value - datetime(2000, 1, 1, tzinfo=value.tzinfo)
+    return struct.pack('>q', (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def days_since_2000(value: date) -> bytes:
+    return struct.pack('>i', (value - date(2000, 1, 1)).days)
+
+
+FIELDS = [
+    ('id', 23, pa.int32()),
+    ('price', 1700, pa.decimal128(20, 3)),
+    ('amount', 1700, pa.string()),                  # unconstrained numeric
+    ('day', 1082, pa.date32()),
+    ('created_at', 1114, pa.timestamp('us')),
+    ('updated_at', 1184, pa.timestamp('us', tz='UTC')),
+    ('tags', 25, pa.string()),                      # int4[] cast to text by the COPY query
+    ('doc', 3802, pa.string()),                     # jsonb
+    ('ref', 2950, pa.string()),                     # uuid
+]
+
+REF = UUID('12345678-1234-5678-1234-567812345678')
+ROWS = [
+    tuple_bytes(
+        int4(1),
+        numeric((3, 1, 0, 3), (1, 2345, 6780)),     # 12345.678
+        numeric((1, -1, 0x4000, 1), (5000,)),       # -0.5
+        days_since_2000(date(2025, 1, 11)),
+        micros_since_2000(datetime(2025, 1, 11, 22, 40, 5, 123456)),
+        micros_since_2000(datetime(2025, 1, 11, 8, 0, tzinfo=timezone.utc)),
+        b'{1,2,NULL}',
+        b'\x01{"a": 1}',
+        REF.bytes,
+    ),
+    tuple_bytes(
+        int4(2),
+        NULL,
+        numeric((0, 0, 0xC000, 0), ()),             # NaN
+        days_since_2000(date(1999, 12, 31)),
+        struct.pack('>q', 2**63 - 1),                # 'infinity'
+        NULL,
+        b'{}',
+        NULL,
+        NULL,
+    ),
+]
+STREAM = HEADER + b''.join(ROWS) + TRAILER
+
+EXPECTED = {
+    'id': [1, 2],
+    'price': [Decimal('12345.678'), None],
+    'amount': ['-0.5', None],
+    'day': [date(2025, 1, 11), date(1999, 12, 31)],
+    'created_at': [datetime(2025, 1, 11, 22, 40, 5, 123456), None],
+    'updated_at': [datetime(2025, 1, 11, 8, 0, tzinfo=timezone.utc), None],
+    'tags': ['{1,2,NULL}', '{}'],
+    'doc': ['{"a": 1}', None],
+    'ref': [str(REF), None],
+}
+
+
+def decode(chunks, batch_rows=1000):
+    decoder = BinaryCopyDecoder(FIELDS, batch_rows)
+    batches = []
+    for chunk in chunks:
+        batches.extend(decoder.feed(chunk))
+    batches.extend(decoder.finish())
+    return batches
+
+
+def test_decodes_nulls_numerics_timestamps_and_arrays():
+    table = pa.Table.from_batches(decode([STREAM]))
+    assert table.schema == pa.schema([pa.field(name, arrow_type) for name, _, arrow_type in FIELDS])
+    assert table.to_pydict() == EXPECTED
+
+
+def test_decodes_a_stream_split_at_every_byte():
+    batches = decode([STREAM[i:i + 1] for i in range(len(STREAM))], batch_rows=1)
+    assert [batch.num_rows for batch in batches] == [1, 1]
+    assert pa.Table.from_batches(batches).to_pydict() == EXPECTED
+
+
+def test_numeric_scale_and_padding():
+    assert decode_numeric(memoryview(numeric((1, 2, 0, 0), (12,)))) == Decimal('1200000000')
+    assert decode_numeric(memoryview(numeric((1, -2, 0, 6), (4200,)))) == Decimal('0.000042')
+    assert decode_numeric(memoryview(numeric((0, 0, 0, 2), ()))) == Decimal('0.00')
+
+
+def test_rejects_truncated_and_foreign_streams():
+    decoder = BinaryCopyDecoder(FIELDS, 1000)
+    decoder.feed(STREAM[:len(STREAM) - 10])
+    with pytest.raises(ValueError, match='mid-tuple'):
+        decoder.finish()
+    with pytest.raises(ValueError, match='Not a binary COPY stream'):
+        BinaryCopyDecoder(FIELDS, 1000).feed(b'id,price\n' * 4)
+
+
+def test_array_columns_need_a_text_cast():
+    with pytest.raises(ValueError, match='cast the column to text'):
+        BinaryCopyDecoder([('tags', 1007, pa.list_(pa.int32()))], 1000)
@@ -0,0 +1,44 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+import app.connectors.registry as registry
+from app.schemas.database_types import DatabaseType
+
+
+class FakeConnector:
+    def __init__(self, config):
+        self.config = config
+        self.connected = False
+
+    async def connect(self):
+        self.connected = True
+
+    async def disconnect(self):
+        self.connected = False
+
+
+def lease(monkeypatch, db_type):
+    monkeypatch.setattr(registry, 'execute_single', lambda query, params=None: {
+        'db_type': db_type, 'db_variables': '{"database": "app"}',
+    })
+    monkeypatch.setitem(registry.CONNECTOR_TYPES, DatabaseType.POSTGRES, FakeConnector)
+
+    async def main():
+        connectors = registry.ConnectorRegistry()
+        async with connectors.lease(uuid4()) as connector:
+            return connector, connectors._entries
+    return asyncio.run(main())
+
+
+def test_legacy_postgresql_rows_open_a_postgres_connector(monkeypatch):
+    connector, entries = lease(monkeypatch, 'postgresql')
+    assert isinstance(connector, FakeConnector)
+    assert connector.connected and connector.config == {'database': 'app'}
+    assert [entry.db_type for entry in entries.values()] == [DatabaseType.POSTGRES]
+
+
+def test_unknown_db_types_are_unsupported(monkeypatch):
+    with pytest.raises(registry.UnsupportedDatabaseError, match='oracle'):
+        lease(monkeypatch, 'oracle')
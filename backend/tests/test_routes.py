@@ -0,0 +1,78 @@
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.routes as routes
+
+
+class Source:
+    async def get_tables(self):
+        return ['events']
+
+
+@asynccontextmanager
+async def source_connector(db_uuid):
+    yield Source()
+
+
+def client() -> TestClient:
+    api = FastAPI()
+    api.include_router(routes.router)
+    return TestClient(api)
+
+
+def test_plan_rejects_tables_the_source_does_not_have(monkeypatch):
+    def planner(**kwargs):
+        raise AssertionError('planner must not run for an unknown table')
+
+    monkeypatch.setattr(routes, '_source_connector', source_connector)
+    monkeypatch.setattr(routes, 'MigrationPlanner', planner)
+    response = client().post(
+        '/migrations/plan',
+        json={'source_uuid': str(uuid4()), 'table_name': 'events; DROP TABLE events'},
+    )
+    assert response.status_code == 404
+    assert response.json()['detail'] == 'Table events; DROP TABLE events not found'
+
+
+def test_plan_rejects_invalid_projections_as_bad_requests(monkeypatch):
+    class Planner:
+        def __init__(self, **kwargs):
+            pass
+
+        async def plan(self, connector, table_name, *args, columns=None, filters=None):
+            raise ValueError(f"Unknown columns for {table_name}: {columns}")
+
+    monkeypatch.setattr(routes, '_source_connector', source_connector)
+    monkeypatch.setattr(routes, 'MigrationPlanner', Planner)
+    response = client().post(
+        '/migrations/plan',
+        json={'source_uuid': str(uuid4()), 'table_name': 'events', 'columns': ['missing']},
+    )
+    assert response.status_code == 400
+    assert response.json()['detail'] == "Unknown columns for events: ['missing']"
+
+
+def migration(**fields):
+    return {
+        'migration_name': 'events', 'source_uuid': str(uuid4()), 'target_uuid': str(uuid4()),
+        'source_type': 'singlestore', 'target_type': 'dataset', 'is_recurring': False,
+        **fields,
+    }
+
+
+def test_create_rejects_unknown_source_tables_without_a_projection(monkeypatch):
+    writes = []
+    monkeypatch.setattr(routes, '_source_connector', source_connector)
+    monkeypatch.setattr(routes, 'execute_single', lambda query, params=None: {'db_type': 'singlestore'})
+    monkeypatch.setattr(routes, 'execute_write', lambda query, params=None: writes.append(params))
+
+    response = client().post('/migrations', json=migration(source_table='events` UNION SELECT 1 --'))
+    assert response.status_code == 404
+    assert writes == []
+
+    response = client().post('/migrations', json=migration(source_table='events'))
+    assert response.status_code == 200
+    assert len(writes) == 1
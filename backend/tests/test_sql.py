@@ -0,0 +1,8 @@
+from app.connectors.sql import MYSQL, POSTGRES, build_select
+
+
+def test_build_select_quotes_the_table_name():
+    query, params = build_select('ev`ents', ['id'], dialect=MYSQL)
+    assert query == 'SELECT `id` FROM `ev``ents`'
+    query, params = build_select('events', None, dialect=POSTGRES)
+    assert query == 'SELECT * FROM "events"'
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+from services.tracing import RingBufferExporter, Tracer
+
+
+def test_event_loop_thread_reports_the_running_tasks_spans():
+    tracer = Tracer()
+    tracer.add_exporter(RingBufferExporter())
+    seen = {}
+
+    async def migrate(name: str, entered: asyncio.Event, resume: asyncio.Event):
+        with tracer.span('migration', migration_uuid=name):
+            with tracer.span('chunk'):
+                entered.set()
+                await resume.wait()
+                seen[name] = [(s.name, s.lookup('migration_uuid')) for s in tracer.thread_spans()]
+
+    async def main():
+        a_in, b_in, a_go, b_go = (asyncio.Event() for _ in range(4))
+        a = asyncio.create_task(migrate('a', a_in, a_go))
+        b = asyncio.create_task(migrate('b', b_in, b_go))
+        await a_in.wait()
+        await b_in.wait()
+        # Both tasks have spans open on this thread, but neither is running
+        seen['idle'] = tracer.thread_spans()
+        a_go.set()
+        await a
+        b_go.set()
+        await b
+
+    asyncio.run(main())
+    assert seen['idle'] == []
+    assert seen['a'] == [('migration', 'a'), ('chunk', 'a')]
+    assert seen['b'] == [('migration', 'b'), ('chunk', 'b')]
+
+
+def test_worker_threads_report_their_own_stack():
+    tracer = Tracer()
+    tracer.add_exporter(RingBufferExporter())
+    entered, release = threading.Event(), threading.Event()
+
+    def work():
+        with tracer.span('migration', migration_uuid='a'), tracer.span('encode'):
+            entered.set()
+            release.wait()
+
+    worker = threading.Thread(target=work)
+    worker.start()
+    entered.wait()
+    try:
+        assert tracer.thread_stages(worker.ident) == ['migration', 'encode']
+    finally:
+        release.set()
+        worker.join()
+    assert tracer.thread_stages(worker.ident) == []
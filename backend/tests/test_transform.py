@@ -0,0 +1,71 @@
+import pyarrow as pa
+import pytest
+
+from services.transform import TransformPipeline, parse_type
+
+
+def run(spec, **columns) -> dict:
+    return TransformPipeline.from_spec(spec).apply(pa.RecordBatch.from_pydict(columns)).to_pydict()
+
+
+def test_mask_keeps_only_the_last_characters():
+    out = run(
+        [{'op': 'mask', 'column': 'card', 'keep_last': 4}],
+        card=['4111111111111111', '12345', None, ''],
+    )
+    assert out['card'] == ['************1111', '*2345', None, '']
+
+
+def test_mask_hides_values_no_longer_than_keep_last():
+    out = run(
+        [{'op': 'mask', 'column': 'pin', 'keep_last': 4, 'char': '#'}],
+        pin=['1234', '12', 'äö', '12345'],
+    )
+    assert out['pin'] == ['####', '##', '##', '#2345']
+
+
+def test_mask_without_keep_last_and_of_non_string_columns():
+    out = run(
+        [{'op': 'mask', 'column': 'name'}, {'op': 'mask', 'column': 'id', 'keep_last': 2}],
+        name=['alice', None], id=[123456, 7],
+    )
+    assert out == {'name': ['*****', None], 'id': ['****56', '*']}
+
+
+def test_steps_run_in_order_on_whole_columns():
+    out = run(
+        [
+            {'op': 'rename', 'column': 'ts', 'to': 'event_time'},
+            {'op': 'cast', 'column': 'amount', 'type': 'decimal128(18, 2)'},
+            {'op': 'redact', 'column': 'ssn'},
+            {'op': 'nullify', 'column': 'notes'},
+            {'op': 'derive', 'column': 'name',
+             'expr': {'fn': 'binary_join_element_wise', 'args': [{'column': 'first'}, {'column': 'last'}, ' ']}},
+            {'op': 'drop', 'column': 'first'},
+            {'op': 'drop', 'column': 'last'},
+        ],
+        ts=[1, 2], amount=[1.5, 2.25], ssn=['123-45-6789', None], notes=['a', 'b'],
+        first=['Ada', 'Alan'], last=['Lovelace', 'Turing'],
+    )
+    assert list(out) == ['event_time', 'amount', 'ssn', 'notes', 'name']
+    assert [str(value) for value in out['amount']] == ['1.50', '2.25']
+    assert out['ssn'] == ['[REDACTED]', None]
+    assert out['notes'] == [None, None]
+    assert out['name'] == ['Ada Lovelace', 'Alan Turing']
+
+
+@pytest.mark.parametrize('spec, message', [
+    ([{'op': 'explode', 'column': 'a'}], 'Unknown transform op'),
+    ([{'op': 'mask', 'column': 'a', 'keep_last': -1}], 'keep_last >= 0'),
+    ([{'op': 'cast', 'column': 'a', 'type': 'money'}], 'Unknown Arrow type'),
+    ([{'op': 'derive', 'column': 'b', 'expr': {'fn': 'no_such_function'}}], 'Unknown compute function'),
+])
+def test_invalid_specs_are_rejected(spec, message):
+    with pytest.raises(ValueError, match=message):
+        TransformPipeline.from_spec(spec)
+
+
+def test_parse_type_widens_large_decimals():
+    assert parse_type('decimal(18, 4)') == pa.decimal128(18, 4)
+    assert parse_type('decimal128(40, 2)') == pa.decimal256(40, 2)
+    assert parse_type('timestamp[ms]') == pa.timestamp('ms')
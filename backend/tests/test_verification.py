@@ -0,0 +1,60 @@
+import asyncio
+
+import pyarrow as pa
+
+from services.verification import VerificationEngine, arrow_batch_checksum, split_key_range
+
+
+class Table:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def get_key_bounds(self, table_name, key_column):
+        keys = [row[key_column] for row in self.rows]
+        return (min(keys), max(keys)) if keys else (None, None)
+
+    async def stream_range(self, table_name, key_column, lower, upper, columns=None):
+        rows = [row for row in self.rows if lower <= row[key_column] < upper]
+        if rows:
+            yield pa.RecordBatch.from_pylist(rows)
+
+
+def rows(ids):
+    return [{'id': i, 'name': f'n{i}'} for i in ids]
+
+
+def verify(source, destination, **options):
+    async def main():
+        engine = VerificationEngine(Table(source), Table(destination), **options)
+        return await engine.verify_table('events', 'id', range_count=4)
+    return asyncio.run(main())
+
+
+def test_split_key_range_covers_the_span():
+    assert split_key_range(0, 10, 3) == [(0, 4), (4, 8), (8, 10)]
+    assert split_key_range(5, 6, 4) == [(5, 6)]
+
+
+def test_batch_checksum_ignores_order_and_widths():
+    forward = pa.RecordBatch.from_pydict({'id': pa.array([1, 2], pa.int32()), 'name': ['a', None]})
+    backward = pa.RecordBatch.from_pydict({'name': [None, 'a'], 'id': pa.array([2, 1], pa.int64())})
+    assert arrow_batch_checksum(forward) == arrow_batch_checksum(backward)
+    swapped = pa.RecordBatch.from_pydict({'id': pa.array([1, 2], pa.int32()), 'name': [None, 'a']})
+    assert arrow_batch_checksum(forward) != arrow_batch_checksum(swapped)
+
+
+def test_drills_down_to_the_mismatched_range():
+    destination = rows(range(1000))
+    destination[437]['name'] = 'changed'
+    report = verify(rows(range(1000)), destination, split_factor=4, min_range_width=10)
+
+    assert report.method == 'arrow'
+    assert (report.source_rows, report.destination_rows) == (1000, 1000)
+    assert len(report.mismatches) == 1
+    mismatch = report.mismatches[0]
+    assert mismatch.lower <= 437 < mismatch.upper and mismatch.upper - mismatch.lower <= 10
+
+
+def test_identical_tables_verify():
+    report = verify(rows(range(100)), rows(range(100)))
+    assert report.verified and report.source_rows == 100
@@ -0,0 +1,184 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Results are plain JSON: run metadata plus one record of metrics per case. A saved
+result can be passed back with ``--compare`` to flag regressions between commits.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# services/ is imported from the repo root, the backend as the ``app`` package
+for path in (REPO_ROOT, os.path.join(REPO_ROOT, 'backend')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.memory import current_rss  # noqa: E402
+
+DEFAULT_THRESHOLD = 0.10
+RSS_SAMPLE_INTERVAL = 0.01
+# Metrics where a larger value is better; every other compared metric is lower-is-better
+HIGHER_IS_BETTER = ('rows_per_s', 'bytes_per_s')
+
+
+class PeakRSS:
+    """Track peak RSS over a block by sampling on a background thread"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "PeakRSS":
+        self.start = self.peak = current_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+    @property
+    def growth(self) -> int:
+        return self.peak - self.start
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+
+class StageTimer:
+    """Accumulate wall and CPU seconds (and optionally peak RSS) per named stage"""
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.wall: Dict[str, float] = {}
+        self.cpu: Dict[str, float] = {}
+        self.peak_rss: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        with (PeakRSS() if self.track_memory else nullcontext()) as rss:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                yield
+            finally:
+                self.add(name, time.perf_counter() - wall, time.process_time() - cpu)
+        if rss is not None:
+            self.peak_rss[name] = max(self.peak_rss.get(name, 0), rss.peak)
+
+    def add(self, name: str, wall: float, cpu: float = 0.0) -> None:
+        self.wall[name] = self.wall.get(name, 0.0) + wall
+        self.cpu[name] = self.cpu.get(name, 0.0) + cpu
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        stages = {}
+        for name in self.wall:
+            stages[name] = {'wall_s': round(self.wall[name], 6), 'cpu_s': round(self.cpu[name], 6)}
+            if name in self.peak_rss:
+                stages[name]['peak_rss_bytes'] = self.peak_rss[name]
+        return stages
+
+
+def environment() -> Dict[str, Any]:
+    """Metadata identifying where and on which commit a run was taken"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for module in ('pyarrow', 'pandas', 'numpy'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        **versions,
+    }
+
+
+def add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='Relative change that counts as a regression (default: %(default)s)',
+    )
+    parser.add_argument('--quiet', action='store_true', help='Silence library logging')
+
+
+def configure_logging(quiet: bool) -> None:
+    # ParquetService configures INFO logging on construction; raise the level afterwards too
+    logging.getLogger().setLevel(logging.WARNING if quiet else logging.INFO)
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    metrics: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Compare two result documents case by case
+
+    Returns:
+        One message per metric that got worse by more than ``threshold``
+    """
+    regressions = []
+    baseline_cases = baseline.get('cases', {})
+    for name, case in current.get('cases', {}).items():
+        base = baseline_cases.get(name)
+        if base is None:
+            continue
+        for metric in metrics or sorted(case.get('compare', {})):
+            new, old = case.get('compare', {}).get(metric), base.get('compare', {}).get(metric)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > threshold:
+                regressions.append(f"{name}: {metric} {old:.4g} -> {new:.4g} ({change:+.1%})")
+    return regressions
+
+
+def finish(args: argparse.Namespace, cases: Dict[str, Any], settings: Dict[str, Any]) -> int:
+    """Print and save the results, compare with a baseline; returns the exit status"""
+    report = {'environment': environment(), 'settings': settings, 'cases': cases}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Wrote {args.output}")
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    if baseline.get('settings') != settings:
+        print("Warning: baseline was taken with different settings; comparing anyway")
+    regressions = compare(report, baseline, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} against {baseline['environment'].get('commit')}")
+    return 1 if regressions else 0
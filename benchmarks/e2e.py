@@ -0,0 +1,161 @@
+"""
+End-to-end throughput benchmark: synthetic source -> ParquetService -> dataset destination.
+
+Runs offline against ``SyntheticConnector``, so results depend only on the code and the
+machine. Usage (from the repository root)::
+
+    python -m benchmarks.e2e --rows 1000000 --output base.json
+    python -m benchmarks.e2e --rows 1000000 --compare base.json
+
+Per profile and path it records rows/s, source bytes/s, output bytes, peak RSS,
+first-batch latency and wall/CPU seconds for each stage (extract, encode, load).
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+from benchmarks.common import PeakRSS, StageTimer, add_common_arguments, configure_logging, finish
+
+import pyarrow as pa  # noqa: E402
+
+from app.connectors.dataset import DatasetConnector  # noqa: E402
+from app.connectors.synthetic import DEFAULT_STREAM_BATCH_ROWS, PROFILES, SyntheticConnector  # noqa: E402
+from services.parquet import ParquetService, ProcessingMode  # noqa: E402
+
+PATHS = ('stream', 'dataframe')
+
+
+class _TimedBatches:
+    """Drive an async batch stream synchronously, timing each fetch as the extract stage"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, stream: AsyncIterator[pa.RecordBatch], timer: StageTimer):
+        self.loop = loop
+        self.stream = stream
+        self.timer = timer
+        self.started = time.perf_counter()
+        self.first_batch_s = None
+        self.rows = 0
+        self.bytes = 0
+
+    def __iter__(self) -> Iterator[pa.RecordBatch]:
+        while True:
+            try:
+                with self.timer.stage('extract'):
+                    batch = self.loop.run_until_complete(self.stream.__anext__())
+            except StopAsyncIteration:
+                return
+            if self.first_batch_s is None:
+                self.first_batch_s = time.perf_counter() - self.started
+            self.rows += batch.num_rows
+            self.bytes += batch.nbytes
+            yield batch
+
+
+def run_case(
+    loop: asyncio.AbstractEventLoop,
+    source: SyntheticConnector,
+    service: ParquetService,
+    profile: str,
+    path: str,
+    batch_rows: int,
+    workdir: str,
+) -> Dict[str, Any]:
+    timer = StageTimer()
+    output = os.path.join(workdir, 'parquet', profile)
+    os.makedirs(output, exist_ok=True)
+    destination = DatasetConnector({'root': os.path.join(workdir, 'dataset')})
+    loop.run_until_complete(destination.connect())
+
+    with PeakRSS() as rss:
+        started = time.perf_counter()
+        if path == 'stream':
+            batches = _TimedBatches(loop, source.stream_table(profile, batch_rows=batch_rows), timer)
+            with timer.stage('encode'):
+                files = service.write_batches(batches, os.path.join(output, f'{profile}.parquet'))
+            # write_batches pulls from the source, so its time includes extraction
+            timer.add('encode', -timer.wall.get('extract', 0.0), -timer.cpu.get('extract', 0.0))
+            rows, source_bytes, first_batch_s = batches.rows, batches.bytes, batches.first_batch_s
+        else:
+            with timer.stage('extract'):
+                df = source.read_table(profile, source.rows)
+            first_batch_s = time.perf_counter() - started
+            rows, source_bytes = len(df), int(df.memory_usage(deep=True).sum())
+            with timer.stage('encode'):
+                files = service.dataframe_to_parquet(
+                    df, os.path.join(output, f'{profile}.parquet'),
+                    mode=ProcessingMode.STREAMING, batch_size=batch_rows,
+                )
+            del df
+        with timer.stage('load'):
+            commit = destination.write_parquet_files(f'{profile}_{path}', files)
+        total = time.perf_counter() - started
+
+    output_bytes = sum(entry['bytes'] for entry in commit['added'])
+    return {
+        'rows': rows,
+        'source_bytes': source_bytes,
+        'output_bytes': output_bytes,
+        'files': len(commit['added']),
+        'stages': timer.as_dict(),
+        'compare': {
+            'total_s': round(total, 6),
+            'rows_per_s': round(rows / total, 1) if total else None,
+            'bytes_per_s': round(source_bytes / total, 1) if total else None,
+            'first_batch_s': round(first_batch_s or 0.0, 6),
+            'peak_rss_bytes': rss.peak,
+            **{f'{stage}_s': seconds['wall_s'] for stage, seconds in timer.as_dict().items()},
+        },
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--paths', nargs='+', default=list(PATHS), choices=PATHS)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_STREAM_BATCH_ROWS)
+    parser.add_argument('--repeat', type=int, default=1, help='Keep the fastest of N runs per case')
+    parser.add_argument('--workdir', help='Directory for output files (default: a temporary directory)')
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    source = SyntheticConnector({'rows': args.rows, 'seed': args.seed})
+    service = ParquetService()
+    configure_logging(args.quiet)
+    loop = asyncio.new_event_loop()
+    cases: Dict[str, Any] = {}
+    try:
+        for profile in args.profiles:
+            for path in args.paths:
+                name = f'{profile}/{path}'
+                runs = []
+                for _ in range(max(1, args.repeat)):
+                    workdir = tempfile.mkdtemp(prefix='e2e-', dir=args.workdir)
+                    try:
+                        runs.append(run_case(loop, source, service, profile, path, args.batch_rows, workdir))
+                    finally:
+                        shutil.rmtree(workdir, ignore_errors=True)
+                cases[name] = min(runs, key=lambda run: run['compare']['total_s'])
+                result = cases[name]['compare']
+                print(
+                    f"{name:<24} {result['rows_per_s']:>14,.0f} rows/s "
+                    f"{result['bytes_per_s'] / 2**20:>9,.1f} MiB/s "
+                    f"peak {result['peak_rss_bytes'] / 2**20:>8,.0f} MiB "
+                    f"first batch {result['first_batch_s'] * 1000:>8,.1f} ms"
+                )
+    finally:
+        loop.close()
+        service.thread_pool.shutdown()
+
+    settings = {'rows': args.rows, 'seed': args.seed, 'batch_rows': args.batch_rows}
+    return finish(args, cases, settings)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+ParquetService micro-benchmark: processing modes x data shapes x batch sizes.
+
+Each case converts one synthetic DataFrame with ``ParquetService.dataframe_to_parquet``
+and times the stages inside it (scale, PCA, DBSCAN, write) by wrapping the service's
+stage methods on the instance. Usage (from the repository root)::
+
+    python -m benchmarks.parquet_matrix --output matrix.json
+    python -m benchmarks.parquet_matrix --rows 50000 --modes DBSCAN SEQUENTIAL --compare matrix.json
+
+A DBSCAN case that falls back to SEQUENTIAL (no numeric columns, NaNs, a single
+cluster) is reported with ``fallback: true``; its time is what the caller pays.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import PeakRSS, StageTimer, add_common_arguments, configure_logging, finish
+
+from app.connectors.synthetic import PROFILES, SyntheticConnector  # noqa: E402
+from services.parquet import ParquetService, ProcessingMode  # noqa: E402
+
+DEFAULT_ROWS = [10_000, 100_000]
+DEFAULT_PROFILES = ['narrow', 'skewed', 'null_heavy', 'decimal_json']
+DEFAULT_BATCH_SIZES = ['none', '10000', '100000']
+# Service methods timed as stages; _stream_batches and _encode_all never nest
+STAGE_METHODS = {
+    '_scale_data': 'scale',
+    '_apply_pca': 'pca',
+    '_apply_dbscan': 'dbscan',
+    '_encode_all': 'write',
+    '_stream_batches': 'write',
+}
+
+
+def instrument(service: ParquetService, timer: StageTimer) -> None:
+    """Route the service's stage methods through ``timer`` for this instance only"""
+    for method, stage in STAGE_METHODS.items():
+        original = getattr(service, method)
+
+        def timed(*args, _original=original, _stage=stage, **kwargs):
+            with timer.stage(_stage):
+                return _original(*args, **kwargs)
+
+        setattr(service, method, wraps(original)(timed))
+
+
+def run_case(
+    source: SyntheticConnector,
+    profile: str,
+    rows: int,
+    mode: ProcessingMode,
+    batch_size: Optional[int],
+    parallel: bool,
+    workdir: str,
+) -> Dict[str, Any]:
+    df = source.read_table(profile, rows)
+    timer = StageTimer(track_memory=True)
+    service = ParquetService()
+    instrument(service, timer)
+    try:
+        with PeakRSS() as rss:
+            wall, cpu = time.perf_counter(), time.process_time()
+            files = service.dataframe_to_parquet(
+                df, os.path.join(workdir, f'{profile}.parquet'),
+                mode=mode, batch_size=batch_size, parallel=parallel,
+            )
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    finally:
+        service.thread_pool.shutdown()
+
+    output_bytes = sum(os.path.getsize(path) for path in files)
+    stages = timer.as_dict()
+    return {
+        'rows': len(df),
+        'columns': len(df.columns) - ('cluster' in df.columns),
+        'files': len(files),
+        'output_bytes': output_bytes,
+        # DBSCAN adds a cluster column; without one it fell back to SEQUENTIAL
+        'fallback': mode == ProcessingMode.DBSCAN and 'cluster' not in df.columns,
+        'stages': stages,
+        'compare': {
+            'total_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'rows_per_s': round(len(df) / wall, 1) if wall else None,
+            'peak_rss_bytes': rss.peak,
+            'output_bytes': output_bytes,
+            **{f'{stage}_s': seconds['wall_s'] for stage, seconds in stages.items()},
+        },
+    }
+
+
+def _batch_size(value: str) -> Optional[int]:
+    return None if value.lower() == 'none' else int(value)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--profiles', nargs='+', default=DEFAULT_PROFILES, choices=list(PROFILES))
+    parser.add_argument(
+        '--modes', nargs='+', default=[mode.name for mode in ProcessingMode],
+        choices=[mode.name for mode in ProcessingMode],
+    )
+    parser.add_argument(
+        '--batch-sizes', nargs='+', default=DEFAULT_BATCH_SIZES,
+        help="Values for batch_size; 'none' writes one file (SEQUENTIAL) or uses the default (STREAMING)",
+    )
+    parser.add_argument('--parallel', action='store_true', help='Encode chunks and clusters on the worker pool')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help='Directory for output files (default: a temporary directory)')
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    source = SyntheticConnector({'rows': max(args.rows), 'seed': args.seed})
+    batch_sizes = [_batch_size(value) for value in args.batch_sizes]
+    cases: Dict[str, Any] = {}
+    for profile in args.profiles:
+        for rows in args.rows:
+            for mode in (ProcessingMode[name] for name in args.modes):
+                # batch_size only matters to DBSCAN when it falls back; one size is enough
+                sizes = batch_sizes[:1] if mode == ProcessingMode.DBSCAN else batch_sizes
+                for batch_size in sizes:
+                    name = f'{profile}/{rows}/{mode.name}/{batch_size or "none"}'
+                    workdir = tempfile.mkdtemp(prefix='parquet-', dir=args.workdir)
+                    configure_logging(args.quiet)
+                    try:
+                        cases[name] = run_case(source, profile, rows, mode, batch_size, args.parallel, workdir)
+                    finally:
+                        shutil.rmtree(workdir, ignore_errors=True)
+                    result = cases[name]
+                    stages = ' '.join(f"{stage}={s['wall_s']:.3f}s" for stage, s in result['stages'].items())
+                    print(
+                        f"{name:<40} {result['compare']['total_s']:>8.3f}s "
+                        f"{result['files']:>5} files {result['output_bytes'] / 2**20:>8.1f} MiB "
+                        f"peak {result['compare']['peak_rss_bytes'] / 2**20:>7.0f} MiB "
+                        f"{'(fallback) ' if result['fallback'] else ''}{stages}"
+                    )
+
+    settings = {
+        'rows': args.rows, 'batch_sizes': args.batch_sizes, 'parallel': args.parallel, 'seed': args.seed,
+    }
+    return finish(args, cases, settings)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,4 @@
-import React from "react";
+import React, { useEffect, useState } from "react";
 import {
   Dialog,
   DialogContent,
@@ -7,8 +7,42 @@ import {
 } from "../ui/dialog";
 import { Chart } from "../ui/chart";
 import { Card, CardContent, CardHeader, CardTitle } from "../ui/card";
+import { api } from "@/lib/api";
+
+const formatBucket = (timestamp, bucketSeconds) => {
+  const date = new Date(`${timestamp}Z`);
+  return bucketSeconds >= 86400
+    ? date.toLocaleDateString()
+    : date.toLocaleString([], { month: "short", day: "numeric", hour: "2-digit", minute: "2-digit" });
+};
+
+export function MetricsModal({ isOpen, onClose, migration, migrationData }) {
+  const migrationId = (migration || migrationData)?.migration_uuid;
+  const [series, setSeries] = useState(null);
+
+  useEffect(() => {
+    if (!isOpen || !migrationId) return;
+    let cancelled = false;
+    api.fetchMigrationMetrics(migrationId, { max_points: 300 })
+      .then((data) => { if (!cancelled) setSeries(data); })
+      .catch((error) => console.error("Failed to load migration metrics:", error));
+    return () => { cancelled = true; };
+  }, [isOpen, migrationId]);
+
+  const points = series?.points || [];
+  const chunks = points.reduce((total, point) => total + point.chunks, 0);
+  const avgLatency = chunks
+    ? points.reduce((total, point) => total + point.avg_processing_time_ms * point.chunks, 0) / chunks
+    : 0;
+  const throughput = points.length
+    ? points.reduce((total, point) => total + point.records_per_second, 0) / points.length
+    : 0;
+  const chartData = points.map((point) => ({
+    time: formatBucket(point.timestamp, series.bucket_seconds),
+    latency: Math.round(point.avg_processing_time_ms),
+    throughput: Math.round(point.records_per_second),
+  }));
 
-export function MetricsModal({ isOpen, onClose, migration }) {
   return (
     <Dialog open={isOpen} onOpenChange={onClose}>
       <DialogContent className="sm:max-w-[800px]">
@@ -28,9 +62,9 @@ export function MetricsModal({ isOpen, onClose, migration }) {
                 </CardTitle>
               </CardHeader>
               <CardContent>
-                <div className="text-2xl font-bold">156ms</div>
+                <div className="text-2xl font-bold">{Math.round(avgLatency)}ms</div>
                 <p className="text-xs text-muted-foreground">
-                  +2% from last week
+                  per chunk
                 </p>
               </CardContent>
             </Card>
@@ -41,9 +75,9 @@ export function MetricsModal({ isOpen, onClose, migration }) {
                 </CardTitle>
               </CardHeader>
               <CardContent>
-                <div className="text-2xl font-bold">1,420</div>
+                <div className="text-2xl font-bold">{Math.round(throughput).toLocaleString()}</div>
                 <p className="text-xs text-muted-foreground">
-                  +12% from last week
+                  records / second
                 </p>
               </CardContent>
             </Card>
@@ -68,7 +102,7 @@ export function MetricsModal({ isOpen, onClose, migration }) {
               <CardTitle>Performance Over Time</CardTitle>
             </CardHeader>
             <CardContent>
-              <Chart />
+              <Chart data={chartData} />
             </CardContent>
           </Card>
         </div>
@@ -1,6 +1,6 @@
 import { Line, LineChart, ResponsiveContainer, Tooltip, XAxis, YAxis } from "recharts"
 
-const data = [
+const sampleData = [
   {
     time: "00:00",
     latency: 145,
@@ -43,7 +43,7 @@ const data = [
   },
 ]
 
-export function Chart() {
+export function Chart({ data = sampleData }) {
   return (
     <ResponsiveContainer width="100%" height={350}>
       <LineChart data={data}>
@@ -79,4 +79,22 @@ export const api = {
     fetchMigrationStatus: (migrationId) =>
         fetch(`${API_BASE_URL}/migrations/${migrationId}/status`)
             .then(handleResponse),
+
+    // Time-bucketed chunk metrics; params: { start, end, max_points } (all optional)
+    fetchMigrationMetrics: (migrationId, params = {}) => {
+        const query = new URLSearchParams(
+            Object.entries(params).filter(([, value]) => value != null)
+        ).toString();
+        return fetch(`${API_BASE_URL}/migrations/${migrationId}/metrics${query ? `?${query}` : ''}`)
+            .then(handleResponse);
+    },
+
+    // One page of logs; params: { level, chunk_id, start, end, cursor, limit, order }
+    fetchMigrationLogs: (migrationId, params = {}) => {
+        const query = new URLSearchParams(
+            Object.entries(params).filter(([, value]) => value != null)
+        ).toString();
+        return fetch(`${API_BASE_URL}/migrations/${migrationId}/logs${query ? `?${query}` : ''}`)
+            .then(handleResponse);
+    },
 };
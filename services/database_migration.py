@@ -0,0 +1,302 @@
+import asyncio
+import heapq
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.tracing import span
+from services.verification import split_key_range
+
+DEFAULT_MAX_CONCURRENCY = 8
+# Tables above this size are split into chunks that run as independent work items.
+DEFAULT_SPLIT_THRESHOLD_BYTES = 1024 * 1024 * 1024
+DEFAULT_CHUNK_BYTES = 256 * 1024 * 1024
+# Row width assumed when a source reports row counts but no sizes
+ESTIMATED_BYTES_PER_COLUMN = 16
+ESTIMATED_ROW_BYTES = 128
+
+
+@dataclass(frozen=True)
+class TableSize:
+    table_name: str
+    estimated_rows: int
+    estimated_bytes: int
+    # Primary key columns; with a single integer key its bounds allow range splits
+    primary_key: Tuple[str, ...] = ()
+    key_lower: Optional[int] = None
+    key_upper: Optional[int] = None
+
+    @property
+    def key_column(self) -> Optional[str]:
+        if len(self.primary_key) == 1 and self.key_lower is not None and self.key_upper is not None:
+            return self.primary_key[0]
+        return None
+
+
+@dataclass(frozen=True)
+class WorkItem:
+    """
+    One unit of transfer: a whole table or one chunk of a large one.
+
+    Chunks of tables with a single integer primary key are key ranges
+    ``lower <= key_column < upper`` (``None`` bounds are open). Tables with another
+    primary key fall back to LIMIT/OFFSET windows ordered by that key.
+    """
+
+    table_name: str
+    estimated_bytes: int
+    estimated_rows: int
+    key_column: Optional[str] = None
+    lower: Optional[int] = None
+    upper: Optional[int] = None
+    order_by: Tuple[str, ...] = ()
+    offset: int = 0
+    limit: Optional[int] = None
+    chunk_index: int = 0
+    chunk_count: int = 1
+
+
+@dataclass
+class DatabaseMigrationPlan:
+    items: List[WorkItem]
+    workers: int
+    # Longest-processing-time assignment, used to predict the makespan.
+    worker_loads: List[int] = field(default_factory=list)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(item.estimated_bytes for item in self.items)
+
+    @property
+    def predicted_makespan_bytes(self) -> int:
+        return max(self.worker_loads, default=0)
+
+
+@dataclass
+class DatabaseMigrationResult:
+    completed: List[WorkItem] = field(default_factory=list)
+    failed: List[Tuple[WorkItem, str]] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+
+class DatabaseMigrator:
+    """
+    Migrate every table of a source database under one concurrency budget.
+
+    Tables are sized from catalog statistics, large tables are split into chunks,
+    and all work items run largest-first on ``max_concurrency`` workers. Starting
+    the biggest items first (LPT list scheduling) keeps one giant table from being
+    the last thing to start while the small ones fill in the gaps.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        split_threshold_bytes: int = DEFAULT_SPLIT_THRESHOLD_BYTES,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    ):
+        self.source = source
+        self.max_concurrency = max(1, max_concurrency)
+        self.split_threshold_bytes = split_threshold_bytes
+        self.chunk_bytes = chunk_bytes
+
+    async def discover(self, tables: Optional[List[str]] = None) -> List[TableSize]:
+        """
+        Size every table, preferring one catalog query (``get_table_sizes``) over
+        per-table row estimates, and look up the keys large tables are split on.
+        """
+        if hasattr(self.source, "get_table_sizes"):
+            sizes = await self.source.get_table_sizes()
+        elif hasattr(self.source, "estimate_row_count"):
+            sizes = {}
+            for table_name in await self.source.get_tables():
+                rows = int(await self.source.estimate_row_count(table_name) or 0)
+                sizes[table_name] = (rows, rows * await self._row_bytes(table_name))
+        else:
+            raise TypeError(
+                f"{type(self.source).__name__} reports neither table sizes nor row counts"
+            )
+
+        if tables is not None:
+            wanted = set(tables)
+            sizes = {name: size for name, size in sizes.items() if name in wanted}
+        return await asyncio.gather(*[
+            self._with_key(TableSize(name, int(rows or 0), int(size or 0)))
+            for name, (rows, size) in sizes.items()
+        ])
+
+    async def _row_bytes(self, table_name: str) -> int:
+        if hasattr(self.source, "get_table_schema"):
+            schema = await self.source.get_table_schema(table_name)
+            if schema:
+                return len(schema) * ESTIMATED_BYTES_PER_COLUMN
+        return ESTIMATED_ROW_BYTES
+
+    async def _with_key(self, table: TableSize) -> TableSize:
+        # Only tables that will be split need their key
+        if not self._splits(table) or not hasattr(self.source, "get_primary_key_columns"):
+            return table
+        primary_key = tuple(await self.source.get_primary_key_columns(table.table_name))
+        lower = upper = None
+        if len(primary_key) == 1 and hasattr(self.source, "get_key_bounds"):
+            low, high = await self.source.get_key_bounds(table.table_name, primary_key[0])
+            if _is_integer(low) and _is_integer(high):
+                lower, upper = int(low), int(high) + 1
+        return TableSize(
+            table.table_name, table.estimated_rows, table.estimated_bytes, primary_key, lower, upper
+        )
+
+    def _splits(self, table: TableSize) -> bool:
+        return table.estimated_bytes > self.split_threshold_bytes and table.estimated_rows > 0
+
+    def plan(self, tables: List[TableSize]) -> DatabaseMigrationPlan:
+        """Split large tables into chunks and order all work largest-first."""
+        items: List[WorkItem] = []
+        for table in tables:
+            items.extend(self._work_items(table))
+        items.sort(key=lambda item: (-item.estimated_bytes, item.table_name, item.chunk_index))
+
+        loads = [0] * self.max_concurrency
+        heap = [(0, worker) for worker in range(self.max_concurrency)]
+        for item in items:
+            load, worker = heapq.heappop(heap)
+            loads[worker] = load + item.estimated_bytes
+            heapq.heappush(heap, (loads[worker], worker))
+
+        return DatabaseMigrationPlan(items, self.max_concurrency, loads)
+
+    async def run(
+        self,
+        plan: DatabaseMigrationPlan,
+        transfer: Callable[[WorkItem], Awaitable[Any]],
+    ) -> DatabaseMigrationResult:
+        """
+        Run ``transfer`` for every work item, at most ``max_concurrency`` at a time.
+
+        Items are taken in plan order, so whichever worker frees up next always
+        picks the largest remaining item. A failed item is recorded and the rest
+        of the database keeps going.
+        """
+        start_time = time.time()
+        result = DatabaseMigrationResult()
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in plan.items:
+            queue.put_nowait(item)
+
+        async def worker() -> None:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    with span(
+                        'chunk',
+                        table=item.table_name,
+                        chunk_index=item.chunk_index,
+                        chunk_count=item.chunk_count,
+                        estimated_rows=item.estimated_rows,
+                    ):
+                        await transfer(item)
+                    result.completed.append(item)
+                except Exception as e:
+                    logging.error(
+                        f"Transfer of {item.table_name} chunk {item.chunk_index + 1}/"
+                        f"{item.chunk_count} failed: {e}"
+                    )
+                    result.failed.append((item, str(e)))
+
+        with span('migration', items=len(plan.items), workers=plan.workers) as migration_span:
+            await asyncio.gather(*[worker() for _ in range(min(self.max_concurrency, len(plan.items)))])
+            migration_span.set(completed=len(result.completed), failed=len(result.failed))
+        result.duration_seconds = time.time() - start_time
+        logging.info(
+            f"Database migration finished: {len(result.completed)} items completed, "
+            f"{len(result.failed)} failed in {result.duration_seconds:.2f} seconds"
+        )
+        return result
+
+    def stream_item(self, item: WorkItem, **kwargs: Any) -> AsyncIterator[Any]:
+        """Read one work item from the source; ``kwargs`` go to the connector's stream call."""
+        if item.key_column is not None:
+            return self.source.stream_range(
+                item.table_name, item.key_column, item.lower, item.upper, **kwargs
+            )
+        return self.source.stream_table(
+            item.table_name, item.limit, item.offset,
+            order_by=list(item.order_by) or None, **kwargs,
+        )
+
+    def _work_items(self, table: TableSize) -> List[WorkItem]:
+        if not self._splits(table):
+            return [WorkItem(table.table_name, table.estimated_bytes, table.estimated_rows)]
+
+        chunk_count = math.ceil(table.estimated_bytes / self.chunk_bytes)
+        if table.key_column is not None:
+            ranges = split_key_range(table.key_lower, table.key_upper, chunk_count)
+            span_keys = table.key_upper - table.key_lower
+            items = []
+            for index, (lower, upper) in enumerate(ranges):
+                share = (upper - lower) / span_keys
+                items.append(WorkItem(
+                    table_name=table.table_name,
+                    estimated_bytes=int(table.estimated_bytes * share),
+                    estimated_rows=int(table.estimated_rows * share),
+                    key_column=table.key_column,
+                    # The outer ranges are open so rows outside the planned bounds
+                    # (e.g. inserted since sizing) are not lost
+                    lower=None if index == 0 else lower,
+                    upper=None if index == len(ranges) - 1 else upper,
+                    chunk_index=index,
+                    chunk_count=len(ranges),
+                ))
+            return items
+
+        if not table.primary_key:
+            # Without a unique order, OFFSET windows could overlap or skip rows
+            logging.warning(f"{table.table_name} has no primary key; transferring it as one item")
+            return [WorkItem(table.table_name, table.estimated_bytes, table.estimated_rows)]
+
+        chunk_rows = math.ceil(table.estimated_rows / chunk_count)
+        items = []
+        for index in range(chunk_count):
+            offset = index * chunk_rows
+            # The last chunk is open-ended so rows added since sizing are not lost.
+            limit = chunk_rows if index < chunk_count - 1 else None
+            rows = min(chunk_rows, max(table.estimated_rows - offset, 0))
+            items.append(WorkItem(
+                table_name=table.table_name,
+                estimated_bytes=int(table.estimated_bytes * rows / table.estimated_rows),
+                estimated_rows=rows,
+                order_by=table.primary_key,
+                offset=offset,
+                limit=limit,
+                chunk_index=index,
+                chunk_count=chunk_count,
+            ))
+        return items
+
+
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def summarize_plan(plan: DatabaseMigrationPlan) -> Dict[str, Any]:
+    """Per-table rollup of a plan, in the order tables first start."""
+    tables: Dict[str, Dict[str, Any]] = {}
+    for item in plan.items:
+        entry = tables.setdefault(
+            item.table_name, {"table_name": item.table_name, "chunks": 0, "estimated_bytes": 0}
+        )
+        entry["chunks"] += 1
+        entry["estimated_bytes"] += item.estimated_bytes
+    return {
+        "workers": plan.workers,
+        "work_items": len(plan.items),
+        "total_bytes": plan.total_bytes,
+        "predicted_makespan_bytes": plan.predicted_makespan_bytes,
+        "tables": list(tables.values()),
+    }
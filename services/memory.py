@@ -0,0 +1,215 @@
+"""
+Process-wide memory governor shared by every pipeline stage.
+
+Usage is the process RSS, or the RSS when the outstanding reservations (memory a stage
+has announced but not allocated yet) were taken plus those reservations, whichever is
+larger; as a reserving stage allocates, its memory moves from the reservation into RSS
+instead of being counted twice. Arrow memory-pool bytes are tracked alongside for
+reporting.
+Against a byte budget the governor reports three pressure levels:
+
+- ``OK``: below ``soft_fraction`` of the budget, nothing changes
+- ``SOFT``: readers shrink their batches and spill buffers start spilling to disk
+- ``HARD``: above ``hard_fraction``, readers pause until usage drops
+
+Several migrations in one process share the same governor, so a host can be packed
+with jobs without any one of them allocating past the budget.
+"""
+import asyncio
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Iterator, Optional
+
+import pyarrow as pa
+
+BUDGET_ENV = "EPIC_SHELTER_MEMORY_BUDGET"
+# Budget as a share of the host (or cgroup) memory limit when none is configured
+DEFAULT_BUDGET_FRACTION = 0.75
+DEFAULT_SOFT_FRACTION = 0.75
+DEFAULT_HARD_FRACTION = 0.90
+# Readers never shrink batches below this many rows
+MIN_BATCH_ROWS = 1_024
+# How long usage readings are reused before /proc is read again
+SAMPLE_TTL = 0.05
+POLL_INTERVAL = 0.1
+DEFAULT_PAUSE_TIMEOUT = 60.0
+
+
+class MemoryPressure(IntEnum):
+    OK = 0
+    SOFT = 1
+    HARD = 2
+
+
+@dataclass(frozen=True)
+class MemoryUsage:
+    rss_bytes: int
+    arrow_bytes: int
+    reserved_bytes: int
+    budget_bytes: int
+    # RSS when the outstanding reservations started
+    reserve_base_bytes: int = 0
+
+    @property
+    def used_bytes(self) -> int:
+        if not self.reserved_bytes:
+            return self.rss_bytes
+        return max(self.rss_bytes, self.reserve_base_bytes + self.reserved_bytes)
+
+    @property
+    def fraction(self) -> float:
+        return self.used_bytes / self.budget_bytes if self.budget_bytes else 0.0
+
+
+class MemoryGovernor:
+    """
+    Compare process memory with a budget and tell stages when to shrink, spill or pause.
+
+    Args:
+        budget_bytes: Memory the process may use; ``None`` derives it from the
+            ``EPIC_SHELTER_MEMORY_BUDGET`` environment variable or the host/cgroup limit
+        soft_fraction: Share of the budget where batches shrink and buffers spill
+        hard_fraction: Share of the budget where readers pause
+    """
+
+    def __init__(
+        self,
+        budget_bytes: Optional[int] = None,
+        soft_fraction: float = DEFAULT_SOFT_FRACTION,
+        hard_fraction: float = DEFAULT_HARD_FRACTION,
+    ):
+        self.budget_bytes = budget_bytes or default_budget()
+        self.soft_fraction = soft_fraction
+        self.hard_fraction = hard_fraction
+        self._reserved = 0
+        self._reserve_base = 0
+        self._lock = threading.Lock()
+        self._sampled_at = 0.0
+        self._rss = 0
+
+    def configure(self, budget_bytes: Optional[int] = None) -> None:
+        if budget_bytes:
+            self.budget_bytes = int(budget_bytes)
+            logging.info(f"Memory budget set to {self.budget_bytes} bytes")
+
+    def usage(self) -> MemoryUsage:
+        now = time.monotonic()
+        if now - self._sampled_at > SAMPLE_TTL:
+            self._rss = current_rss()
+            self._sampled_at = now
+        return MemoryUsage(
+            self._rss, pa.total_allocated_bytes(), self._reserved, self.budget_bytes, self._reserve_base,
+        )
+
+    def pressure(self, extra_bytes: int = 0) -> MemoryPressure:
+        used = self.usage().used_bytes + extra_bytes
+        if used >= self.budget_bytes * self.hard_fraction:
+            return MemoryPressure.HARD
+        if used >= self.budget_bytes * self.soft_fraction:
+            return MemoryPressure.SOFT
+        return MemoryPressure.OK
+
+    def should_spill(self) -> bool:
+        return self.pressure() >= MemoryPressure.SOFT
+
+    def batch_rows(self, rows: int) -> int:
+        """Scale a reader's batch size to the headroom left below the hard limit"""
+        usage = self.usage()
+        soft = self.budget_bytes * self.soft_fraction
+        if usage.used_bytes < soft:
+            return rows
+        hard = self.budget_bytes * self.hard_fraction
+        headroom = max(0.0, (hard - usage.used_bytes) / max(hard - soft, 1.0))
+        return max(MIN_BATCH_ROWS, min(rows, int(rows * headroom)))
+
+    def wait(self, timeout: float = DEFAULT_PAUSE_TIMEOUT) -> bool:
+        """Block while under hard pressure; returns False if ``timeout`` ran out"""
+        if self.pressure() < MemoryPressure.HARD:
+            return True
+        logging.warning("Memory above the hard limit, pausing reader")
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            if self.pressure() < MemoryPressure.HARD:
+                return True
+        logging.warning(f"Memory still above the hard limit after {timeout:.0f}s, resuming")
+        return False
+
+    async def wait_async(self, timeout: float = DEFAULT_PAUSE_TIMEOUT) -> bool:
+        """``wait`` for coroutines; other tasks (e.g. writers draining batches) keep running"""
+        if self.pressure() < MemoryPressure.HARD:
+            return True
+        logging.warning("Memory above the hard limit, pausing reader")
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+            if self.pressure() < MemoryPressure.HARD:
+                return True
+        logging.warning(f"Memory still above the hard limit after {timeout:.0f}s, resuming")
+        return False
+
+    def fits(self, nbytes: int) -> bool:
+        """Whether ``nbytes`` more can be allocated without reaching the hard limit"""
+        return self.pressure(nbytes) < MemoryPressure.HARD
+
+    @contextmanager
+    def reserve(self, nbytes: int) -> Iterator[None]:
+        """
+        Count ``nbytes`` as used for the duration of the block
+
+        Lets a stage claim memory before allocating it, so concurrent stages see the
+        pressure it is about to create rather than after the fact. RSS growth while the
+        reservation is held counts against it rather than on top of it.
+        """
+        rss = self.usage().rss_bytes
+        with self._lock:
+            # Anchor at the lowest RSS seen while reservations are outstanding
+            self._reserve_base = rss if not self._reserved else min(self._reserve_base, rss)
+            self._reserved += nbytes
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._reserved -= nbytes
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is the lifetime peak (KiB on Linux, bytes on macOS), the best available
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def default_budget() -> int:
+    configured = os.environ.get(BUDGET_ENV)
+    if configured:
+        return int(configured)
+    return int(memory_limit() * DEFAULT_BUDGET_FRACTION)
+
+
+def memory_limit() -> int:
+    """The cgroup memory limit if one is set, else physical memory"""
+    physical = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit() and 0 < int(value) < physical:
+            return int(value)
+    return physical
+
+
+governor = MemoryGovernor()
@@ -1,23 +1,177 @@
 import logging
-from typing import Optional, List
+from typing import Any, Dict, Iterable, Optional, List, Tuple, Union
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dataclasses import dataclass
 from enum import Enum
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 import os
-import time
 from sklearn.cluster import DBSCAN
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
+from services.parquet_manifest import (
+    HashingWriter,
+    ManifestEntry,
+    ParquetManifest,
+    entry_from_metadata,
+    manifest_path_for,
+)
+from services.parquet_tuning import EncodingTuner, cover_all_columns
+from services.memory import governor
+from services.tracing import span
+from services.transform import TransformPipeline
+
+# Defaults sized for downstream ingestion: files large enough to avoid small-file
+# overhead, row groups small enough for readers to parallelise over.
+DEFAULT_TARGET_FILE_SIZE = 512 * 1024 * 1024
+DEFAULT_ROW_GROUP_BYTES = 128 * 1024 * 1024
+DEFAULT_ROW_GROUP_ROWS = 1_000_000
+# Peak DBSCAN working memory as a multiple of the numeric columns as float64
+DBSCAN_MEMORY_FACTOR = 4
+DEFAULT_STREAM_BATCH_ROWS = 65_536
+
+BatchLike = Union[pa.RecordBatch, pa.Table, pd.DataFrame]
+
 
 class ProcessingMode(Enum):
     DBSCAN = "dbscan"
     SEQUENTIAL = "sequential"
+    STREAMING = "streaming"
+
+
+class ExecutorKind(Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+@dataclass
+class EncodeOptions:
+    """Per-call encode settings threaded through the processing modes."""
+
+    # Cache key for auto-tuned encodings; None disables tuning.
+    tune_key: Optional[str] = None
+    # Columns whose min/max go into the manifest; None records every column.
+    key_columns: Optional[List[str]] = None
+
+
+class StreamingParquetWriter:
+    """
+    Write a stream of Arrow batches to one or more Parquet files with bounded memory.
+
+    Batches are buffered only until a row group is full, so memory stays at roughly
+    one row group regardless of input size. A new file is started once the current
+    one reaches ``target_file_size`` bytes on disk.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        target_file_size: int = DEFAULT_TARGET_FILE_SIZE,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+        row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+        writer_options: Optional[Dict[str, Any]] = None,
+        key_columns: Optional[List[str]] = None,
+    ):
+        self.output_path = output_path
+        self.target_file_size = target_file_size
+        self.row_group_bytes = row_group_bytes
+        self.row_group_rows = row_group_rows
+        self.writer_options = writer_options or {"compression": "snappy"}
+        self.key_columns = key_columns
+        self.output_files: List[str] = []
+        self.entries: List[ManifestEntry] = []
+
+        self._schema: Optional[pa.Schema] = None
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._sink: Optional[HashingWriter] = None
+        self._pending: List[pa.RecordBatch] = []
+        self._pending_rows = 0
+        self._pending_bytes = 0
+
+    def __enter__(self) -> "StreamingParquetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write(self, batch: BatchLike) -> None:
+        """Buffer a batch, flushing full row groups to disk."""
+        for record_batch in self._to_batches(batch):
+            if record_batch.num_rows == 0:
+                continue
+            if self._schema is None:
+                self._schema = record_batch.schema
+            elif not record_batch.schema.equals(self._schema):
+                record_batch = pa.Table.from_batches([record_batch]).cast(self._schema).to_batches()[0]
+
+            self._pending.append(record_batch)
+            self._pending_rows += record_batch.num_rows
+            self._pending_bytes += record_batch.nbytes
+
+            if self._pending_rows >= self.row_group_rows or self._pending_bytes >= self.row_group_bytes:
+                self._flush_row_group()
+
+    def close(self) -> List[str]:
+        """Flush any buffered rows, close the open file and return all written paths."""
+        if self._pending:
+            self._flush_row_group()
+        self._close_file()
+        return self.output_files
+
+    def _flush_row_group(self) -> None:
+        table = pa.Table.from_batches(self._pending, schema=self._schema)
+        self._pending = []
+        self._pending_rows = 0
+        self._pending_bytes = 0
+
+        if self._writer is None:
+            self._open_file()
+        self._writer.write_table(table, row_group_size=table.num_rows)
+
+        if self._sink.tell() >= self.target_file_size:
+            self._close_file()
+
+    def _open_file(self) -> None:
+        path = _generate_output_filename(self.output_path, f"part{len(self.output_files):05d}")
+        self._sink = HashingWriter(open(path, "wb"))
+        self._writer = pq.ParquetWriter(self._sink, self._schema, **self.writer_options)
+        self.output_files.append(path)
+
+    def _close_file(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._sink.close()
+        self.entries.append(_manifest_entry(
+            self.output_files[-1], self._writer, self._schema, self._sink, self.key_columns
+        ))
+        logging.info(f"Finished Parquet file {self.output_files[-1]}")
+        self._writer = None
+        self._sink = None
+
+    @staticmethod
+    def _to_batches(batch: BatchLike) -> List[pa.RecordBatch]:
+        if isinstance(batch, pa.RecordBatch):
+            return [batch]
+        if isinstance(batch, pd.DataFrame):
+            batch = pa.Table.from_pandas(batch, preserve_index=False)
+        return batch.to_batches()
 
 
 class ParquetService:
-    def __init__(self):
-        self.thread_pool = ThreadPoolExecutor()
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        executor: ExecutorKind = ExecutorKind.THREAD,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = executor
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self.encoding_tuner = EncodingTuner()
         logging.basicConfig(level=logging.INFO)
 
     def dataframe_to_parquet(
@@ -26,93 +180,247 @@ class ParquetService:
         output_path: str, 
         mode: ProcessingMode = ProcessingMode.DBSCAN, 
         batch_size: Optional[int] = None,
+        parallel: bool = False,
+        auto_tune: bool = False,
+        table_key: Optional[str] = None,
+        manifest: bool = False,
+        key_columns: Optional[List[str]] = None,
     ) -> List[str]:
         """
         Convert pandas DataFrame to Parquet files based on selected processing mode.
+
+        With ``parallel=True`` chunk and cluster encodes are spread over the service's
+        worker pool; file names and their order are the same as in the serial path.
+        With ``auto_tune=True`` per-column codecs and encodings are chosen from a sample
+        and cached under ``table_key`` (default: the output file name) for later chunks.
+        With ``manifest=True`` a ``<name>_manifest.json`` sidecar records per-file row
+        counts, sizes, checksums and min/max of ``key_columns``, taken from the writer.
         """
-        start_time = time.time()
-        output_files = []
+        encode = EncodeOptions(
+            tune_key=(table_key or os.path.basename(output_path)) if auto_tune else None,
+            key_columns=key_columns,
+        )
+
+        with span('encode', mode=mode.name, parallel=parallel) as encode_span:
+            entries = self._dataframe_entries(df, output_path, mode, batch_size, parallel, encode)
+            encode_span.add_rows(len(df))
+            encode_span.add_bytes(sum(entry.byte_size for entry in entries))
+            encode_span.set(files=len(entries))
 
+        if manifest and entries:
+            ParquetManifest(entries).write(manifest_path_for(output_path))
+
+        return [entry.path for entry in entries]
+
+    def _dataframe_entries(
+        self,
+        df: pd.DataFrame,
+        output_path: str,
+        mode: ProcessingMode,
+        batch_size: Optional[int],
+        parallel: bool,
+        encode: EncodeOptions,
+    ) -> List[ManifestEntry]:
+        entries: List[ManifestEntry] = []
         try:
             if mode == ProcessingMode.DBSCAN:
-                output_files = self._process_with_dbscan(df, output_path, 0.5, 10000)
+                entries = self._process_with_dbscan(
+                    df, output_path, 0.5, 10000, parallel, encode
+                )
             elif mode == ProcessingMode.SEQUENTIAL:
-                output_files = self._process_in_batches(df, output_path, batch_size)
+                entries = self._process_in_batches(
+                    df, output_path, batch_size, parallel, encode
+                )
+            elif mode == ProcessingMode.STREAMING:
+                entries = self._stream_batches(
+                    self._iter_dataframe(df, batch_size or DEFAULT_STREAM_BATCH_ROWS),
+                    output_path,
+                    encode=encode,
+                )
             else:
                 raise ValueError(f"Unknown processing mode: {mode}")
         except Exception as e:
             logging.error(f"Error occurred during processing: {e}")
             if mode == ProcessingMode.DBSCAN:
                 logging.info("Falling back to SEQUENTIAL mode.")
-                output_files = self._process_in_batches(df, output_path, batch_size)
+                entries = self._process_in_batches(
+                    df, output_path, batch_size, parallel, encode
+                )
+        return entries
 
-        total_time = time.time() - start_time
-        logging.info(f"Total processing time: {total_time:.2f} seconds")
-        
-        return output_files
+    def write_batches(
+        self,
+        batches: Iterable[BatchLike],
+        output_path: str,
+        target_file_size: int = DEFAULT_TARGET_FILE_SIZE,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+        row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+        auto_tune: bool = False,
+        table_key: Optional[str] = None,
+        manifest: bool = False,
+        key_columns: Optional[List[str]] = None,
+        transform: Optional[TransformPipeline] = None,
+    ) -> List[str]:
+        """
+        Stream batches into Parquet files without materialising the full dataset.
+
+        Args:
+            batches: Iterable of RecordBatches, Tables or DataFrames sharing one schema
+            output_path: Base path; files are written as ``<name>_partNNNNN<ext>``
+            target_file_size: Roll over to a new file once this many bytes are written
+            row_group_bytes: Flush a row group once this many uncompressed bytes are buffered
+            row_group_rows: Upper bound on rows per row group
+            auto_tune: Tune per-column encodings from the first batch
+            table_key: Cache key for tuned encodings (default: the output file name)
+            manifest: Write a ``<name>_manifest.json`` sidecar describing the files
+            key_columns: Columns whose min/max are recorded in the manifest (default: all)
+            transform: Column transforms applied to every batch before it is written;
+                tuning, manifests and key columns see the transformed columns
+
+        Returns:
+            List of written file paths
+        """
+        if transform:
+            batches = (
+                transform.apply(record_batch)
+                for batch in batches
+                for record_batch in StreamingParquetWriter._to_batches(batch)
+            )
+        encode = EncodeOptions(
+            tune_key=(table_key or os.path.basename(output_path)) if auto_tune else None,
+            key_columns=key_columns,
+        )
+        entries = self._stream_batches(
+            batches, output_path, target_file_size, row_group_bytes, row_group_rows, encode
+        )
+        if manifest and entries:
+            ParquetManifest(entries).write(manifest_path_for(output_path))
+        return [entry.path for entry in entries]
+
+    def _stream_batches(
+        self,
+        batches: Iterable[BatchLike],
+        output_path: str,
+        target_file_size: int = DEFAULT_TARGET_FILE_SIZE,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+        row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+        encode: Optional[EncodeOptions] = None,
+    ) -> List[ManifestEntry]:
+        encode = encode or EncodeOptions()
+        batches = iter(batches)
+        writer_options = None
+
+        with span('write', streaming=True) as write_span:
+            first_batch = next(batches, None)
+            if first_batch is not None and encode.tune_key is not None:
+                sample = pa.Table.from_batches(StreamingParquetWriter._to_batches(first_batch))
+                writer_options = self.encoding_tuner.plan_for(encode.tune_key, sample).writer_options(sample.schema)
+
+            with StreamingParquetWriter(
+                output_path,
+                target_file_size=target_file_size,
+                row_group_bytes=row_group_bytes,
+                row_group_rows=row_group_rows,
+                writer_options=writer_options,
+                key_columns=encode.key_columns,
+            ) as writer:
+                if first_batch is not None:
+                    writer.write(first_batch)
+                for batch in batches:
+                    writer.write(batch)
+
+            write_span.add_rows(sum(entry.row_count for entry in writer.entries))
+            write_span.add_bytes(sum(entry.byte_size for entry in writer.entries))
+            write_span.set(files=len(writer.output_files))
+
+        logging.info(f"Streamed {len(writer.output_files)} Parquet files")
+        return writer.entries
+
+    @staticmethod
+    def _iter_dataframe(df: pd.DataFrame, batch_rows: int) -> Iterable[pa.RecordBatch]:
+        """Yield a DataFrame as RecordBatches of at most ``batch_rows`` rows."""
+        for start in range(0, len(df), batch_rows):
+            yield pa.RecordBatch.from_pandas(df.iloc[start:start + batch_rows], preserve_index=False)
 
     def _process_in_batches(
         self,
         df: pd.DataFrame,
         output_path: str,
-        batch_size: Optional[int] = None
-    ) -> List[str]:
+        batch_size: Optional[int] = None,
+        parallel: bool = False,
+        encode: Optional[EncodeOptions] = None,
+    ) -> List[ManifestEntry]:
         """
         Convert pandas DataFrame to multiple Parquet files if batch_size is specified.
         """
-        start_time = time.time()
-
-        output_files = []
+        entries = []
 
         if batch_size:
             num_chunks = (len(df) + batch_size - 1) // batch_size
             logging.info(f"Splitting into {num_chunks} chunks.")
 
+            jobs = []
             for i in range(num_chunks):
                 chunk_start = i * batch_size
                 chunk_end = min((i + 1) * batch_size, len(df))
                 df_chunk = df.iloc[chunk_start:chunk_end]
 
                 chunk_path = self._generate_output_filename(output_path, i)
-                
-                df_chunk.to_parquet(chunk_path)
-                output_files.append(chunk_path)
-                
-                logging.info(f"Wrote chunk {i + 1}/{num_chunks} to {chunk_path}")
+                jobs.append((df_chunk, chunk_path, None))
+
+            entries = self._encode_all(jobs, parallel, encode)
+            for i, entry in enumerate(entries):
+                logging.info(f"Wrote chunk {i + 1}/{num_chunks} to {entry.path}")
         else:
-            df.to_parquet(output_path)
-            output_files.append(output_path)
+            entries = self._encode_all([(df, output_path, None)], False, encode)
             logging.info(f"Wrote entire DataFrame to {output_path}")
 
-        total_time = time.time() - start_time
-        logging.info(f"Total processing time for batches: {total_time:.2f} seconds")
-        
-        return output_files    
+        return entries
     
     def _process_with_dbscan(
         self, 
         df: pd.DataFrame, 
         output_path: str, 
         epsilon: float, 
-        min_samples: int
-    ) -> List[str]:
+        min_samples: int,
+        parallel: bool = False,
+        encode: Optional[EncodeOptions] = None,
+    ) -> List[ManifestEntry]:
         """Process DataFrame using DBSCAN clustering and save to Parquet."""
-        output_files = []
+        entries = []
         
         numeric_columns = df.select_dtypes(include=[np.number]).columns
         if numeric_columns.empty:
             raise ValueError("No numeric columns available for DBSCAN processing. Falling back to SEQUENTIAL mode.")
         
-        df_numeric = df[numeric_columns].copy()
-        
-        # Standardize the data
-        df_scaled = self._scale_data(df_numeric)
-        
-        # Reduce dimensionality using PCA
-        df_pca = self._apply_pca(df_scaled)
-        
-        # Apply DBSCAN clustering
-        clusters = self._apply_dbscan(df_pca, epsilon, min_samples)
+        # The numeric copy, its scaled copy, the PCA output and sklearn's working
+        # copies are alive together at peak
+        estimate = len(df) * len(numeric_columns) * 8 * DBSCAN_MEMORY_FACTOR
+        if not governor.fits(estimate):
+            raise ValueError(
+                f"DBSCAN needs about {estimate} bytes, more than the memory budget allows. "
+                "Falling back to SEQUENTIAL mode."
+            )
+
+        with governor.reserve(estimate):
+            df_numeric = df[numeric_columns].copy()
+
+            # Standardize the data
+            with span('scale', columns=len(numeric_columns)):
+                df_scaled = self._scale_data(df_numeric)
+            del df_numeric
+
+            # Reduce dimensionality using PCA
+            with span('pca') as pca_span:
+                df_pca = self._apply_pca(df_scaled)
+                pca_span.set(components=df_pca.shape[1])
+            del df_scaled
+
+            # Apply DBSCAN clustering
+            with span('dbscan', epsilon=epsilon, min_samples=min_samples) as dbscan_span:
+                clusters = self._apply_dbscan(df_pca, epsilon, min_samples)
+                dbscan_span.set(clusters=len(set(clusters)))
+            del df_pca
 
         if len(set(clusters)) <= 1:  # All noise or one single cluster
             raise ValueError("DBSCAN produced no meaningful clusters. Falling back to SEQUENTIAL mode.")
@@ -120,9 +428,9 @@ class ParquetService:
         df['cluster'] = clusters
         
         # Process and save each cluster
-        output_files = self._save_clusters(df, output_path)
+        entries = self._save_clusters(df, output_path, parallel, encode)
         
-        return output_files
+        return entries
 
     def _scale_data(self, df_numeric: pd.DataFrame) -> pd.DataFrame:
         """Scale numeric data using StandardScaler."""
@@ -139,23 +447,217 @@ class ParquetService:
         dbscan = DBSCAN(eps=epsilon, min_samples=min_samples)
         return dbscan.fit_predict(df_pca)
 
-    def _save_clusters(self, df: pd.DataFrame, output_path: str) -> List[str]:
-        """Save each cluster to a separate Parquet file."""
-        output_files = []
+    def _save_clusters(
+        self,
+        df: pd.DataFrame,
+        output_path: str,
+        parallel: bool = False,
+        encode: Optional[EncodeOptions] = None,
+    ) -> List[ManifestEntry]:
+        """
+        Save each cluster to a separate Parquet file.
 
-        for cluster in set(df['cluster']):
-            cluster_name = "noise" if cluster == -1 else f"cluster_{cluster}"
-            cluster_df = df[df['cluster'] == cluster]
-            
+        Every cluster is a filtered copy of ``df``. Serially, or in parallel once the
+        memory governor reports pressure, clusters are copied and encoded one at a
+        time so only one copy is alive.
+        """
+        clusters = sorted(set(df['cluster']))
+        cluster_names = ["noise" if cluster == -1 else f"cluster_{cluster}" for cluster in clusters]
+
+        def job(cluster, cluster_name):
             output_file = self._generate_output_filename(output_path, cluster_name)
-            cluster_df.to_parquet(output_file, index=False)
-            
-            output_files.append(output_file)
-            logging.info(f"Saved {cluster_name} to {output_file}")
+            return (df[df['cluster'] == cluster], output_file, False)
+
+        if parallel and not governor.should_spill():
+            jobs = [job(cluster, name) for cluster, name in zip(clusters, cluster_names)]
+            entries = self._encode_all(jobs, parallel, encode)
+        else:
+            entries = []
+            for cluster, name in zip(clusters, cluster_names):
+                entries.extend(self._encode_all([job(cluster, name)], False, encode))
+        for cluster_name, entry in zip(cluster_names, entries):
+            logging.info(f"Saved {cluster_name} to {entry.path}")
         
-        return output_files
+        return entries
+
+    def _encode_all(
+        self,
+        jobs: List[Tuple[pd.DataFrame, str, Optional[bool]]],
+        parallel: bool,
+        encode: Optional[EncodeOptions] = None,
+    ) -> List[ManifestEntry]:
+        """
+        Encode ``(df, path, preserve_index)`` jobs and return their manifest entries in job order.
+
+        Serial mode runs in the calling thread. Parallel mode submits every job to the
+        configured pool; the first failure cancels outstanding work and is re-raised.
+        """
+        encode = encode or EncodeOptions()
+        with span('write', files=len(jobs), parallel=parallel and len(jobs) > 1) as write_span:
+            entries = self._encode_jobs(jobs, parallel, encode)
+            write_span.add_rows(sum(entry.row_count for entry in entries))
+            write_span.add_bytes(sum(entry.byte_size for entry in entries))
+        return entries
+
+    def _encode_jobs(
+        self,
+        jobs: List[Tuple[pd.DataFrame, str, Optional[bool]]],
+        parallel: bool,
+        encode: EncodeOptions,
+    ) -> List[ManifestEntry]:
+        options = self._writer_options(jobs, encode.tune_key)
+        key_columns = encode.key_columns
+
+        if not parallel or len(jobs) <= 1:
+            return [
+                _encode_table(_to_arrow(df, preserve_index), path, options, key_columns)
+                for df, path, preserve_index in jobs
+            ]
+
+        futures: List[Future] = []
+        segments: List[shared_memory.SharedMemory] = []
+        try:
+            for df, path, preserve_index in jobs:
+                if self.executor == ExecutorKind.PROCESS:
+                    segment, size = _table_to_shared_memory(_to_arrow(df, preserve_index))
+                    segments.append(segment)
+                    futures.append(self._get_process_pool().submit(
+                        _encode_shared_table, segment.name, size, path, options, key_columns
+                    ))
+                else:
+                    # pyarrow releases the GIL for the Parquet encode and for numeric
+                    # columns in the pandas conversion, but holds it while converting
+                    # object (string, decimal, mixed) columns; threads scale for numeric
+                    # frames, while object-heavy ones do better on the process executor.
+                    futures.append(self.thread_pool.submit(
+                        _encode_dataframe, df, preserve_index, path, options, key_columns
+                    ))
+            return [future.result() for future in futures]
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    def _writer_options(
+        self,
+        jobs: List[Tuple[pd.DataFrame, str, Optional[bool]]],
+        tune_key: Optional[str],
+    ) -> Dict[str, Any]:
+        """Resolve tuned writer options from a sample of the first job, if tuning is on."""
+        if tune_key is None or not jobs:
+            return {}
+        df, _, preserve_index = jobs[0]
+        sample_rows = min(len(df), self.encoding_tuner.sample_rows)
+        sample_df = df.sample(n=sample_rows, random_state=0)
+        if preserve_index is None and isinstance(df.index, pd.RangeIndex):
+            # A RangeIndex is stored as metadata only; keep the sample's index the same kind
+            sample_df = sample_df.reset_index(drop=True)
+        sample = _to_arrow(sample_df, preserve_index)
+        return self.encoding_tuner.plan_for(tune_key, sample).writer_options(sample.schema)
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.process_pool
 
     def _generate_output_filename(self, base_path: str, suffix: str) -> str:
         """Generate a new filename with a suffix."""
-        file_name, file_ext = os.path.splitext(base_path)
-        return f"{file_name}_{suffix}{file_ext}"
+        return _generate_output_filename(base_path, suffix)
+
+
+def _to_arrow(df: pd.DataFrame, preserve_index: Optional[bool]) -> pa.Table:
+    return pa.Table.from_pandas(df, preserve_index=preserve_index)
+
+
+def _encode_table(
+    table: pa.Table,
+    path: str,
+    options: Dict[str, Any],
+    key_columns: Optional[List[str]] = None,
+) -> ManifestEntry:
+    """Write one Arrow table to ``path``. Module level so process pools can pickle it."""
+    options = cover_all_columns(options, table.schema)
+    sink = HashingWriter(open(path, "wb"))
+    try:
+        writer = pq.ParquetWriter(sink, table.schema, **options)
+        try:
+            writer.write_table(table)
+        finally:
+            writer.close()
+    finally:
+        sink.close()
+    return _manifest_entry(path, writer, table.schema, sink, key_columns)
+
+
+def _encode_dataframe(
+    df: pd.DataFrame,
+    preserve_index: Optional[bool],
+    path: str,
+    options: Dict[str, Any],
+    key_columns: Optional[List[str]] = None,
+) -> ManifestEntry:
+    return _encode_table(_to_arrow(df, preserve_index), path, options, key_columns)
+
+
+def _manifest_entry(
+    path: str,
+    writer: pq.ParquetWriter,
+    schema: pa.Schema,
+    sink: HashingWriter,
+    key_columns: Optional[List[str]],
+) -> ManifestEntry:
+    # The footer is only exposed by the underlying writer once it has been closed.
+    return entry_from_metadata(path, writer.writer.metadata, schema, sink, key_columns)
+
+
+def _table_to_shared_memory(table: pa.Table) -> Tuple[shared_memory.SharedMemory, int]:
+    """Serialise a table as an Arrow IPC stream into a new shared memory segment."""
+    sizer = pa.MockOutputStream()
+    with pa.ipc.new_stream(sizer, table.schema) as writer:
+        writer.write_table(table)
+    size = sizer.size()
+
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    buffer = pa.py_buffer(segment.buf)
+    sink = pa.FixedSizeBufferWriter(buffer)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    sink.close()
+    # Drop the exported views so the segment can be closed by the caller.
+    del sink, buffer
+    return segment, size
+
+
+def _encode_shared_table(
+    name: str,
+    size: int,
+    path: str,
+    options: Dict[str, Any],
+    key_columns: Optional[List[str]] = None,
+) -> ManifestEntry:
+    """Process pool entry point: map the IPC stream without copying and encode it."""
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(segment.buf)[:size]).read_all()
+        entry = _encode_table(table, path, options, key_columns)
+        del table
+    except BaseException:
+        try:
+            segment.close()
+        except BufferError:
+            # Traceback frames still hold views of the mapped table; the mapping goes
+            # away with the worker instead, and the original error is what matters.
+            pass
+        raise
+    segment.close()
+    return entry
+
+
+def _generate_output_filename(base_path: str, suffix: str) -> str:
+    """Generate a new filename with a suffix."""
+    file_name, file_ext = os.path.splitext(base_path)
+    return f"{file_name}_{suffix}{file_ext}"
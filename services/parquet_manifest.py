@@ -0,0 +1,217 @@
+import datetime
+import decimal
+import hashlib
+import io
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, BinaryIO, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+MANIFEST_VERSION = 1
+
+
+class HashingWriter(io.RawIOBase):
+    """
+    Binary file wrapper that checksums bytes as they are written.
+
+    Handing this to ``ParquetWriter`` gives a content checksum and byte count for the
+    finished file without reading it back.
+    """
+
+    def __init__(self, raw: BinaryIO):
+        super().__init__()
+        self._raw = raw
+        self._digest = hashlib.sha256()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        view = memoryview(data)
+        self._digest.update(view)
+        self._raw.write(view)
+        self._position += view.nbytes
+        return view.nbytes
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        if not self._raw.closed:
+            self._raw.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            # IOBase.close() flushes, so the underlying file must still be open
+            super().close()
+        finally:
+            self._raw.close()
+
+    @property
+    def checksum(self) -> str:
+        return f"sha256:{self._digest.hexdigest()}"
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    row_count: int
+    byte_size: int
+    schema_hash: str
+    checksum: str
+    # column name -> {"min": ..., "max": ..., "null_count": ...}
+    column_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+def schema_hash(schema: pa.Schema) -> str:
+    """Stable hash of a schema's fields, ignoring pandas/Arrow key-value metadata."""
+    return hashlib.sha256(schema.remove_metadata().to_string().encode()).hexdigest()[:16]
+
+
+def entry_from_metadata(
+    path: str,
+    metadata: pq.FileMetaData,
+    schema: pa.Schema,
+    sink: HashingWriter,
+    key_columns: Optional[List[str]] = None,
+) -> ManifestEntry:
+    """Build a manifest entry from the footer the writer produced and the hashing sink."""
+    return ManifestEntry(
+        path=path,
+        row_count=metadata.num_rows,
+        byte_size=sink.tell(),
+        schema_hash=schema_hash(schema),
+        checksum=sink.checksum,
+        column_stats=_column_stats(metadata, key_columns),
+    )
+
+
+def manifest_path_for(output_path: str) -> str:
+    """Sidecar location for the files generated from ``output_path``."""
+    return f"{os.path.splitext(output_path)[0]}_manifest.json"
+
+
+class ParquetManifest:
+    """Per-file row counts, sizes, key ranges and checksums for a set of Parquet outputs."""
+
+    def __init__(self, entries: Optional[List[ManifestEntry]] = None):
+        self.entries: List[ManifestEntry] = list(entries or [])
+
+    def add(self, entry: ManifestEntry) -> None:
+        self.entries.append(entry)
+
+    @property
+    def paths(self) -> List[str]:
+        return [entry.path for entry in self.entries]
+
+    @property
+    def total_rows(self) -> int:
+        return sum(entry.row_count for entry in self.entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry.byte_size for entry in self.entries)
+
+    def write(self, path: str) -> str:
+        """Write the manifest as JSON, replacing any previous version atomically."""
+        payload = {
+            "version": MANIFEST_VERSION,
+            "files": [asdict(entry) for entry in self.entries],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f, default=str, indent=2)
+        os.replace(tmp_path, path)
+        logging.info(f"Wrote manifest for {len(self.entries)} files to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "ParquetManifest":
+        with open(path) as f:
+            payload = json.load(f)
+        return cls([ManifestEntry(**entry) for entry in payload.get("files", [])])
+
+    def prune(
+        self,
+        column: str,
+        lower: Optional[Any] = None,
+        upper: Optional[Any] = None,
+    ) -> List[ManifestEntry]:
+        """
+        Return entries whose ``column`` range may overlap ``[lower, upper]``.
+
+        Files without statistics for the column are always kept. Bounds must be
+        comparable with the stored JSON values (numbers, ISO strings, ...).
+        """
+        kept = []
+        for entry in self.entries:
+            stats = entry.column_stats.get(column)
+            if not stats or stats.get("min") is None or stats.get("max") is None:
+                kept.append(entry)
+                continue
+            if lower is not None and stats["max"] < lower:
+                continue
+            if upper is not None and stats["min"] > upper:
+                continue
+            kept.append(entry)
+        return kept
+
+    def completed(self) -> List[ManifestEntry]:
+        """Entries whose file still exists with the recorded size, for cheap resume checks."""
+        return [
+            entry
+            for entry in self.entries
+            if os.path.exists(entry.path) and os.path.getsize(entry.path) == entry.byte_size
+        ]
+
+
+def _column_stats(
+    metadata: pq.FileMetaData, key_columns: Optional[List[str]]
+) -> Dict[str, Dict[str, Any]]:
+    wanted = set(key_columns) if key_columns is not None else None
+    stats: Dict[str, Dict[str, Any]] = {}
+    unknown = set()
+
+    for rg in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg)
+        for c in range(row_group.num_columns):
+            chunk = row_group.column(c)
+            name = chunk.path_in_schema
+            if (wanted is not None and name not in wanted) or name in unknown:
+                continue
+            chunk_stats = chunk.statistics
+            if chunk_stats is None or not chunk_stats.has_min_max:
+                # One row group without statistics makes the file-level range unknown.
+                unknown.add(name)
+                stats.pop(name, None)
+                continue
+            current = stats.get(name)
+            if current is None:
+                stats[name] = {
+                    "min": chunk_stats.min,
+                    "max": chunk_stats.max,
+                    "null_count": chunk_stats.null_count,
+                }
+            else:
+                current["min"] = min(current["min"], chunk_stats.min)
+                current["max"] = max(current["max"], chunk_stats.max)
+                current["null_count"] += chunk_stats.null_count
+
+    return {name: {k: _json_value(v) for k, v in s.items()} for name, s in stats.items()}
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# (codec, level) pairs tried for every column. Levels are only meaningful for zstd.
+CANDIDATE_CODECS: List[Tuple[str, Optional[int]]] = [
+    ("snappy", None),
+    ("lz4", None),
+    ("zstd", 1),
+    ("zstd", 3),
+    ("zstd", 9),
+]
+DEFAULT_SAMPLE_ROWS = 50_000
+# Candidates that encode slower than this (uncompressed MB/s) are only used when
+# nothing else qualifies, so tuning never turns the writer into the bottleneck.
+DEFAULT_MIN_ENCODE_MBPS = 100.0
+# Sizes within this fraction of the smallest are treated as a tie and the
+# faster candidate wins.
+SIZE_TIE_TOLERANCE = 0.02
+# Columns whose distinct/total ratio exceeds this skip the dictionary trial.
+DICTIONARY_MAX_DISTINCT_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class ColumnEncoding:
+    compression: str = "snappy"
+    compression_level: Optional[int] = None
+    use_dictionary: bool = True
+    byte_stream_split: bool = False
+
+
+@dataclass
+class EncodingPlan:
+    """Per-column writer settings chosen by :class:`EncodingTuner`."""
+
+    columns: Dict[str, ColumnEncoding]
+
+    def writer_options(self, schema: Optional[pa.Schema] = None) -> Dict[str, Any]:
+        """
+        Translate the plan into ``pyarrow.parquet`` writer keyword arguments.
+
+        Per-column settings leave every unlisted column uncompressed and without
+        dictionary encoding, so with ``schema`` each of its leaf columns the plan does
+        not cover gets the default encoding.
+        """
+        columns = dict(self.columns)
+        if schema is not None and columns:
+            for path in leaf_paths(schema):
+                columns.setdefault(path, ColumnEncoding())
+        if not columns:
+            return {}
+        levels = {
+            name: enc.compression_level
+            for name, enc in columns.items()
+            if enc.compression_level is not None
+        }
+        options: Dict[str, Any] = {
+            "compression": {name: enc.compression for name, enc in columns.items()},
+            "use_dictionary": [name for name, enc in columns.items() if enc.use_dictionary],
+            "use_byte_stream_split": [
+                name for name, enc in columns.items() if enc.byte_stream_split
+            ],
+        }
+        if levels:
+            options["compression_level"] = levels
+        return options
+
+
+def leaf_paths(schema: pa.Schema) -> List[str]:
+    """Parquet column paths of ``schema`` (``s.x``, ``l.list.element``, ...), as the writer names them."""
+    key = schema.remove_metadata().to_string()
+    with _leaf_paths_lock:
+        paths = _leaf_paths.get(key)
+    if paths is None:
+        sink = pa.BufferOutputStream()
+        pq.write_table(schema.empty_table(), sink)
+        parquet_schema = pq.ParquetFile(pa.BufferReader(sink.getvalue())).schema
+        paths = [parquet_schema.column(i).path for i in range(len(parquet_schema))]
+        with _leaf_paths_lock:
+            _leaf_paths[key] = paths
+    return paths
+
+
+def cover_all_columns(options: Dict[str, Any], schema: pa.Schema) -> Dict[str, Any]:
+    """
+    Extend per-column ``options`` to every leaf column of ``schema``.
+
+    Tables written with one set of options can differ in columns (e.g. a pandas
+    index stored for some chunks only); columns missing from the per-column
+    settings get the default encoding instead of none.
+    """
+    compression = options.get("compression")
+    if not isinstance(compression, dict):
+        return options
+    missing = [path for path in leaf_paths(schema) if path not in compression]
+    if not missing:
+        return options
+    default = ColumnEncoding()
+    completed = dict(options)
+    completed["compression"] = {**compression, **{path: default.compression for path in missing}}
+    if isinstance(options.get("use_dictionary"), list) and default.use_dictionary:
+        completed["use_dictionary"] = options["use_dictionary"] + missing
+    return completed
+
+
+_leaf_paths: Dict[str, List[str]] = {}
+_leaf_paths_lock = threading.Lock()
+
+
+class EncodingTuner:
+    """
+    Pick codec, level and encoding per column from a one-off sample of each table.
+
+    Every candidate is encoded against the sample and the smallest output that still
+    meets ``min_encode_mbps`` wins. Plans are cached per table key and schema, so
+    later chunks of the same table reuse the decision without re-sampling.
+    """
+
+    def __init__(
+        self,
+        sample_rows: int = DEFAULT_SAMPLE_ROWS,
+        min_encode_mbps: float = DEFAULT_MIN_ENCODE_MBPS,
+    ):
+        self.sample_rows = sample_rows
+        self.min_encode_mbps = min_encode_mbps
+        self._plans: Dict[Tuple[str, str], EncodingPlan] = {}
+        self._lock = threading.Lock()
+
+    def plan_for(self, table_key: str, table: pa.Table) -> EncodingPlan:
+        """Return the cached plan for ``table_key`` or tune one from ``table``."""
+        cache_key = (table_key, table.schema.remove_metadata().to_string())
+        with self._lock:
+            plan = self._plans.get(cache_key)
+        if plan is not None:
+            return plan
+
+        start_time = time.time()
+        plan = self.tune(table)
+        logging.info(
+            f"Tuned Parquet encodings for {table_key} in {time.time() - start_time:.2f} seconds: "
+            + ", ".join(
+                f"{name}={enc.compression}"
+                + (f"({enc.compression_level})" if enc.compression_level is not None else "")
+                + ("+dict" if enc.use_dictionary else "")
+                + ("+bss" if enc.byte_stream_split else "")
+                for name, enc in plan.columns.items()
+            )
+        )
+        with self._lock:
+            self._plans.setdefault(cache_key, plan)
+            return self._plans[cache_key]
+
+    def tune(self, table: pa.Table) -> EncodingPlan:
+        """Measure every candidate on a sample of ``table`` without caching."""
+        sample = self._sample(table)
+        columns = {}
+        for field in sample.schema:
+            if pa.types.is_nested(field.type):
+                # Nested columns are addressed by leaf path; writer_options() gives
+                # their leaves the default encoding.
+                continue
+            columns[field.name] = self._tune_column(sample.select([field.name]))
+        return EncodingPlan(columns)
+
+    def invalidate(self, table_key: str) -> None:
+        """Forget cached plans for ``table_key``, e.g. after a schema change."""
+        with self._lock:
+            for key in [key for key in self._plans if key[0] == table_key]:
+                del self._plans[key]
+
+    def _sample(self, table: pa.Table) -> pa.Table:
+        if table.num_rows <= self.sample_rows:
+            return table
+        # Fixed seed keeps the decision reproducible for the same input.
+        rng = np.random.default_rng(0)
+        indices = np.sort(rng.choice(table.num_rows, size=self.sample_rows, replace=False))
+        return table.take(pa.array(indices))
+
+    def _tune_column(self, column_table: pa.Table) -> ColumnEncoding:
+        column = column_table.column(0)
+        if column_table.num_rows == 0 or column.null_count == column_table.num_rows:
+            return ColumnEncoding()
+
+        is_float = pa.types.is_floating(column.type)
+        dictionary_options = [False]
+        if self._distinct_ratio(column) <= DICTIONARY_MAX_DISTINCT_RATIO:
+            dictionary_options.append(True)
+
+        candidates = []
+        for codec, level in CANDIDATE_CODECS:
+            for use_dictionary in dictionary_options:
+                candidates.append(ColumnEncoding(codec, level, use_dictionary, False))
+            if is_float:
+                candidates.append(ColumnEncoding(codec, level, False, True))
+
+        raw_bytes = max(column_table.nbytes, 1)
+        measured = []
+        for candidate in candidates:
+            size, seconds = self._measure(column_table, candidate)
+            throughput = raw_bytes / (1024 * 1024) / max(seconds, 1e-9)
+            measured.append((candidate, size, seconds, throughput))
+
+        fast_enough = [m for m in measured if m[3] >= self.min_encode_mbps]
+        if not fast_enough:
+            return min(measured, key=lambda m: m[2])[0]
+
+        smallest = min(m[1] for m in fast_enough)
+        ties = [m for m in fast_enough if m[1] <= smallest * (1 + SIZE_TIE_TOLERANCE)]
+        return min(ties, key=lambda m: m[2])[0]
+
+    @staticmethod
+    def _distinct_ratio(column: pa.ChunkedArray) -> float:
+        non_null = len(column) - column.null_count
+        if non_null == 0:
+            return 0.0
+        return len(column.unique()) / non_null
+
+    @staticmethod
+    def _measure(column_table: pa.Table, candidate: ColumnEncoding) -> Tuple[int, float]:
+        name = column_table.column_names[0]
+        sink = pa.BufferOutputStream()
+        start_time = time.perf_counter()
+        pq.write_table(
+            column_table,
+            sink,
+            compression=candidate.compression,
+            compression_level=candidate.compression_level,
+            use_dictionary=candidate.use_dictionary,
+            use_byte_stream_split=[name] if candidate.byte_stream_split else False,
+        )
+        seconds = time.perf_counter() - start_time
+        return sink.getvalue().size, seconds
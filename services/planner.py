@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import math
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+
+import pyarrow as pa
+
+from services.parquet import ParquetService
+
+DEFAULT_SAMPLE_ROWS = 10_000
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_PARALLELISM = (1, 2, 4, 8, 16)
+# Rough peak-to-payload ratio for one in-flight chunk: driver row tuples, the Arrow
+# copy and Parquet encode buffers are alive at the same time.
+CHUNK_MEMORY_OVERHEAD = 3.0
+
+
+@dataclass
+class ParallelismEstimate:
+    workers: int
+    wall_seconds: float
+    peak_memory_bytes: int
+
+
+@dataclass
+class MigrationPlan:
+    table_name: str
+    column_count: int
+    estimated_rows: int
+    sample_rows: int
+    chunk_rows: int
+    chunk_count: int
+    avg_row_bytes: float
+    estimated_source_bytes: int
+    estimated_parquet_bytes: int
+    probe_latency_seconds: float
+    fetch_rows_per_second: float
+    encode_rows_per_second: float
+    estimates: List[ParallelismEstimate] = field(default_factory=list)
+
+
+class MigrationPlanner:
+    """
+    Predict chunk count, bytes, wall time and peak memory for a table migration.
+
+    A small timed read from the source gives fetch throughput, first-batch latency
+    and row width; encoding that sample with ``ParquetService`` gives local encode
+    throughput and compression ratio. The prediction then treats fetch (bounded by
+    the worker count) and encode (bounded by worker count and local cores) as the
+    two rooflines of the pipeline.
+    """
+
+    def __init__(
+        self,
+        parquet_service: Optional[ParquetService] = None,
+        sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    ):
+        self.parquet_service = parquet_service or ParquetService()
+        self.sample_rows = sample_rows
+
+    async def plan(
+        self,
+        source: Any,
+        table_name: str,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        parallelism: Sequence[int] = DEFAULT_PARALLELISM,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+    ) -> MigrationPlan:
+        """
+        Build a plan for migrating ``table_name`` from ``source``.
+
+        ``source`` needs ``get_table_schema`` and ``stream_table``; ``estimate_row_count``
+        is used when available and ``get_row_count`` otherwise. With ``columns`` or
+        ``filters`` the probe reads the projection, so row width and encode cost reflect
+        only the kept columns; the row estimate remains the whole table's.
+        """
+        schema = await source.get_table_schema(table_name)
+        if not schema:
+            raise ValueError(f"Table {table_name} not found or has no columns")
+        if (columns or filters) and hasattr(source, "validate_projection"):
+            await source.validate_projection(table_name, columns, filters)
+
+        if hasattr(source, "estimate_row_count"):
+            estimated_rows = await source.estimate_row_count(table_name)
+        else:
+            estimated_rows = await source.get_row_count(table_name)
+
+        batches, probe_latency, fetch_seconds = await self._probe(source, table_name, columns, filters)
+        sample_rows = sum(batch.num_rows for batch in batches)
+        sample_bytes = sum(batch.nbytes for batch in batches)
+
+        encode_seconds, parquet_bytes = await asyncio.to_thread(self._measure_encode, batches)
+
+        avg_row_bytes = sample_bytes / sample_rows if sample_rows else 0.0
+        compression_ratio = parquet_bytes / sample_bytes if sample_bytes else 1.0
+        # Clamp timings so tiny or empty samples still give finite rates.
+        fetch_rate = sample_rows / max(fetch_seconds, 1e-6)
+        encode_rate = sample_rows / max(encode_seconds, 1e-6)
+        chunk_count = max(1, math.ceil(estimated_rows / chunk_rows)) if estimated_rows else 0
+
+        plan = MigrationPlan(
+            table_name=table_name,
+            column_count=len(columns) if columns else len(schema),
+            estimated_rows=estimated_rows,
+            sample_rows=sample_rows,
+            chunk_rows=chunk_rows,
+            chunk_count=chunk_count,
+            avg_row_bytes=avg_row_bytes,
+            estimated_source_bytes=int(estimated_rows * avg_row_bytes),
+            estimated_parquet_bytes=int(estimated_rows * avg_row_bytes * compression_ratio),
+            probe_latency_seconds=probe_latency,
+            fetch_rows_per_second=fetch_rate,
+            encode_rows_per_second=encode_rate,
+        )
+        plan.estimates = [
+            self._estimate(plan, workers) for workers in sorted(set(parallelism)) if workers > 0
+        ]
+        logging.info(
+            f"Planned {table_name}: {estimated_rows} rows in {chunk_count} chunks, "
+            f"~{plan.estimated_parquet_bytes} Parquet bytes"
+        )
+        return plan
+
+    async def _probe(self, source: Any, table_name: str, columns=None, filters=None):
+        """Time a ``sample_rows`` read, separating first-batch latency from transfer."""
+        batches: List[pa.RecordBatch] = []
+        start_time = time.perf_counter()
+        first_batch_time = None
+        stream = (
+            source.stream_table(table_name, interval=self.sample_rows, columns=columns, filters=filters)
+            if columns or filters
+            else source.stream_table(table_name, interval=self.sample_rows)
+        )
+        async for batch in stream:
+            if first_batch_time is None:
+                first_batch_time = time.perf_counter()
+            batches.append(batch)
+        end_time = time.perf_counter()
+
+        if first_batch_time is None:
+            return batches, end_time - start_time, 0.0
+        return batches, first_batch_time - start_time, end_time - start_time
+
+    def _measure_encode(self, batches: List[pa.RecordBatch]):
+        if not batches:
+            return 0.0, 0
+        output_dir = tempfile.mkdtemp(prefix="epic_shelter_plan_")
+        try:
+            start_time = time.perf_counter()
+            files = self.parquet_service.write_batches(
+                batches, os.path.join(output_dir, "sample.parquet")
+            )
+            seconds = time.perf_counter() - start_time
+            return seconds, sum(os.path.getsize(path) for path in files)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    @staticmethod
+    def _estimate(plan: MigrationPlan, workers: int) -> ParallelismEstimate:
+        if plan.chunk_count == 0:
+            return ParallelismEstimate(workers, 0.0, 0)
+
+        active = min(workers, plan.chunk_count)
+        encoders = min(active, os.cpu_count() or 1)
+        chunk_fetch_seconds = plan.probe_latency_seconds + (
+            plan.chunk_rows / plan.fetch_rows_per_second if plan.fetch_rows_per_second else 0.0
+        )
+        chunk_encode_seconds = (
+            plan.chunk_rows / plan.encode_rows_per_second if plan.encode_rows_per_second else 0.0
+        )
+
+        fetch_wall = math.ceil(plan.chunk_count / active) * chunk_fetch_seconds
+        encode_wall = plan.chunk_count * chunk_encode_seconds / encoders
+        chunk_bytes = min(plan.chunk_rows, plan.estimated_rows) * plan.avg_row_bytes
+        return ParallelismEstimate(
+            workers=workers,
+            wall_seconds=max(fetch_wall, encode_wall),
+            peak_memory_bytes=int(active * chunk_bytes * CHUNK_MEMORY_OVERHEAD),
+        )
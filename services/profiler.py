@@ -0,0 +1,181 @@
+"""
+Wall-clock sampling profiler for live processes, stdlib only.
+
+A background thread wakes every ``interval`` seconds, reads every thread's current
+frame with ``sys._current_frames()`` and counts the stack. Nothing is installed in
+the profiled threads (no ``sys.setprofile``), so overhead is one stack walk per
+thread per sample and stops entirely when the profiler stops.
+
+Each sample is prefixed with the thread name, the tracing stages open on that thread
+(``stage:chunk;stage:encode``; on an event loop thread, those of the task it is
+running) and, on Linux, whether the thread was on CPU or waiting since the previous
+sample (from ``/proc/self/task/<tid>/schedstat``). Output is the
+collapsed-stack format read by flamegraph.pl, speedscope and similar tools.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from services.tracing import tracer
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_MAX_DEPTH = 128
+# A thread that ran for at least this share of a sample interval counts as on CPU
+CPU_SHARE_THRESHOLD = 0.5
+
+ThreadFilter = Callable[[threading.Thread], bool]
+
+
+@dataclass
+class Profile:
+    samples: Counter = field(default_factory=Counter)
+    sample_count: int = 0
+    duration_seconds: float = 0.0
+    interval: float = DEFAULT_INTERVAL
+    threads: Dict[str, int] = field(default_factory=dict)
+
+    def collapsed(self) -> str:
+        """One ``frame;frame;... count`` line per distinct stack, most frequent first."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def by_label(self, prefix: str) -> Dict[str, int]:
+        """Sample counts per label (e.g. ``stage:`` or ``state:``); innermost label wins."""
+        totals: Counter = Counter()
+        for stack, count in self.samples.items():
+            labels = [part[len(prefix):] for part in stack.split(';') if part.startswith(prefix)]
+            totals[labels[-1] if labels else 'none'] += count
+        return dict(totals.most_common())
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            'duration_seconds': round(self.duration_seconds, 3),
+            'interval_seconds': self.interval,
+            'samples': self.sample_count,
+            'threads': self.threads,
+            'stages': self.by_label('stage:'),
+            'states': self.by_label('state:'),
+        }
+
+
+class SamplingProfiler:
+    """
+    Sample the stacks of selected threads from a background thread.
+
+    Args:
+        interval: Seconds between samples
+        thread_filter: Only sample threads for which this returns True (default: all
+            but the profiler's own thread)
+        max_depth: Innermost frames kept per stack
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        thread_filter: Optional[ThreadFilter] = None,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+    ):
+        self.interval = max(interval, 0.001)
+        self.thread_filter = thread_filter
+        self.max_depth = max_depth
+        self.profile = Profile(interval=self.interval)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._cpu_ns: Dict[int, int] = {}
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("Profiler is already running")
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Profile:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.profile.duration_seconds = time.perf_counter() - self._started
+        return self.profile
+
+    def run(self, seconds: float) -> Profile:
+        """Profile for ``seconds`` and return the result (blocks the caller)."""
+        self.start()
+        try:
+            time.sleep(seconds)
+        finally:
+            profile = self.stop()
+        return profile
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            threads = {t.ident: t for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                thread = threads.get(thread_id)
+                if thread_id == own or thread is None:
+                    continue
+                if self.thread_filter is not None and not self.thread_filter(thread):
+                    continue
+                self._sample(thread, frame)
+            self.profile.sample_count += 1
+
+    def _sample(self, thread: threading.Thread, frame) -> None:
+        frames: List[str] = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(f"{_module_name(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        frames.reverse()
+
+        labels = [thread.name]
+        labels.extend(f"stage:{name}" for name in tracer.thread_stages(thread.ident))
+        state = self._cpu_state(thread)
+        if state:
+            labels.append(f"state:{state}")
+        self.profile.samples[';'.join(labels + frames)] += 1
+        self.profile.threads[thread.name] = self.profile.threads.get(thread.name, 0) + 1
+
+    def _cpu_state(self, thread: threading.Thread) -> Optional[str]:
+        native_id = getattr(thread, 'native_id', None)
+        if native_id is None:
+            return None
+        try:
+            with open(f'/proc/self/task/{native_id}/schedstat') as f:
+                cpu_ns = int(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        previous = self._cpu_ns.get(native_id)
+        self._cpu_ns[native_id] = cpu_ns
+        if previous is None:
+            return None
+        return 'cpu' if cpu_ns - previous >= self.interval * 1e9 * CPU_SHARE_THRESHOLD else 'wait'
+
+
+def spans_with(key: str, value: str) -> ThreadFilter:
+    """Select threads that have an open span carrying attribute ``key == value``."""
+    def matches(thread: threading.Thread) -> bool:
+        return any(str(s.lookup(key)) == value for s in tracer.thread_spans(thread.ident))
+    return matches
+
+
+def thread_named(name: str) -> ThreadFilter:
+    """Select threads whose name contains ``name`` or whose ident equals it."""
+    def matches(thread: threading.Thread) -> bool:
+        return name in thread.name or name == str(thread.ident)
+    return matches
+
+
+def _module_name(filename: str) -> str:
+    # Short, machine-independent names: the path below site-packages, or from the
+    # repository's top-level package onwards.
+    parts = filename.replace(os.sep, '/').split('/')
+    for anchor in ('site-packages', 'services', 'app'):
+        if anchor in parts:
+            index = len(parts) - 1 - parts[::-1].index(anchor)
+            return '/'.join(parts[index + 1 if anchor == 'site-packages' else index:])
+    return parts[-1]
@@ -0,0 +1,139 @@
+import logging
+import os
+import shutil
+import tempfile
+from typing import AsyncIterable, Iterator, List, Optional, Tuple, Union
+
+import pyarrow as pa
+
+from services.memory import MemoryGovernor, governor as default_governor
+
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+
+
+class SpillBuffer:
+    """
+    Stage record batches in memory up to a byte budget, then spill to Arrow IPC files.
+
+    Once the budget is exceeded, or the process-wide memory governor reports pressure,
+    every later batch is appended to an IPC file on local disk (optionally zstd/lz4
+    compressed). Iterating the buffer yields batches in
+    arrival order; spilled batches are read back through a memory map, which is
+    zero-copy for uncompressed files, so downstream stages degrade to disk speed
+    instead of running out of memory.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        spill_dir: Optional[str] = None,
+        compression: Optional[str] = None,
+        governor: Optional[MemoryGovernor] = default_governor,
+    ):
+        self.memory_budget = memory_budget
+        self.governor = governor
+        self.compression = compression
+        self._spill_root = spill_dir
+        self._spill_dir: Optional[str] = None
+        self._schema: Optional[pa.Schema] = None
+        # Ordered segments: a list of in-memory batches or the path of a spill file.
+        self._segments: List[Tuple[str, Union[List[pa.RecordBatch], str]]] = []
+        self._writer: Optional[pa.ipc.RecordBatchFileWriter] = None
+        self._sink: Optional[pa.NativeFile] = None
+        self.memory_bytes = 0
+        self.spilled_bytes = 0
+        self.num_rows = 0
+
+    def __enter__(self) -> "SpillBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def spilled(self) -> bool:
+        return self.spilled_bytes > 0
+
+    @property
+    def schema(self) -> Optional[pa.Schema]:
+        return self._schema
+
+    def append(self, batch: Union[pa.RecordBatch, pa.Table]) -> None:
+        """Add a batch (or every batch of a table), spilling once over budget."""
+        batches = [batch] if isinstance(batch, pa.RecordBatch) else batch.to_batches()
+        for record_batch in batches:
+            if self._schema is None:
+                self._schema = record_batch.schema
+            self.num_rows += record_batch.num_rows
+
+            if self._writer is None and self._fits(record_batch.nbytes):
+                self._memory_segment().append(record_batch)
+                self.memory_bytes += record_batch.nbytes
+            else:
+                self._spill(record_batch)
+
+    async def extend_async(self, batches: AsyncIterable[pa.RecordBatch]) -> "SpillBuffer":
+        """Drain an async batch stream (e.g. ``SingleStoreConnector.stream_table``)."""
+        async for batch in batches:
+            self.append(batch)
+        return self
+
+    def __iter__(self) -> Iterator[pa.RecordBatch]:
+        self._finish_spill_file()
+        for kind, segment in self._segments:
+            if kind == "memory":
+                yield from segment
+                continue
+            # Batches keep the mapping alive after the reader goes away, so the map is
+            # left for the garbage collector rather than closed here.
+            reader = pa.ipc.open_file(pa.memory_map(segment, "r"))
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+
+    def to_table(self) -> pa.Table:
+        """Materialise everything; only for callers that know the data fits in memory."""
+        return pa.Table.from_batches(list(self), schema=self._schema)
+
+    def close(self) -> None:
+        """Drop in-memory batches and delete any spill files."""
+        self._finish_spill_file()
+        self._segments = []
+        self.memory_bytes = 0
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _fits(self, nbytes: int) -> bool:
+        if self.memory_bytes + nbytes > self.memory_budget:
+            return False
+        return self.governor is None or not self.governor.should_spill()
+
+    def _memory_segment(self) -> List[pa.RecordBatch]:
+        if not self._segments or self._segments[-1][0] != "memory":
+            self._segments.append(("memory", []))
+        return self._segments[-1][1]
+
+    def _spill(self, batch: pa.RecordBatch) -> None:
+        if self._writer is None:
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix="epic_shelter_spill_", dir=self._spill_root)
+            path = os.path.join(self._spill_dir, f"segment_{len(self._segments):05d}.arrow")
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._schema, options=options)
+            self._segments.append(("file", path))
+            logging.info(
+                f"Memory budget of {self.memory_budget} bytes exceeded or process under "
+                f"memory pressure, spilling batches to {path}"
+            )
+        self._writer.write_batch(batch)
+        self.spilled_bytes += batch.nbytes
+
+    def _finish_spill_file(self) -> None:
+        # Close the open spill file so it can be memory mapped; later appends that
+        # still exceed the budget start a new segment after it.
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = None
+            self._sink = None
@@ -0,0 +1,324 @@
+"""
+Lightweight tracing of pipeline stages.
+
+Code marks a stage with ``with span("encode", table=...) as s`` or the ``@traced``
+decorator. Spans nest (migration -> chunk -> query / convert / encode / write), are
+timed with ``time.perf_counter_ns`` and carry row and byte counts plus free-form
+attributes. Finished spans go to every registered exporter.
+
+With no exporter registered the tracer is disabled: ``span()`` returns a shared no-op
+span and does no timing, context or allocation work.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set
+
+DEFAULT_RING_BUFFER_SPANS = 10_000
+
+_span_ids = itertools.count(1)
+
+
+@dataclass(eq=False)
+class Span:
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    trace_id: int
+    thread_id: int
+    start_ns: int
+    end_ns: Optional[int] = None
+    rows: int = 0
+    bytes: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    parent: Optional["Span"] = field(default=None, repr=False)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_rows(self, rows: int) -> None:
+        self.rows += int(rows)
+
+    def add_bytes(self, size: int) -> None:
+        self.bytes += int(size)
+
+    def lookup(self, key: str, default: Any = None) -> Any:
+        """Value of an attribute on this span or its nearest ancestor that has it."""
+        node: Optional[Span] = self
+        while node is not None:
+            if key in node.attributes:
+                return node.attributes[key]
+            node = node.parent
+        return default
+
+    def ancestor(self, name: str) -> Optional["Span"]:
+        """Nearest enclosing span called ``name``."""
+        node = self.parent
+        while node is not None and node.name != name:
+            node = node.parent
+        return node
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'trace_id': self.trace_id,
+            'thread_id': self.thread_id,
+            'duration_ms': round(self.duration_ms, 3),
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is disabled; every call is a no-op."""
+
+    name = ''
+    rows = 0
+    bytes = 0
+    attributes: Dict[str, Any] = {}
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add_rows(self, rows: int) -> None:
+        pass
+
+    def add_bytes(self, size: int) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """Receives every finished span. Exporters run in the thread that ended the span."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+
+class LogExporter(SpanExporter):
+    """Log one line per finished span."""
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger('services.tracing')
+        self.level = level
+
+    def export(self, span: Span) -> None:
+        attributes = ' '.join(f"{key}={value}" for key, value in span.attributes.items())
+        self.logger.log(
+            self.level,
+            f"span {span.name} {span.duration_ms:.2f} ms rows={span.rows} bytes={span.bytes}"
+            f"{' ' + attributes if attributes else ''}{' error=' + span.error if span.error else ''}",
+        )
+
+
+class RingBufferExporter(SpanExporter):
+    """Keep the most recent finished spans in memory, e.g. for a debug endpoint."""
+
+    def __init__(self, capacity: int = DEFAULT_RING_BUFFER_SPANS):
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, name: Optional[str] = None, trace_id: Optional[int] = None) -> List[Span]:
+        with self._lock:
+            spans = list(self._spans)
+        return [
+            s for s in spans
+            if (name is None or s.name == name) and (trace_id is None or s.trace_id == trace_id)
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class Tracer:
+    """
+    Records nested spans and hands finished ones to its exporters.
+
+    The parent of a new span is the innermost open span of the current context, so
+    nesting follows asyncio tasks as well as threads. Each thread's open spans are
+    also kept in a per-thread stack so other threads (e.g. a sampling profiler) can
+    see which stage a thread is in. Tasks interleave on an event loop thread, so
+    there the innermost span of each task is tracked instead and the thread reports
+    the spans of whichever task is running.
+    """
+
+    def __init__(self):
+        self.exporters: List[SpanExporter] = []
+        self._current: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+        self._stacks: Dict[int, List[Span]] = {}
+        self._task_spans: Dict[asyncio.Task, Optional[Span]] = {}
+        self._loop_threads: Set[int] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def add_exporter(self, exporter: SpanExporter) -> SpanExporter:
+        self.exporters.append(exporter)
+        return exporter
+
+    def remove_exporter(self, exporter: SpanExporter) -> None:
+        if exporter in self.exporters:
+            self.exporters.remove(exporter)
+
+    def span(self, name: str, **attributes: Any):
+        """Context manager recording one span; a shared no-op span while disabled."""
+        if not self.exporters:
+            return NOOP_SPAN
+        return self._record(name, attributes)
+
+    def traced(self, name: Optional[str] = None, **attributes: Any) -> Callable:
+        """Decorator running a sync or async function inside a span named after it."""
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name, **attributes):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, **attributes):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def thread_spans(self, thread_id: Optional[int] = None) -> List[Span]:
+        """Spans open on a thread, outermost first (the running task's on an event loop)."""
+        if thread_id is None:
+            thread_id = threading.get_ident()
+        if thread_id in self._loop_threads:
+            task = _task_running_on(thread_id)
+            spans = []
+            node = self._task_spans.get(task) if task is not None else None
+            while node is not None:
+                spans.append(node)
+                node = node.parent
+            return spans[::-1]
+        return list(self._stacks.get(thread_id) or ())
+
+    def thread_stages(self, thread_id: Optional[int] = None) -> List[str]:
+        """Names of the spans open on a thread, outermost first."""
+        return [s.name for s in self.thread_spans(thread_id)]
+
+    def flush(self) -> None:
+        for exporter in list(self.exporters):
+            try:
+                exporter.flush()
+            except Exception as e:
+                logging.error(f"Span exporter {type(exporter).__name__} failed to flush: {e}")
+
+    @contextmanager
+    def _record(self, name: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+        parent = self._current.get()
+        thread_id = threading.get_ident()
+        span_id = next(_span_ids)
+        current = Span(
+            name=name,
+            span_id=span_id,
+            parent_id=parent.span_id if parent else None,
+            trace_id=parent.trace_id if parent else span_id,
+            thread_id=thread_id,
+            start_ns=time.perf_counter_ns(),
+            attributes=attributes,
+            parent=parent,
+        )
+        token = self._current.set(current)
+        task = _current_task()
+        if task is not None:
+            if task not in self._task_spans:
+                self._loop_threads.add(thread_id)
+                task.add_done_callback(self._forget_task)
+            self._task_spans[task] = current
+        # Only this thread mutates its stack, so no lock is needed
+        stack = self._stacks.setdefault(thread_id, [])
+        stack.append(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current.end_ns = time.perf_counter_ns()
+            # Spans of interleaved asyncio tasks on one thread may close out of order
+            if stack and stack[-1] is current:
+                stack.pop()
+            elif current in stack:
+                stack.remove(current)
+            if not stack:
+                self._stacks.pop(thread_id, None)
+            if task is not None:
+                # What the task's context holds once the token is reset
+                self._task_spans[task] = parent
+            self._current.reset(token)
+            self._export(current)
+
+    def _forget_task(self, task: asyncio.Task) -> None:
+        self._task_spans.pop(task, None)
+
+    def _export(self, finished: Span) -> None:
+        for exporter in list(self.exporters):
+            try:
+                exporter.export(finished)
+            except Exception as e:
+                logging.error(f"Span exporter {type(exporter).__name__} failed: {e}")
+
+
+def _current_task() -> Optional[asyncio.Task]:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
+
+
+def _task_running_on(thread_id: int) -> Optional[asyncio.Task]:
+    # asyncio keeps the task being stepped per loop; the loop records its thread while running
+    for loop, task in list(asyncio.tasks._current_tasks.items()):
+        if getattr(loop, '_thread_id', None) == thread_id:
+            return task
+    return None
+
+
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced